@@ -153,6 +153,7 @@ Common Flyte IDL Objects
    BlobType
 """
 
+import importlib
 import sys
 from typing import Generator
 
@@ -189,16 +190,38 @@ from flytekit.models.core.execution import WorkflowExecutionPhase
 from flytekit.models.core.types import BlobType
 from flytekit.models.literals import Blob, BlobMetadata, Literal, Scalar
 from flytekit.models.types import LiteralType
-from flytekit.types import directory, file, numpy, schema
-from flytekit.types.structured.structured_dataset import (
-    StructuredDataset,
-    StructuredDatasetFormat,
-    StructuredDatasetTransformerEngine,
-    StructuredDatasetType,
-)
+from flytekit.types import directory, file
 
 __version__ = "0.0.0+develop"
 
+# These depend on numpy, pandas and pyarrow, which are only imported when they are first accessed (PEP 562).
+_LAZY_ATTRIBUTES = {
+    "numpy": ("flytekit.types.numpy", None),
+    "schema": ("flytekit.types.schema", None),
+    "StructuredDataset": ("flytekit.types.structured.structured_dataset", "StructuredDataset"),
+    "StructuredDatasetFormat": ("flytekit.types.structured.structured_dataset", "StructuredDatasetFormat"),
+    "StructuredDatasetTransformerEngine": (
+        "flytekit.types.structured.structured_dataset",
+        "StructuredDatasetTransformerEngine",
+    ),
+    "StructuredDatasetType": ("flytekit.types.structured.structured_dataset", "StructuredDatasetType"),
+}
+
+
+def __getattr__(name: str):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attribute = _LAZY_ATTRIBUTES[name]
+    value = importlib.import_module(module_name)
+    if attribute is not None:
+        value = getattr(value, attribute)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_ATTRIBUTES))
+
 
 def current_context() -> ExecutionParameters:
     """
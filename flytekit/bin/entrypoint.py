@@ -1,11 +1,15 @@
 import contextlib
 import datetime as _datetime
+import json
 import os
 import pathlib
+import shutil
+import socket
 import subprocess
+import sys
 import tempfile
 import traceback as _traceback
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 import click as _click
 from flyteidl.core import literals_pb2 as _literals_pb2
@@ -17,14 +21,16 @@ from flytekit.configuration import (
     SerializationSettings,
     StatsConfig,
 )
+from flytekit.configuration import internal as _internal
 from flytekit.core import constants as _constants
 from flytekit.core import utils
 from flytekit.core.base_task import IgnoreOutputs, PythonTask
-from flytekit.core.checkpointer import SyncCheckpoint
+from flytekit.core.checkpointer import AsyncCheckpoint, AsyncChunkedCheckpoint, ChunkedCheckpoint, SyncCheckpoint
 from flytekit.core.context_manager import ExecutionParameters, ExecutionState, FlyteContext, FlyteContextManager
 from flytekit.core.data_persistence import FileAccessProvider
 from flytekit.core.map_task import MapPythonTask
 from flytekit.core.promise import VoidPromise
+from flytekit.core.type_engine import ListTransformer
 from flytekit.exceptions import scopes as _scoped_exceptions
 from flytekit.exceptions import scopes as _scopes
 from flytekit.interfaces.stats.taggable import get_stats as _get_stats
@@ -94,6 +100,14 @@ def _dispatch_execute(
             logger.warning("Task produces no outputs")
             output_file_dict = {_constants.OUTPUT_FILE_NAME: _literal_models.LiteralMap(literals={})}
         elif isinstance(outputs, _literal_models.LiteralMap):
+            offload_threshold = _internal.Literals.COLLECTION_OFFLOAD_THRESHOLD.read()
+            if offload_threshold:
+                outputs = _literal_models.LiteralMap(
+                    literals={
+                        k: ListTransformer.offload_collections(ctx, v, offload_threshold)
+                        for k, v in outputs.literals.items()
+                    }
+                )
             output_file_dict = {_constants.OUTPUT_FILE_NAME: outputs}
         elif isinstance(outputs, _dynamic_job.DynamicJobSpec):
             output_file_dict = {_constants.FUTURES_FILE_NAME: outputs}
@@ -215,7 +229,16 @@ def setup_execution(
 
     checkpointer = None
     if checkpoint_path is not None:
-        checkpointer = SyncCheckpoint(checkpoint_dest=checkpoint_path, checkpoint_src=prev_checkpoint)
+        chunked = _internal.Checkpoint.CHUNKED.read()
+        kwargs = {}
+        if chunked:
+            kwargs["chunk_size"] = _internal.Checkpoint.CHUNK_SIZE.read() or ChunkedCheckpoint.DEFAULT_CHUNK_SIZE
+        if _internal.Checkpoint.ASYNC.read():
+            checkpoint_cls = AsyncChunkedCheckpoint if chunked else AsyncCheckpoint
+            kwargs["max_inflight_bytes"] = _internal.Checkpoint.MAX_INFLIGHT_BYTES.read()
+        else:
+            checkpoint_cls = ChunkedCheckpoint if chunked else SyncCheckpoint
+        checkpointer = checkpoint_cls(checkpoint_dest=checkpoint_path, checkpoint_src=prev_checkpoint, **kwargs)
         logger.debug(f"Checkpointer created with source {prev_checkpoint} and dest {checkpoint_path}")
 
     execution_parameters = ExecutionParameters(
@@ -255,7 +278,9 @@ def setup_execution(
         logger.error(f"No data plugin found for raw output prefix {raw_output_data_prefix}")
         raise
 
-    es = ctx.new_execution_state().with_params(
+    # Every execution gets its own working directory, warm workers run many of them and everything left in the
+    # engine dir is uploaded to the output prefix.
+    es = ctx.new_execution_state(working_dir=file_access.get_random_local_directory()).with_params(
         mode=ExecutionState.Mode.TASK_EXECUTION,
         user_space_params=execution_parameters,
     )
@@ -276,7 +301,15 @@ def setup_execution(
         cb = cb.with_serialization_settings(ssb.build())
 
     with FlyteContextManager.with_context(cb) as ctx:
-        yield ctx
+        try:
+            yield ctx
+        finally:
+            # Whether the task succeeded or not, the last checkpoint has to be persisted for the next attempt
+            if isinstance(checkpointer, AsyncCheckpoint):
+                try:
+                    checkpointer.close()
+                except Exception as e:
+                    logger.error(f"Failed to upload the last checkpoint to {checkpoint_path}: {e}")
 
 
 def _handle_annotated_task(
@@ -361,6 +394,7 @@ def _execute_map_task(
     prev_checkpoint: Optional[str] = None,
     dynamic_addl_distro: Optional[str] = None,
     dynamic_dest_dir: Optional[str] = None,
+    batch_size: Optional[int] = None,
 ):
     """
     This function should be called by map task and aws-batch task
@@ -377,6 +411,7 @@ def _execute_map_task(
     :param resolver: The task resolver to use. This needs to be loadable directly from importlib (and thus cannot be
       nested).
     :param resolver_args: Args that will be passed to the aforementioned resolver's load_task function
+    :param batch_size: The number of elements of the inputs processed by every array job, one if unset
     :return:
     """
     if len(resolver_args) < 1:
@@ -390,7 +425,7 @@ def _execute_map_task(
         _task_def = resolver_obj.load_task(loader_args=resolver_args)
         if not isinstance(_task_def, PythonFunctionTask):
             raise Exception("Map tasks cannot be run with instance tasks.")
-        map_task = MapPythonTask(_task_def, max_concurrency)
+        map_task = MapPythonTask(_task_def, max_concurrency, batch_size=batch_size or 1)
 
         task_index = _compute_array_job_index()
         output_prefix = os.path.join(output_prefix, str(task_index))
@@ -406,6 +441,65 @@ def _execute_map_task(
         _handle_annotated_task(ctx, map_task, inputs, output_prefix)
 
 
+def _execute_task_request(task_def: PythonTask, request_line: str, raw_output_data_prefix: Optional[str]) -> str:
+    """
+    Runs one execution of a task loaded once by a warm worker, see ``pyflyte-execute-worker``. The request is a line of
+    JSON with the ``inputs`` and ``output_prefix`` of the execution and optionally its ``raw_output_data_prefix``,
+    ``checkpoint_path``, ``prev_checkpoint`` and ``env``, the environment variables (e.g. the execution identifiers) to
+    set while it runs. Returns a line of JSON with the ``output_prefix`` of the request and its ``status``, and the
+    ``error`` if the request itself could not be run. Failures of the task are reported in the error document written
+    to the output prefix, as usual.
+    """
+    output_prefix = None
+    try:
+        request = json.loads(request_line)
+        output_prefix = request["output_prefix"]
+        with _patched_environ(request.get("env") or {}):
+            raw_prefix, checkpoint_path, prev_checkpoint = normalize_inputs(
+                request.get("raw_output_data_prefix", raw_output_data_prefix),
+                request.get("checkpoint_path"),
+                request.get("prev_checkpoint"),
+            )
+            _execute_loaded_task(
+                task_def, request["inputs"], output_prefix, raw_prefix, checkpoint_path, prev_checkpoint
+            )
+    except Exception as e:
+        logger.error(f"Failed to run execution request {request_line.strip()}: {e}")
+        return json.dumps({"output_prefix": output_prefix, "status": "error", "error": str(e)})
+    return json.dumps({"output_prefix": output_prefix, "status": "done"})
+
+
+@_scopes.system_entry_point
+def _execute_loaded_task(
+    task_def: PythonTask,
+    inputs: str,
+    output_prefix: str,
+    raw_output_data_prefix: Optional[str],
+    checkpoint_path: Optional[str],
+    prev_checkpoint: Optional[str],
+):
+    with setup_execution(raw_output_data_prefix, checkpoint_path, prev_checkpoint) as ctx:
+        try:
+            _handle_annotated_task(ctx, task_def, inputs, output_prefix)
+        finally:
+            # The outputs have been uploaded, don't let the working directories pile up in the worker.
+            shutil.rmtree(ctx.execution_state.working_dir, ignore_errors=True)
+
+
+@contextlib.contextmanager
+def _patched_environ(env: Dict[str, str]):
+    previous = {k: os.environ.get(k) for k in env}
+    os.environ.update(env)
+    try:
+        yield
+    finally:
+        for k, v in previous.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+
+
 def normalize_inputs(
     raw_output_data_prefix: Optional[str], checkpoint_path: Optional[str], prev_checkpoint: Optional[str]
 ):
@@ -507,6 +601,61 @@ def fast_execute_task_cmd(additional_distribution: str, dest_dir: str, task_exec
     subprocess.run(cmd, check=True)
 
 
+@_pass_through.command("pyflyte-execute-worker")
+@_click.option("--raw-output-data-prefix", required=False)
+@_click.option("--socket", "socket_path", required=False, help="Listen on this unix socket instead of stdin")
+@_click.option(
+    "--response-fd",
+    type=int,
+    required=False,
+    help="Write the responses to the requests read from stdin to this file descriptor instead of stdout",
+)
+@_click.option("--resolver", required=True)
+@_click.argument(
+    "resolver-args",
+    type=_click.UNPROCESSED,
+    nargs=-1,
+)
+def execute_worker_cmd(raw_output_data_prefix, socket_path, response_fd, resolver, resolver_args):
+    """
+    Loads a task once and runs the executions requested on stdin, or on the connections to a unix socket, one line of
+    JSON per execution. See _execute_task_request for the format of the requests and of the responses.
+
+    When reading requests from stdin, the responses are the only thing written to stdout (or to --response-fd):
+    whatever the tasks and the loggers write to stdout goes to stderr instead.
+    """
+    logger.info(get_version_message())
+    resolver_obj = load_object_from_module(resolver)
+    task_def = resolver_obj.load_task(loader_args=resolver_args)
+    logger.info(f"Worker loaded task {task_def.name}, waiting for execution requests")
+
+    if socket_path is None:
+        if response_fd is None:
+            sys.stdout.flush()
+            response_fd = os.dup(sys.stdout.fileno())
+            os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+        with os.fdopen(response_fd, "w") as responses:
+            for line in sys.stdin:
+                if line.strip():
+                    responses.write(_execute_task_request(task_def, line, raw_output_data_prefix) + "\n")
+                    responses.flush()
+        return
+
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        server.bind(socket_path)
+        server.listen()
+        logger.info(f"Worker listening on {socket_path}")
+        while True:
+            conn, _ = server.accept()
+            with conn, conn.makefile("rw") as stream:
+                for line in stream:
+                    if line.strip():
+                        stream.write(_execute_task_request(task_def, line, raw_output_data_prefix) + "\n")
+                        stream.flush()
+
+
 @_pass_through.command("pyflyte-map-execute")
 @_click.option("--inputs", required=True)
 @_click.option("--output-prefix", required=True)
@@ -518,6 +667,7 @@ def fast_execute_task_cmd(additional_distribution: str, dest_dir: str, task_exec
 @_click.option("--resolver", required=True)
 @_click.option("--checkpoint-path", required=False)
 @_click.option("--prev-checkpoint", required=False)
+@_click.option("--batch-size", type=int, required=False)
 @_click.argument(
     "resolver-args",
     type=_click.UNPROCESSED,
@@ -535,6 +685,7 @@ def map_execute_task_cmd(
     resolver_args,
     prev_checkpoint,
     checkpoint_path,
+    batch_size,
 ):
     logger.info(get_version_message())
 
@@ -554,6 +705,7 @@ def map_execute_task_cmd(
         resolver_args=resolver_args,
         checkpoint_path=checkpoint_path,
         prev_checkpoint=prev_checkpoint,
+        batch_size=batch_size,
     )
 
 
@@ -19,4 +19,31 @@ def clear_local_cache():
     LocalTaskCache.clear()
 
 
+@click.command("list")
+@click.option("--task", "task_name", required=False, type=str, help="Only list the entries of this task")
+def list_local_cache(task_name: str):
+    """
+    This command lists the number of cached entries and their size, per task and cache version.
+    """
+    summary = {}
+    for entry in LocalTaskCache.entries(task_name):
+        count, size = summary.get((entry.task_name, entry.cache_version), (0, 0))
+        summary[(entry.task_name, entry.cache_version)] = (count + 1, size + entry.size)
+    for (name, version), (count, size) in sorted(summary.items()):
+        click.echo(f"{name}\t{version}\t{count} entries\t{size} bytes")
+
+
+@click.command("evict")
+@click.argument("task_name", type=str)
+@click.option("--version", "cache_version", required=False, type=str, help="Only evict this cache version")
+def evict_local_cache(task_name: str, cache_version: str):
+    """
+    This command removes the cached entries of a single task.
+    """
+    count = LocalTaskCache.evict(task_name, cache_version)
+    click.echo(f"Evicted {count} entries of {task_name}")
+
+
 local_cache.add_command(clear_local_cache)
+local_cache.add_command(list_local_cache)
+local_cache.add_command(evict_local_cache)
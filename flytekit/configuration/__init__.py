@@ -69,6 +69,7 @@ Execution Time Settings
    ~SecretsConfig
    ~S3Config
    ~GCSConfig
+   ~DataTransferConfig
    ~DataConfig
    ~Config
 
@@ -424,6 +425,7 @@ class S3Config(object):
     backoff: datetime.timedelta = datetime.timedelta(seconds=5)
     access_key_id: typing.Optional[str] = None
     secret_access_key: typing.Optional[str] = None
+    max_pool_connections: typing.Optional[int] = None
 
     @classmethod
     def auto(cls, config_file: typing.Union[str, ConfigFile] = None) -> S3Config:
@@ -440,6 +442,7 @@ class S3Config(object):
         kwargs = set_if_exists(kwargs, "backoff", _internal.AWS.BACKOFF_SECONDS.read(config_file))
         kwargs = set_if_exists(kwargs, "access_key_id", _internal.AWS.S3_ACCESS_KEY_ID.read(config_file))
         kwargs = set_if_exists(kwargs, "secret_access_key", _internal.AWS.S3_SECRET_ACCESS_KEY.read(config_file))
+        kwargs = set_if_exists(kwargs, "max_pool_connections", _internal.AWS.MAX_POOL_CONNECTIONS.read(config_file))
         return S3Config(**kwargs)
 
 
@@ -459,6 +462,39 @@ class GCSConfig(object):
         return GCSConfig(**kwargs)
 
 
+@dataclass
+class DataTransferConfig(object):
+    """
+    Configuration of the transfers of whole directories between the local disk and the remote store. Plugins that
+    support it transfer the files of a directory one by one, ``max_concurrency`` of them at a time, retrying each file
+    on its own.
+
+    Attributes:
+        max_concurrency (int): The maximum number of files transferred at the same time.
+        retries (int): The number of times the transfer of a single file is retried before giving up.
+        backoff (datetime.timedelta): The time to wait before the first retry, doubled on every following retry.
+        multipart_chunksize (int): The size in bytes of the parts of the multipart uploads of large files, for the
+            stores that support them. The default of the store is used if not set.
+    """
+
+    max_concurrency: int = 16
+    retries: int = 3
+    backoff: datetime.timedelta = datetime.timedelta(seconds=1)
+    multipart_chunksize: typing.Optional[int] = None
+
+    @classmethod
+    def auto(cls, config_file: typing.Union[str, ConfigFile] = None) -> DataTransferConfig:
+        config_file = get_config_file(config_file)
+        kwargs = {}
+        kwargs = set_if_exists(kwargs, "max_concurrency", _internal.DataTransfer.MAX_CONCURRENCY.read(config_file))
+        kwargs = set_if_exists(kwargs, "retries", _internal.DataTransfer.RETRIES.read(config_file))
+        kwargs = set_if_exists(kwargs, "backoff", _internal.DataTransfer.BACKOFF_SECONDS.read(config_file))
+        kwargs = set_if_exists(
+            kwargs, "multipart_chunksize", _internal.DataTransfer.MULTIPART_CHUNKSIZE.read(config_file)
+        )
+        return DataTransferConfig(**kwargs)
+
+
 @dataclass(init=True, repr=True, eq=True, frozen=True)
 class DataConfig(object):
     """
@@ -469,6 +505,7 @@ class DataConfig(object):
 
     s3: S3Config = S3Config()
     gcs: GCSConfig = GCSConfig()
+    transfer: DataTransferConfig = DataTransferConfig()
 
     @classmethod
     def auto(cls, config_file: typing.Union[str, ConfigFile] = None) -> DataConfig:
@@ -476,6 +513,7 @@ class DataConfig(object):
         return DataConfig(
             s3=S3Config.auto(config_file),
             gcs=GCSConfig.auto(config_file),
+            transfer=DataTransferConfig.auto(config_file),
         )
 
 
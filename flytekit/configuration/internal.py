@@ -36,6 +36,16 @@ class Deck(object):
     DISABLE_DECK = ConfigEntry(LegacyConfigEntry(SECTION, "disable_deck", bool))
 
 
+class Literals(object):
+    SECTION = "literals"
+    COLLECTION_OFFLOAD_THRESHOLD = ConfigEntry(LegacyConfigEntry(SECTION, "collection_offload_threshold", int))
+    """
+    If set, task outputs containing collections of int, float or bool primitives with at least this many elements
+    are written as a single .npy blob instead of one Literal per element. Only flytekit tasks can read these
+    collections back, so this is disabled by default.
+    """
+
+
 class AWS(object):
     SECTION = "aws"
     S3_ENDPOINT = ConfigEntry(LegacyConfigEntry(SECTION, "endpoint"), YamlConfigEntry("storage.connection.endpoint"))
@@ -51,6 +61,11 @@ class AWS(object):
         LegacyConfigEntry(SECTION, "backoff_seconds", datetime.timedelta),
         transform=lambda x: datetime.timedelta(seconds=int(x)),
     )
+    MAX_POOL_CONNECTIONS = ConfigEntry(LegacyConfigEntry(SECTION, "max_pool_connections", int))
+    """
+    Maximum number of connections kept in the connection pool of the S3 client. Raise it when transferring many files
+    concurrently.
+    """
 
 
 class GCP(object):
@@ -58,6 +73,52 @@ class GCP(object):
     GSUTIL_PARALLELISM = ConfigEntry(LegacyConfigEntry(SECTION, "gsutil_parallelism", bool))
 
 
+class DataTransfer(object):
+    SECTION = "data_transfer"
+    MAX_CONCURRENCY = ConfigEntry(LegacyConfigEntry(SECTION, "max_concurrency", int))
+    RETRIES = ConfigEntry(LegacyConfigEntry(SECTION, "retries", int))
+    BACKOFF_SECONDS = ConfigEntry(
+        LegacyConfigEntry(SECTION, "backoff_seconds", datetime.timedelta),
+        transform=lambda x: datetime.timedelta(seconds=int(x)),
+    )
+    MULTIPART_CHUNKSIZE = ConfigEntry(LegacyConfigEntry(SECTION, "multipart_chunksize", int))
+
+
+class StructuredDataset(object):
+    SECTION = "structured_dataset"
+    SHARD_ROWS = ConfigEntry(LegacyConfigEntry(SECTION, "shard_rows", int))
+    """
+    If set, the pandas and Arrow parquet encoders split dataframes into files of at most this many rows.
+    """
+
+    SHARD_BYTES = ConfigEntry(LegacyConfigEntry(SECTION, "shard_bytes", int))
+    """
+    If set, the pandas and Arrow parquet encoders split dataframes into files of roughly this many bytes, measured in
+    memory before compression. Ignored if shard_rows is set.
+    """
+
+    WRITE_CONCURRENCY = ConfigEntry(LegacyConfigEntry(SECTION, "write_concurrency", int))
+    """
+    The maximum number of files written and uploaded at the same time, the number of CPUs by default.
+    """
+
+    COMPRESSION = ConfigEntry(LegacyConfigEntry(SECTION, "compression"))
+    """
+    The compression codec of the parquet files, e.g. snappy (the default), gzip, zstd or none.
+    """
+
+    ROW_GROUP_SIZE = ConfigEntry(LegacyConfigEntry(SECTION, "row_group_size", int))
+    """
+    The maximum number of rows of the row groups of the parquet files.
+    """
+
+    LOCAL_HANDOFF_BYTES = ConfigEntry(LegacyConfigEntry(SECTION, "local_handoff_bytes", int))
+    """
+    During local executions, the pandas DataFrames and Arrow Tables written by a task are kept in memory, up to this
+    many bytes (1 GiB by default), and handed to the tasks consuming them instead of being read back. 0 disables it.
+    """
+
+
 class Credentials(object):
     SECTION = "credentials"
     COMMAND = ConfigEntry(LegacyConfigEntry(SECTION, "command", list), YamlConfigEntry("admin.command", list))
@@ -133,6 +194,86 @@ class LocalSDK(object):
     TODO delete the one from internal config
     """
 
+    MAP_TASK_EXECUTOR = ConfigEntry(LegacyConfigEntry(SECTION, "map_task_executor"))
+    """
+    The executor used to run the instances of a map task during local executions, one of ``serial`` (the default),
+    ``thread`` or ``process``. The thread and process pools run at most ``concurrency`` instances at a time, or as many
+    as there are CPUs if the map task does not limit its concurrency.
+    """
+
+    MAP_TASK_BATCHING = ConfigEntry(LegacyConfigEntry(SECTION, "map_task_batching", bool))
+    """
+    Set this when the array plugin of the Flyte backend launches one job per batch of batched map tasks and
+    concatenates the collections they output. Map tasks with a batch_size greater than 1 can't be serialized otherwise,
+    because the stock array plugins ignore the batch size and would produce outputs of the wrong shape.
+    """
+
+    LOCAL_WORKFLOW_CONCURRENCY = ConfigEntry(LegacyConfigEntry(SECTION, "local_workflow_concurrency", int))
+    """
+    If greater than 1, local executions of workflows run the nodes that do not depend on each other concurrently, this
+    many at most, instead of running the workflow function. Workflows with conditionals are always run one node after
+    the other.
+    """
+
+    TYPE_CONVERSION_CONCURRENCY = ConfigEntry(LegacyConfigEntry(SECTION, "type_conversion_concurrency", int))
+    """
+    If greater than 1, tasks convert their inputs from literals and their outputs to literals on this many threads at
+    most, so that the uploads and downloads of the values overlap. This is a runtime setting, values are converted one
+    after the other by default.
+    """
+
+    PICKLE_COMPRESSION = ConfigEntry(LegacyConfigEntry(SECTION, "pickle_compression"))
+    """
+    Compresses the values that are stored as pickles, with one of ``gzip``, ``bz2``, ``lzma``, ``zstd`` or ``lz4``.
+    The last two need the ``zstandard`` and ``lz4`` packages. Pickles are not compressed by default. This is a runtime
+    setting, compressed pickles are read back whatever the setting is.
+    """
+
+
+class LocalCache(object):
+    SECTION = "local_cache"
+    SIZE_LIMIT = ConfigEntry(LegacyConfigEntry(SECTION, "size_limit", int))
+    """
+    Maximum size in bytes of the local task cache, including the artifacts it stores. Least recently used entries are
+    evicted first. Unlimited by default.
+    """
+
+    TTL_SECONDS = ConfigEntry(LegacyConfigEntry(SECTION, "ttl_seconds", int))
+    """
+    Number of seconds after which a local cache entry expires. Entries never expire by default.
+    """
+
+    MAX_ENTRIES_PER_TASK = ConfigEntry(LegacyConfigEntry(SECTION, "max_entries_per_task", int))
+    """
+    Maximum number of entries stored per task in the local cache, the least recently used ones are evicted first.
+    Unlimited by default.
+    """
+
+
+class Checkpoint(object):
+    SECTION = "checkpoint"
+    ASYNC = ConfigEntry(LegacyConfigEntry(SECTION, "async", bool))
+    """
+    If true, the checkpoints saved by tasks are uploaded in the background, see
+    :py:class:`flytekit.core.checkpointer.AsyncCheckpoint`. This is a runtime setting.
+    """
+
+    MAX_INFLIGHT_BYTES = ConfigEntry(LegacyConfigEntry(SECTION, "max_inflight_bytes", int))
+    """
+    The maximum size of the checkpoints that are waiting to be uploaded in the background. Unlimited by default.
+    """
+
+    CHUNKED = ConfigEntry(LegacyConfigEntry(SECTION, "chunked", bool))
+    """
+    If true, checkpoints are stored as deduplicated chunks and a manifest, see
+    :py:class:`flytekit.core.checkpointer.ChunkedCheckpoint`. This is a runtime setting.
+    """
+
+    CHUNK_SIZE = ConfigEntry(LegacyConfigEntry(SECTION, "chunk_size", int))
+    """
+    The size in bytes of the chunks of chunked checkpoints.
+    """
+
 
 class Secrets(object):
     SECTION = "secrets"
@@ -38,7 +38,7 @@ from flytekit.core.promise import (
     translate_inputs_to_literals,
 )
 from flytekit.core.tracker import TrackedInstance
-from flytekit.core.type_engine import TypeEngine
+from flytekit.core.type_engine import TypeEngine, convert_concurrently
 from flytekit.deck.deck import Deck
 from flytekit.loggers import logger
 from flytekit.models import dynamic_job as _dynamic_job
@@ -251,7 +251,9 @@ class Task(object):
                 logger.info("Cache miss, task will be executed now")
                 outputs_literal_map = self.dispatch_execute(ctx, input_literal_map)
                 # TODO: need `native_inputs`
-                LocalTaskCache.set(self.name, self.metadata.cache_version, input_literal_map, outputs_literal_map)
+                outputs_literal_map = LocalTaskCache.set(
+                    self.name, self.metadata.cache_version, input_literal_map, outputs_literal_map
+                )
                 logger.info(
                     f"Cache set for task named {self.name}, cache version {self.metadata.cache_version} "
                     f"and inputs: {input_literal_map}"
@@ -470,7 +472,10 @@ class PythonTask(TrackedInstance, Task, Generic[T]):
         ) as exec_ctx:
             # TODO We could support default values here too - but not part of the plan right now
             # Translate the input literals to Python native
-            native_inputs = TypeEngine.literal_map_to_kwargs(exec_ctx, input_literal_map, self.python_interface.inputs)
+            max_workers = _internal.LocalSDK.TYPE_CONVERSION_CONCURRENCY.read() or 1
+            native_inputs = TypeEngine.literal_map_to_kwargs(
+                exec_ctx, input_literal_map, self.python_interface.inputs, max_workers=max_workers
+            )
 
             # TODO: Logger should auto inject the current context information to indicate if the task is running within
             #   a workflow or a subworkflow etc
@@ -512,21 +517,23 @@ class PythonTask(TrackedInstance, Task, Generic[T]):
 
             # We manually construct a LiteralMap here because task inputs and outputs actually violate the assumption
             # built into the IDL that all the values of a literal map are of the same type.
-            literals = {}
-            for k, v in native_outputs_as_map.items():
+            def to_literal(k: str) -> _literal_models.Literal:
+                v = native_outputs_as_map[k]
                 literal_type = self._outputs_interface[k].type
                 py_type = self.get_type_for_output_var(k, v)
 
                 if isinstance(v, tuple):
                     raise TypeError(f"Output({k}) in task{self.name} received a tuple {v}, instead of {py_type}")
                 try:
-                    literals[k] = TypeEngine.to_literal(exec_ctx, v, py_type, literal_type)
+                    return TypeEngine.to_literal(exec_ctx, v, py_type, literal_type)
                 except Exception as e:
                     logger.error(f"Failed to convert return value for var {k} with error {type(e)}: {e}")
                     raise TypeError(
                         f"Failed to convert return value for var {k} for function {self.name} with error {type(e)}: {e}"
                     ) from e
 
+            literals = convert_concurrently(to_literal, native_outputs_as_map, max_workers)
+
             INPUT = "input"
             OUTPUT = "output"
 
@@ -1,9 +1,17 @@
+import concurrent.futures
+import hashlib
 import io
+import itertools
+import json
+import shutil
 import tempfile
+import threading
 import typing
 from abc import abstractmethod
 from pathlib import Path
 
+from flytekit.loggers import logger
+
 
 class Checkpoint(object):
     """
@@ -59,6 +67,13 @@ class Checkpoint(object):
         """
         raise NotImplementedError("Use one of the derived classes")
 
+    def flush(self):
+        """
+        Blocks until all the saved checkpoints are persisted. Checkpoints are persisted before save returns, unless
+        they are saved asynchronously.
+        """
+        pass
+
 
 class SyncCheckpoint(Checkpoint):
     """
@@ -66,7 +81,7 @@ class SyncCheckpoint(Checkpoint):
     Sync Checkpoint, will synchronously checkpoint a user given file or folder.
     It will also synchronously download / restore previous checkpoints, when restore is invoked.
 
-    TODO: Implement an async checkpoint system
+    See :py:class:`AsyncCheckpoint` to upload the checkpoints in the background.
     """
 
     SRC_LOCAL_FOLDER = "prev_cp"
@@ -110,7 +125,7 @@ class SyncCheckpoint(Checkpoint):
         if not path.is_dir():
             raise ValueError("Checkpoints can be restored to a directory only.")
 
-        FlyteContextManager.current_context().file_access.download_directory(self._checkpoint_src, str(path))
+        self._download(FlyteContextManager.current_context().file_access, path)
         self._prev_download_path = path
         return self._prev_download_path
 
@@ -120,14 +135,7 @@ class SyncCheckpoint(Checkpoint):
 
         fa = FlyteContextManager.current_context().file_access
         if isinstance(cp, (Path, str)):
-            if isinstance(cp, str):
-                cp = Path(cp)
-            if cp.is_dir():
-                fa.upload_directory(str(cp), self._checkpoint_dest)
-            else:
-                fname = cp.stem + cp.suffix
-                rpath = fa._default_remote.construct_path(False, False, self._checkpoint_dest, fname)
-                fa.upload(str(cp), rpath)
+            self._upload(fa, Path(cp))
             return
 
         if not isinstance(cp, io.IOBase):
@@ -136,10 +144,26 @@ class SyncCheckpoint(Checkpoint):
         p = Path(self._td.name)
         dest_cp = p.joinpath(self.TMP_DST_PATH)
         with dest_cp.open("wb") as f:
-            f.write(cp.read())
+            shutil.copyfileobj(cp, f)
+
+        self._upload(fa, dest_cp)
+
+    def _download(self, fa, path: Path):
+        """
+        Downloads the previous checkpoint to the given directory.
+        """
+        fa.download_directory(self._checkpoint_src, str(path))
 
-        rpath = fa._default_remote.construct_path(False, False, self._checkpoint_dest, self.TMP_DST_PATH)
-        fa.upload(str(dest_cp), rpath)
+    def _upload(self, fa, cp: Path):
+        """
+        Uploads the contents of a checkpoint directory, or a single checkpoint file, to the checkpoint destination.
+        """
+        if cp.is_dir():
+            fa.upload_directory(str(cp), self._checkpoint_dest)
+        else:
+            fname = cp.stem + cp.suffix
+            rpath = fa._default_remote.construct_path(False, False, self._checkpoint_dest, fname)
+            fa.upload(str(cp), rpath)
 
     def read(self) -> typing.Optional[bytes]:
         p = self.restore()
@@ -155,3 +179,328 @@ class SyncCheckpoint(Checkpoint):
         f = io.BytesIO(b)
         f = typing.cast(io.BufferedReader, f)
         self.save(f)
+
+
+class ChunkedCheckpoint(SyncCheckpoint):
+    """
+    This class is NOT THREAD-SAFE!
+    Chunked Checkpoint, splits the files of a checkpoint in chunks named by the hash of their contents and writes a
+    manifest listing the chunks of every file. Only the chunks that were not uploaded before, by this checkpointer or
+    for the previous checkpoint, are uploaded. The manifest refers to the chunks of the previous checkpoint where they
+    are, so the previous checkpoints must be kept as long as the latest one is needed.
+
+    Restoring downloads the chunks that are missing from a local cache directory and reassembles the files. Previous
+    checkpoints written without a manifest are restored like a SyncCheckpoint.
+    """
+
+    MANIFEST = "manifest.json"
+    CHUNKS_FOLDER = "chunks"
+    DEFAULT_CHUNK_SIZE = 16 * 1024 * 1024
+    # The number of chunks uploaded at the same time
+    UPLOAD_CONCURRENCY = 4
+
+    def __init__(
+        self,
+        checkpoint_dest: str,
+        checkpoint_src: typing.Optional[str] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        cache_dir: typing.Optional[typing.Union[Path, str]] = None,
+    ):
+        """
+        Args:
+            checkpoint_src: If a previous checkpoint should exist, this path should be set to the folder that contains the checkpoint information
+            checkpoint_dest: Location where the new checkpoint should be copied to
+            chunk_size: The size in bytes of the chunks the files are split into
+            cache_dir: The directory where the downloaded chunks are kept, a temporary directory by default. Chunks
+              found there are not downloaded again.
+        """
+        super().__init__(checkpoint_dest=checkpoint_dest, checkpoint_src=checkpoint_src)
+        if chunk_size <= 0:
+            raise ValueError(f"chunk_size must be positive, received {chunk_size}")
+        self._chunk_size = chunk_size
+        self._cache_dir = Path(cache_dir) if cache_dir else Path(self._td.name).joinpath(self.CHUNKS_FOLDER)
+        # The remote location of all the chunks known to exist, by hash
+        self._chunks: typing.Optional[typing.Dict[str, str]] = None
+
+    def _remote_path(self, fa, *paths: str) -> str:
+        return fa._default_remote.construct_path(False, False, *paths)
+
+    def _read_manifest(self, fa, checkpoint_path: str) -> typing.Optional[dict]:
+        rpath = self._remote_path(fa, checkpoint_path, self.MANIFEST)
+        if not fa.exists(rpath):
+            return None
+        local_path = fa.get_random_local_path()
+        fa.get_data(rpath, local_path)
+        with open(local_path) as f:
+            return json.load(f)
+
+    @staticmethod
+    def _put_bytes(fa, data: bytes, rpath: str):
+        # We have to lazy load, until we fix the imports
+        from flytekit.core.data_persistence import UnsupportedPersistenceOp
+
+        try:
+            with fa.open(rpath, "wb") as w:
+                w.write(data)
+        except UnsupportedPersistenceOp:
+            local_path = fa.get_random_local_path()
+            Path(local_path).write_bytes(data)
+            try:
+                fa.upload(local_path, rpath)
+            finally:
+                Path(local_path).unlink()
+
+    def _known_chunks(self, fa) -> typing.Dict[str, str]:
+        if self._chunks is None:
+            manifest = self._read_manifest(fa, self._checkpoint_src) if self._checkpoint_src else None
+            self._chunks = dict(manifest["chunks"]) if manifest else {}
+        return self._chunks
+
+    def _download(self, fa, path: Path):
+        manifest = self._read_manifest(fa, self._checkpoint_src)
+        if self._chunks is None:
+            self._chunks = {}
+        if manifest is None:
+            logger.info(f"No manifest found in {self._checkpoint_src}, downloading the whole checkpoint")
+            return super()._download(fa, path)
+
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        chunks = manifest["chunks"]
+        missing = {
+            h for f in manifest["files"].values() for h in f["chunks"] if not self._cache_dir.joinpath(h).exists()
+        }
+        logger.info(f"Downloading {len(missing)} of {len(chunks)} checkpoint chunks from {self._checkpoint_src}")
+        fa.get_data_batch([(chunks[h], str(self._cache_dir.joinpath(h)), False) for h in sorted(missing)])
+
+        for name, f in manifest["files"].items():
+            local_path = path.joinpath(*name.split("/"))
+            local_path.parent.mkdir(parents=True, exist_ok=True)
+            with local_path.open("wb") as out:
+                for h in f["chunks"]:
+                    with self._cache_dir.joinpath(h).open("rb") as chunk:
+                        shutil.copyfileobj(chunk, out)
+        # Later saves do not upload the chunks of the previous checkpoint again
+        self._chunks.update(chunks)
+
+    def _upload(self, fa, cp: Path):
+        known = self._known_chunks(fa)
+        files = [cp] if not cp.is_dir() else sorted(f for f in cp.rglob("*") if f.is_file())
+        manifest: typing.Dict[str, typing.Any] = {"version": 1, "chunk_size": self._chunk_size, "files": {}}
+        new_chunks: typing.Dict[str, str] = {}
+        # New chunks are uploaded as they are read, a few at a time, so that at most that many are held in memory.
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.UPLOAD_CONCURRENCY) as executor:
+            uploads: typing.Set[concurrent.futures.Future] = set()
+            for f in files:
+                name = f.name if f == cp else f.relative_to(cp).as_posix()
+                hashes = []
+                with f.open("rb") as r:
+                    while True:
+                        data = r.read(self._chunk_size)
+                        if not data:
+                            break
+                        h = hashlib.sha256(data).hexdigest()
+                        hashes.append(h)
+                        if h not in known and h not in new_chunks:
+                            if len(uploads) >= self.UPLOAD_CONCURRENCY:
+                                done, uploads = concurrent.futures.wait(
+                                    uploads, return_when=concurrent.futures.FIRST_COMPLETED
+                                )
+                                for u in done:
+                                    u.result()
+                            new_chunks[h] = self._remote_path(fa, self._checkpoint_dest, self.CHUNKS_FOLDER, h)
+                            uploads.add(executor.submit(self._put_bytes, fa, data, new_chunks[h]))
+                manifest["files"][name] = {"size": f.stat().st_size, "chunks": hashes}
+            for u in concurrent.futures.as_completed(uploads):
+                u.result()
+        logger.info(f"Uploaded {len(new_chunks)} new checkpoint chunks to {self._checkpoint_dest}")
+        known.update(new_chunks)
+
+        used = {h for f in manifest["files"].values() for h in f["chunks"]}
+        manifest["chunks"] = {h: known[h] for h in sorted(used)}
+        # The manifest is written last, so that it only ever refers to chunks that exist
+        self._put_bytes(fa, json.dumps(manifest).encode(), self._remote_path(fa, self._checkpoint_dest, self.MANIFEST))
+
+
+class _Snapshot(typing.NamedTuple):
+    # The directory holding the local copy, removed once uploaded
+    root: Path
+    # The copied checkpoint, a file or a directory in root
+    path: Path
+    size: int
+    file_access: typing.Any
+
+
+class AsyncCheckpoint(SyncCheckpoint):
+    """
+    Async Checkpoint, copies the user given file or folder to the local disk when save is invoked and uploads the copy
+    in a background thread, so that the caller can carry on while the checkpoint is uploaded. Restoring previous
+    checkpoints is synchronous.
+
+    Only the latest checkpoint is useful, so a checkpoint that is saved while another one waits to be uploaded
+    replaces it. If ``max_inflight_bytes`` is set, save blocks before copying the new checkpoint while it, the
+    checkpoint being uploaded and the one waiting to be uploaded together are larger than this, to bound the disk used
+    by the local copies. Readers that can't tell their size wait for all the previous checkpoints to be uploaded.
+
+    Errors of the background uploads are raised by the next call to save or flush. Call close to wait for the last
+    checkpoint and stop the background thread.
+    """
+
+    SNAPSHOTS_FOLDER = "_snapshots"
+
+    def __init__(
+        self,
+        checkpoint_dest: str,
+        checkpoint_src: typing.Optional[str] = None,
+        max_inflight_bytes: typing.Optional[int] = None,
+        **kwargs,
+    ):
+        """
+        Args:
+            checkpoint_src: If a previous checkpoint should exist, this path should be set to the folder that contains the checkpoint information
+            checkpoint_dest: Location where the new checkpoint should be copied to
+            max_inflight_bytes: The maximum size of the checkpoints copied locally and not uploaded yet
+        """
+        super().__init__(checkpoint_dest=checkpoint_dest, checkpoint_src=checkpoint_src, **kwargs)
+        self._max_inflight_bytes = max_inflight_bytes
+        self._snapshot_ids = itertools.count()
+        self._cond = threading.Condition()
+        self._pending: typing.Optional[_Snapshot] = None
+        self._uploading: typing.Optional[_Snapshot] = None
+        # The bytes of the checkpoints being copied
+        self._reserved_bytes = 0
+        self._error: typing.Optional[BaseException] = None
+        self._thread: typing.Optional[threading.Thread] = None
+        self._closed = False
+
+    def save(self, cp: typing.Union[Path, str, io.BufferedReader]):
+        # We have to lazy load, until we fix the imports
+        from flytekit.core.context_manager import FlyteContextManager
+
+        if self._closed:
+            raise ValueError("Cannot save a checkpoint after the checkpointer is closed")
+        self._raise_error()
+        size = self._source_size(cp)
+        with self._cond:
+            reserved = 0
+            if self._max_inflight_bytes is not None:
+                reserved = size if size is not None else self._max_inflight_bytes
+                while self._inflight_bytes() > 0 and self._inflight_bytes() + reserved > self._max_inflight_bytes:
+                    self._cond.wait()
+                self._reserved_bytes += reserved
+        try:
+            snapshot = self._snapshot(cp, FlyteContextManager.current_context().file_access)
+        finally:
+            with self._cond:
+                self._reserved_bytes -= reserved
+                self._cond.notify_all()
+        with self._cond:
+            if self._pending is not None:
+                logger.debug(f"Checkpoint {self._pending.path} superseded before being uploaded")
+                shutil.rmtree(self._pending.root, ignore_errors=True)
+            self._pending = snapshot
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="flytekit-checkpoint", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def flush(self):
+        with self._cond:
+            while self._pending is not None or self._uploading is not None:
+                self._cond.wait()
+        self._raise_error()
+
+    def close(self):
+        """
+        Waits for the saved checkpoints to be uploaded and stops the background upload thread.
+        """
+        try:
+            self.flush()
+        finally:
+            with self._cond:
+                self._closed = True
+                self._cond.notify_all()
+            if self._thread is not None:
+                self._thread.join()
+
+    def _inflight_bytes(self) -> int:
+        return (
+            (self._uploading.size if self._uploading is not None else 0)
+            + (self._pending.size if self._pending is not None else 0)
+            + self._reserved_bytes
+        )
+
+    @staticmethod
+    def _source_size(cp: typing.Union[Path, str, io.BufferedReader]) -> typing.Optional[int]:
+        """
+        Returns the size of the checkpoint to copy, or None for a reader that can't tell.
+        """
+        if isinstance(cp, (Path, str)):
+            cp = Path(cp)
+            if cp.is_dir():
+                return sum(f.stat().st_size for f in cp.rglob("*") if f.is_file())
+            return cp.stat().st_size
+        if not isinstance(cp, io.IOBase):
+            raise ValueError(f"Only a valid path or IOBase type (reader) should be provided, received {type(cp)}")
+        if cp.seekable():
+            position = cp.tell()
+            size = cp.seek(0, io.SEEK_END) - position
+            cp.seek(position)
+            return size
+        return None
+
+    def _raise_error(self):
+        with self._cond:
+            error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def _snapshot(self, cp: typing.Union[Path, str, io.BufferedReader], fa) -> _Snapshot:
+        root = Path(self._td.name).joinpath(self.SNAPSHOTS_FOLDER, str(next(self._snapshot_ids)))
+        root.mkdir(parents=True)
+        if isinstance(cp, (Path, str)):
+            cp = Path(cp)
+            path = root.joinpath(cp.name)
+            if cp.is_dir():
+                shutil.copytree(cp, path)
+                size = sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+            else:
+                shutil.copyfile(cp, path)
+                size = path.stat().st_size
+            return _Snapshot(root, path, size, fa)
+
+        if not isinstance(cp, io.IOBase):
+            shutil.rmtree(root, ignore_errors=True)
+            raise ValueError(f"Only a valid path or IOBase type (reader) should be provided, received {type(cp)}")
+
+        path = root.joinpath(self.TMP_DST_PATH)
+        with path.open("wb") as f:
+            shutil.copyfileobj(cp, f)
+        return _Snapshot(root, path, path.stat().st_size, fa)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._pending is None:
+                    return
+                snapshot, self._pending, self._uploading = self._pending, None, self._pending
+            try:
+                self._upload(snapshot.file_access, snapshot.path)
+            except Exception as e:
+                logger.error(f"Failed to upload checkpoint {snapshot.path}: {e}")
+                with self._cond:
+                    self._error = e
+            finally:
+                shutil.rmtree(snapshot.root, ignore_errors=True)
+                with self._cond:
+                    self._uploading = None
+                    self._cond.notify_all()
+
+
+class AsyncChunkedCheckpoint(AsyncCheckpoint, ChunkedCheckpoint):
+    """
+    A :py:class:`ChunkedCheckpoint` uploaded in the background like an :py:class:`AsyncCheckpoint`.
+    """
+
+    pass
@@ -793,6 +793,24 @@ class FlyteContextManager(object):
     def size() -> int:
         return len(flyte_context_Var.get())
 
+    @staticmethod
+    def propagate(fn: typing.Callable) -> typing.Callable:
+        """
+        Wraps the given callable so that it runs with a copy of the current context stack, e.g. in another thread. A
+        thread does not inherit the context of the thread that started it and the context stack must not be mutated by
+        two threads at the same time, so every invocation gets its own copy.
+        """
+        context_list = list(flyte_context_Var.get())
+
+        def _run(*args, **kwargs):
+            token = flyte_context_Var.set(list(context_list))
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                flyte_context_Var.reset(token)
+
+        return _run
+
     @staticmethod
     def initialize():
         """
@@ -22,10 +22,13 @@ simple implementation that ships with the core.
 
 """
 
+import asyncio
+import functools
 import os
 import pathlib
 import re
 import tempfile
+import threading
 import typing
 from abc import abstractmethod
 from distutils import dir_util
@@ -34,6 +37,7 @@ from typing import Dict, Union
 from uuid import UUID
 
 from flytekit.configuration import DataConfig
+from flytekit.core.data_transfer import transfer_files
 from flytekit.core.utils import PerformanceTimer
 from flytekit.exceptions.user import FlyteAssertion
 from flytekit.interfaces.random import random
@@ -49,11 +53,58 @@ class UnsupportedPersistenceOp(Exception):
         super(UnsupportedPersistenceOp, self).__init__(message)
 
 
+async def _run_in_thread(fn: typing.Callable, *args, **kwargs):
+    return await asyncio.get_running_loop().run_in_executor(None, functools.partial(fn, *args, **kwargs))
+
+
+_background_loop: typing.Optional[asyncio.AbstractEventLoop] = None
+_background_loop_pid: typing.Optional[int] = None
+_background_loop_lock = threading.Lock()
+
+
+def _get_background_loop() -> asyncio.AbstractEventLoop:
+    """
+    Returns the event loop running in a daemon thread for the life of the process, starting it the first time. A new
+    one is started in forked processes, which don't inherit the thread.
+    """
+    global _background_loop, _background_loop_pid
+    with _background_loop_lock:
+        if _background_loop is None or _background_loop_pid != os.getpid():
+            _background_loop = asyncio.new_event_loop()
+            _background_loop_pid = os.getpid()
+            threading.Thread(target=_background_loop.run_forever, name="flytekit-data-persistence", daemon=True).start()
+        return _background_loop
+
+
+def _run_until_complete(coro: typing.Coroutine):
+    """
+    Runs the coroutine to completion from synchronous code, on the background event loop. Async filesystems are bound
+    to the loop they are used on, so using the same loop for all the calls lets them reuse their sessions and
+    connections, instead of creating new ones for every call and never closing them.
+    """
+    loop = _get_background_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("Cannot wait for a data persistence coroutine on the loop that runs it")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+
 class DataPersistence(object):
     """
     Base abstract type for all DataPersistence operations. This can be extended using the flytekitplugins architecture
     """
 
+    concurrent_transfers: bool = False
+    """
+    If true, the FileAccessProvider transfers directories one file at a time, using ``listdir`` to find the files to
+    download, and runs many of these transfers concurrently. Plugins that already copy whole directories efficiently
+    should leave this off.
+    """
+
     def __init__(self, name: str, default_prefix: typing.Optional[str] = None, **kwargs):
         self._name = name
         self._default_prefix = default_prefix
@@ -68,7 +119,7 @@ class DataPersistence(object):
 
     def listdir(self, path: str, recursive: bool = False) -> typing.Generator[str, None, None]:
         """
-        Returns true if the given path exists, else false
+        Yields the entries of the given directory, or the paths of all the files under it if recursive is true
         """
         raise UnsupportedPersistenceOp(f"Listing a directory is not supported by the persistence plugin {self.name}")
 
@@ -93,6 +144,31 @@ class DataPersistence(object):
         """
         pass
 
+    def open(self, path: str, mode: str = "rb", **kwargs) -> typing.IO:
+        """
+        Opens the given path as a file-like object, to read it or write it without copying it to the local disk first.
+        Readers should be seekable and only fetch the byte ranges that are read.
+        """
+        raise UnsupportedPersistenceOp(f"Opening a file is not supported by the persistence plugin {self.name}")
+
+    async def aexists(self, path: str) -> bool:
+        """
+        Async version of exists. Plugins without native async support run exists in a thread.
+        """
+        return await _run_in_thread(self.exists, path)
+
+    async def aget(self, from_path: str, to_path: str, recursive: bool = False):
+        """
+        Async version of get. Plugins without native async support run get in a thread.
+        """
+        return await _run_in_thread(self.get, from_path, to_path, recursive=recursive)
+
+    async def aput(self, from_path: str, to_path: str, recursive: bool = False):
+        """
+        Async version of put. Plugins without native async support run put in a thread.
+        """
+        return await _run_in_thread(self.put, from_path, to_path, recursive=recursive)
+
     @abstractmethod
     def construct_path(self, add_protocol: bool, add_prefix: bool, *paths: str) -> str:
         """
@@ -217,6 +293,12 @@ class DiskPersistence(DataPersistence):
     def exists(self, path: str):
         return os.path.exists(self.strip_file_header(path))
 
+    def open(self, path: str, mode: str = "rb", **kwargs) -> typing.IO:
+        path = self.strip_file_header(path)
+        if "r" not in mode:
+            self._make_local_path(os.path.dirname(path))
+        return open(path, mode, **kwargs)
+
     def get(self, from_path: str, to_path: str, recursive: bool = False):
         if from_path != to_path:
             if recursive:
@@ -288,10 +370,19 @@ def split_protocol(urlpath):
     return None, urlpath
 
 
+class PersistenceCacheInfo(typing.NamedTuple):
+    hits: int
+    misses: int
+    currsize: int
+
+
 class FileAccessProvider(object):
     """
     This is the class that is available through the FlyteContext and can be used for persisting data to the remote
     durable store.
+
+    The persistence plugin instances are reused for all the paths of the same protocol and bucket, so that the clients
+    and connection pools they hold are only set up once per provider.
     """
 
     def __init__(
@@ -317,6 +408,10 @@ class FileAccessProvider(object):
         )
         self._raw_output_prefix = raw_output_prefix
         self._data_config = data_config if data_config else DataConfig.auto()
+        self._persistence_cache: Dict[typing.Tuple[typing.Type[DataPersistence], str, str], DataPersistence] = {}
+        self._persistence_cache_lock = threading.Lock()
+        self._persistence_cache_hits = 0
+        self._persistence_cache_misses = 0
 
     @property
     def data_config(self) -> DataConfig:
@@ -378,11 +473,48 @@ class FileAccessProvider(object):
         pathlib.Path(_dir).mkdir(parents=True, exist_ok=True)
         return _dir
 
+    def get_persistence(self, path: str) -> DataPersistence:
+        """
+        Returns the persistence plugin instance to use for the given path. Instances are created with the data config
+        of this provider and shared by all the paths with the same protocol and bucket (or host).
+        """
+        plugin = DataPersistencePlugins.find_plugin(path)
+        protocol, rest = split_protocol(path)
+        bucket = rest.split("/", 1)[0] if protocol else ""
+        key = (plugin, protocol or "file", bucket)
+        with self._persistence_cache_lock:
+            persistence = self._persistence_cache.get(key)
+            if persistence is not None:
+                self._persistence_cache_hits += 1
+                return persistence
+            self._persistence_cache_misses += 1
+            persistence = plugin(data_config=self.data_config)
+            self._persistence_cache[key] = persistence
+            return persistence
+
+    def persistence_cache_info(self) -> PersistenceCacheInfo:
+        """
+        Returns how many times a persistence plugin instance was reused (hits) or created (misses), and how many are
+        currently held by this provider.
+        """
+        return PersistenceCacheInfo(
+            hits=self._persistence_cache_hits,
+            misses=self._persistence_cache_misses,
+            currsize=len(self._persistence_cache),
+        )
+
     def exists(self, path: str) -> bool:
         """
         checks if the given path exists
         """
-        return DataPersistencePlugins.find_plugin(path)().exists(path)
+        return self.get_persistence(path).exists(path)
+
+    def open(self, path: str, mode: str = "rb", **kwargs) -> typing.IO:
+        """
+        Opens the given, possibly remote, path as a file-like object. Reads and writes go directly to the store, see
+        :py:meth:`DataPersistence.open`. Raises UnsupportedPersistenceOp if the persistence plugin cannot do this.
+        """
+        return self.get_persistence(path).open(path, mode, **kwargs)
 
     def download_directory(self, remote_path: str, local_path: str):
         """
@@ -419,10 +551,11 @@ class FileAccessProvider(object):
         try:
             with PerformanceTimer(f"Copying ({remote_path} -> {local_path})"):
                 pathlib.Path(local_path).parent.mkdir(parents=True, exist_ok=True)
-                data_persistence_plugin = DataPersistencePlugins.find_plugin(remote_path)
-                data_persistence_plugin(data_config=self.data_config).get(
-                    remote_path, local_path, recursive=is_multipart
-                )
+                persistence = self.get_persistence(remote_path)
+                if is_multipart and persistence.concurrent_transfers:
+                    self._get_files(persistence, remote_path, local_path)
+                else:
+                    persistence.get(remote_path, local_path, recursive=is_multipart)
         except Exception as ex:
             raise FlyteAssertion(
                 f"Failed to get data from {remote_path} to {local_path} (recursive={is_multipart}).\n\n"
@@ -440,15 +573,157 @@ class FileAccessProvider(object):
         """
         try:
             with PerformanceTimer(f"Writing ({local_path} -> {remote_path})"):
-                DataPersistencePlugins.find_plugin(remote_path)(data_config=self.data_config).put(
-                    local_path, remote_path, recursive=is_multipart
-                )
+                persistence = self.get_persistence(remote_path)
+                if is_multipart and persistence.concurrent_transfers:
+                    self._put_files(persistence, str(local_path), remote_path)
+                else:
+                    persistence.put(local_path, remote_path, recursive=is_multipart)
         except Exception as ex:
             raise FlyteAssertion(
                 f"Failed to put data from {local_path} to {remote_path} (recursive={is_multipart}).\n\n"
                 f"Original exception: {str(ex)}"
             ) from ex
 
+    async def aexists(self, path: str) -> bool:
+        """
+        Async version of exists
+        """
+        return await self.get_persistence(path).aexists(path)
+
+    async def aget_data(self, remote_path: str, local_path: str, is_multipart=False):
+        """
+        Async version of get_data. Files are downloaded with the async support of the persistence plugin if it has
+        any, and in a thread otherwise. Directories are always downloaded in a thread.
+        """
+        if is_multipart:
+            return await _run_in_thread(self.get_data, remote_path, local_path, is_multipart=True)
+        try:
+            pathlib.Path(local_path).parent.mkdir(parents=True, exist_ok=True)
+            await self.get_persistence(remote_path).aget(remote_path, local_path)
+        except Exception as ex:
+            raise FlyteAssertion(
+                f"Failed to get data from {remote_path} to {local_path} (recursive=False).\n\n"
+                f"Original exception: {str(ex)}"
+            ) from ex
+
+    async def aput_data(self, local_path: Union[str, os.PathLike], remote_path: str, is_multipart=False):
+        """
+        Async version of put_data, see aget_data.
+        """
+        if is_multipart:
+            return await _run_in_thread(self.put_data, local_path, remote_path, is_multipart=True)
+        try:
+            await self.get_persistence(remote_path).aput(str(local_path), remote_path)
+        except Exception as ex:
+            raise FlyteAssertion(
+                f"Failed to put data from {local_path} to {remote_path} (recursive=False).\n\n"
+                f"Original exception: {str(ex)}"
+            ) from ex
+
+    async def _agather(self, fn: typing.Callable, transfers: typing.Iterable[typing.Tuple[typing.Any, str, bool]]):
+        semaphore = asyncio.Semaphore(max(1, self.data_config.transfer.max_concurrency))
+
+        async def transfer(from_path, to_path, is_multipart):
+            async with semaphore:
+                return await fn(from_path, to_path, is_multipart=is_multipart)
+
+        return await asyncio.gather(*(transfer(*t) for t in transfers))
+
+    async def aget_data_batch(self, transfers: typing.Iterable[typing.Tuple[str, str, bool]]):
+        """
+        Downloads all the given (remote_path, local_path, is_multipart) concurrently, at most
+        ``data_config.transfer.max_concurrency`` at a time.
+        """
+        return await self._agather(self.aget_data, transfers)
+
+    async def aput_data_batch(self, transfers: typing.Iterable[typing.Tuple[Union[str, os.PathLike], str, bool]]):
+        """
+        Uploads all the given (local_path, remote_path, is_multipart) concurrently, at most
+        ``data_config.transfer.max_concurrency`` at a time.
+        """
+        return await self._agather(self.aput_data, transfers)
+
+    def get_data_batch(self, transfers: typing.Iterable[typing.Tuple[str, str, bool]]):
+        """
+        Blocking version of aget_data_batch, for code that does not run in an event loop, like type transformers.
+        """
+        return _run_until_complete(self.aget_data_batch(transfers))
+
+    def put_data_batch(self, transfers: typing.Iterable[typing.Tuple[Union[str, os.PathLike], str, bool]]):
+        """
+        Blocking version of aput_data_batch, for code that does not run in an event loop, like type transformers.
+        """
+        return _run_until_complete(self.aput_data_batch(transfers))
+
+    def _transfer_files(self, transfer: typing.Callable[[str, str], typing.Any], paths, size, description: str):
+        cfg = self.data_config.transfer
+        stats = transfer_files(
+            transfer,
+            paths,
+            size,
+            max_concurrency=cfg.max_concurrency,
+            retries=cfg.retries,
+            backoff=cfg.backoff,
+        )
+        logger.info(f"{description}: {stats}")
+
+    @staticmethod
+    def _list_files(persistence: DataPersistence, path: str) -> typing.List[typing.Tuple[str, str]]:
+        """
+        Returns the full path and the path relative to the directory, with / separators, of every file under it.
+        """
+
+        def strip_protocol(p: str) -> str:
+            protocol, p = split_protocol(p)
+            # Local listings may return absolute paths for a relative directory
+            return os.path.abspath(p) if protocol in (None, "file") else p
+
+        root = strip_protocol(path.rstrip("/"))
+        files = []
+        for f in persistence.listdir(path, recursive=True):
+            rel = strip_protocol(f)[len(root) :].lstrip("/")
+            if rel:
+                files.append((f, rel.replace(os.sep, "/")))
+        return files
+
+    def list_files(self, path: str) -> typing.List[str]:
+        """
+        Returns the paths, relative to the given directory and separated by /, of all the files under it, without
+        downloading them. Raises UnsupportedPersistenceOp if the persistence plugin cannot list directories.
+        """
+        return [rel for _, rel in self._list_files(self.get_persistence(path), path)]
+
+    def _get_files(self, persistence: DataPersistence, remote_path: str, local_path: str):
+        """
+        Downloads all the files under the remote directory concurrently.
+        """
+        paths = [
+            (remote_file, os.path.join(local_path, *rel.split("/")))
+            for remote_file, rel in self._list_files(persistence, remote_path)
+        ]
+
+        def get(from_path: str, to_path: str):
+            pathlib.Path(to_path).parent.mkdir(parents=True, exist_ok=True)
+            persistence.get(from_path, to_path)
+
+        pathlib.Path(local_path).mkdir(parents=True, exist_ok=True)
+        self._transfer_files(get, paths, lambda _, to_path: os.path.getsize(to_path), f"Copied {remote_path}")
+
+    def _put_files(self, persistence: DataPersistence, local_path: str, remote_path: str):
+        """
+        Uploads all the files under the local directory concurrently.
+        """
+        local_path = DiskPersistence.strip_file_header(local_path)
+        paths = []
+        for root, _, files in os.walk(local_path):
+            for f in files:
+                rel = os.path.relpath(os.path.join(root, f), local_path)
+                paths.append((os.path.join(root, f), f"{remote_path.rstrip('/')}/{rel.replace(os.sep, '/')}"))
+
+        self._transfer_files(
+            persistence.put, paths, lambda from_path, _: os.path.getsize(from_path), f"Wrote {remote_path}"
+        )
+
 
 DataPersistencePlugins.register_plugin("file://", DiskPersistence)
 DataPersistencePlugins.register_plugin("/", DiskPersistence)
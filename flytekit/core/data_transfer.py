@@ -0,0 +1,100 @@
+"""
+Transfers many files between the local disk and a remote store concurrently. This is used to upload and download
+directories with many files, where transferring one file after the other is dominated by the latency of each request.
+"""
+import concurrent.futures
+import datetime
+import time
+import typing
+from dataclasses import dataclass
+
+from flytekit.loggers import logger
+
+
+@dataclass
+class TransferStats(object):
+    """
+    Aggregate statistics of a batch of file transfers.
+    """
+
+    files: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+    retries: int = 0
+
+    @property
+    def throughput(self) -> float:
+        """
+        Bytes transferred per second.
+        """
+        return self.bytes / self.seconds if self.seconds > 0 else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.files} files, {self.bytes} bytes in {self.seconds:.2f}s "
+            f"({self.throughput / 2**20:.2f} MiB/s, {self.retries} retries)"
+        )
+
+
+def _transfer_with_retries(
+    transfer: typing.Callable[[str, str], typing.Any],
+    from_path: str,
+    to_path: str,
+    retries: int,
+    backoff: datetime.timedelta,
+) -> int:
+    """
+    Runs the transfer of a single file, retrying it with an exponential backoff. Returns the number of retries.
+    """
+    attempt = 0
+    while True:
+        try:
+            transfer(from_path, to_path)
+            return attempt
+        except Exception as e:
+            if attempt >= retries:
+                raise
+            delay = backoff.total_seconds() * 2**attempt
+            logger.warning(f"Transfer of {from_path} to {to_path} failed with {e}, retrying in {delay}s")
+            time.sleep(delay)
+            attempt += 1
+
+
+def transfer_files(
+    transfer: typing.Callable[[str, str], typing.Any],
+    paths: typing.Iterable[typing.Tuple[str, str]],
+    size: typing.Callable[[str, str], int],
+    max_concurrency: int = 1,
+    retries: int = 0,
+    backoff: datetime.timedelta = datetime.timedelta(seconds=1),
+) -> TransferStats:
+    """
+    Calls ``transfer(from_path, to_path)`` for each pair of paths, at most ``max_concurrency`` of them at the same time.
+    Every transfer is retried on its own, and the first one that fails ``retries`` times cancels the remaining ones
+    and is raised.
+
+    :param transfer: Copies a single file, e.g. the get or put method of a DataPersistence plugin.
+    :param paths: The (from_path, to_path) pairs of the files to transfer.
+    :param size: Returns the size in bytes of a transferred file, given the same pair of paths. Only used for the
+        statistics, so it should look at the local copy of the file.
+    :param max_concurrency: The maximum number of concurrent transfers.
+    :param retries: The number of times a failed transfer is retried.
+    :param backoff: The time to wait before the first retry of a file, doubled on every following retry.
+    """
+    stats = TransferStats()
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as executor:
+        futures = {}
+        for pair in paths:
+            futures[executor.submit(_transfer_with_retries, transfer, *pair, retries, backoff)] = pair
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                stats.retries += future.result()
+                stats.files += 1
+                stats.bytes += size(*futures[future])
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+    stats.seconds = time.perf_counter() - start
+    return stats
@@ -212,10 +212,11 @@ def transform_interface_to_typed_interface(
     return _interface_models.TypedInterface(inputs_map, outputs_map)
 
 
-def transform_types_to_list_of_type(m: Dict[str, type]) -> Dict[str, type]:
+def transform_types_to_list_of_type(m: Dict[str, type], optional: bool = False) -> Dict[str, type]:
     """
     Converts a given variables to be collections of their type. This is useful for array jobs / map style code.
-    It will create a collection of types even if any one these types is not a collection type
+    It will create a collection of types even if any one these types is not a collection type. If optional is set, the
+    elements of the collections are made optional.
     """
     if m is None:
         return {}
@@ -232,17 +233,18 @@ def transform_types_to_list_of_type(m: Dict[str, type]) -> Dict[str, type]:
 
     om = {}
     for k, v in m.items():
-        om[k] = typing.List[v]
+        om[k] = typing.List[typing.Optional[v]] if optional else typing.List[v]  # type: ignore
     return om  # type: ignore
 
 
-def transform_interface_to_list_interface(interface: Interface) -> Interface:
+def transform_interface_to_list_interface(interface: Interface, optional_outputs: bool = False) -> Interface:
     """
     Takes a single task interface and interpolates it to an array interface - to allow performing distributed python map
-    like functions
+    like functions. If optional_outputs is set, the elements of the output collections are optional, e.g. because
+    some of the mapped instances are allowed to fail.
     """
     map_inputs = transform_types_to_list_of_type(interface.inputs)
-    map_outputs = transform_types_to_list_of_type(interface.outputs)
+    map_outputs = transform_types_to_list_of_type(interface.outputs, optional=optional_outputs)
 
     return Interface(inputs=map_inputs, outputs=map_outputs)
 
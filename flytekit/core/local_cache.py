@@ -1,55 +1,214 @@
-import base64
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+import typing
 from typing import Optional
 
-import cloudpickle
 from diskcache import Cache
+from flyteidl.core import literals_pb2 as _literals_pb2
 
-from flytekit.models.literals import Literal, LiteralCollection, LiteralMap
+from flytekit.configuration import internal as _internal
+from flytekit.core.data_persistence import DiskPersistence, FileAccessProvider
+from flytekit.loggers import logger
+from flytekit.models.literals import Literal, LiteralMap
 
 # Location on the filesystem where serialized objects will be stored
 # TODO: read from config
 CACHE_LOCATION = "~/.flyte/local-cache"
 
 
-def _recursive_hash_placement(literal: Literal) -> Literal:
+class LocalCacheEntry(typing.NamedTuple):
+    task_name: str
+    cache_version: str
+    digest: str
+    size: int
+    stored_at: float
+    last_accessed: float
+
+
+class _CachedOutputs(typing.NamedTuple):
+    serialized: bytes
+    # Digests of the artifact trees referenced by the outputs
+    trees: typing.Tuple[str, ...]
+    # Size of the serialized outputs plus the size of the referenced artifacts
+    size: int
+    stored_at: float
+    last_accessed: float
+
+
+def _update_digest(digest: "hashlib._Hash", data: bytes):
+    # Length-prefix every chunk so that the boundaries between chunks are part of what is hashed
+    digest.update(len(data).to_bytes(8, "big"))
+    digest.update(data)
+
+
+def _digest_literal(digest: "hashlib._Hash", literal: Literal):
     if literal.collection is not None:
-        literals = [_recursive_hash_placement(literal) for literal in literal.collection.literals]
-        return Literal(collection=LiteralCollection(literals=literals))
+        _update_digest(digest, b"collection")
+        _update_digest(digest, str(len(literal.collection.literals)).encode())
+        for lit in literal.collection.literals:
+            _digest_literal(digest, lit)
     elif literal.map is not None:
-        literal_map = {}
-        for key, literal in literal.map.literals.items():
-            literal_map[key] = _recursive_hash_placement(literal)
-        return Literal(map=LiteralMap(literal_map))
-
-    # Base case
-    if literal.hash is not None:
-        return Literal(hash=literal.hash)
+        _update_digest(digest, b"map")
+        _update_digest(digest, str(len(literal.map.literals)).encode())
+        for key in sorted(literal.map.literals):
+            _update_digest(digest, key.encode())
+            _digest_literal(digest, literal.map.literals[key])
+    # A user-provided hash stands in for the value of the literal, e.g. the uri of a dataframe
+    elif literal.hash is not None:
+        _update_digest(digest, b"hash")
+        _update_digest(digest, literal.hash.encode())
     else:
-        return literal
+        _update_digest(digest, b"scalar")
+        _update_digest(digest, literal.to_flyte_idl().SerializeToString(deterministic=True))
+
+
+def _calculate_cache_key(task_name: str, cache_version: str, input_literal_map: LiteralMap) -> typing.Tuple[str, ...]:
+    """
+    Computes a SHA-256 digest of the inputs by walking the literals, which unlike pickling the whole literal map only
+    depends on the content of the literals. Literals that carry a hash are represented by that hash only.
+    """
+    digest = hashlib.sha256()
+    for key in sorted(input_literal_map.literals):
+        _update_digest(digest, key.encode())
+        _digest_literal(digest, input_literal_map.literals[key])
+    return task_name, cache_version, digest.hexdigest()
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _offloaded_uri_holders(literal: _literals_pb2.Literal) -> typing.Iterator[typing.Any]:
+    """
+    Yields the proto messages, within the given literal, that point at offloaded data through their ``uri`` field.
+    """
+    if literal.HasField("collection"):
+        for lit in literal.collection.literals:
+            yield from _offloaded_uri_holders(lit)
+    elif literal.HasField("map"):
+        for lit in literal.map.literals.values():
+            yield from _offloaded_uri_holders(lit)
+    elif literal.HasField("scalar"):
+        scalar = literal.scalar
+        if scalar.HasField("union"):
+            yield from _offloaded_uri_holders(scalar.union.value)
+        for field in ("blob", "schema", "structured_dataset"):
+            if scalar.HasField(field) and getattr(scalar, field).uri:
+                yield getattr(scalar, field)
+
+
+class _ArtifactStore(object):
+    """
+    Content-addressed store for the files referenced by cached outputs. Every file is stored once under ``objects``,
+    named after its digest, and the files or directories referenced by the outputs are rebuilt under ``trees`` out of
+    hard links to these objects. The paths of the trees only depend on their content, so they are stable across runs.
+    """
+
+    def __init__(self, directory: str):
+        self._objects = os.path.join(directory, "objects")
+        self._trees = os.path.join(directory, "trees")
+        os.makedirs(self._objects, exist_ok=True)
+        os.makedirs(self._trees, exist_ok=True)
+
+    def tree_path(self, tree_digest: str) -> str:
+        return os.path.join(self._trees, tree_digest)
+
+    def _add_object(self, path: str) -> str:
+        digest = _file_digest(path)
+        target = os.path.join(self._objects, digest)
+        if not os.path.exists(target):
+            fd, tmp = tempfile.mkstemp(dir=self._objects)
+            os.close(fd)
+            shutil.copyfile(path, tmp)
+            os.replace(tmp, target)
+        return digest
 
+    def add(self, path: str) -> typing.Tuple[str, str]:
+        """
+        Stores the given local file or directory, and returns the digest of the tree and the path to use in its place.
+        """
+        is_dir = os.path.isdir(path)
+        if is_dir:
+            files = sorted(
+                os.path.relpath(os.path.join(root, f), path) for root, _, names in os.walk(path) for f in names
+            )
+        else:
+            files = [os.path.basename(path)]
+            path = os.path.dirname(path)
 
-def _calculate_cache_key(task_name: str, cache_version: str, input_literal_map: LiteralMap) -> str:
-    # Traverse the literals and replace the literal with a new literal that only contains the hash
-    literal_map_overridden = {}
-    for key, literal in input_literal_map.literals.items():
-        literal_map_overridden[key] = _recursive_hash_placement(literal)
+        manifest = [(rel_path, self._add_object(os.path.join(path, rel_path))) for rel_path in files]
+        tree_digest = hashlib.sha256(repr(manifest).encode()).hexdigest()
+        tree = self.tree_path(tree_digest)
+        if not os.path.exists(tree):
+            tmp = tempfile.mkdtemp(dir=self._trees)
+            for rel_path, digest in manifest:
+                target = os.path.join(tmp, rel_path)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                try:
+                    os.link(os.path.join(self._objects, digest), target)
+                except OSError:
+                    shutil.copyfile(os.path.join(self._objects, digest), target)
+            try:
+                os.rename(tmp, tree)
+            except OSError:
+                # Another process stored the same tree concurrently
+                shutil.rmtree(tmp, ignore_errors=True)
+        return tree_digest, tree if is_dir else os.path.join(tree, files[0])
 
-    # Pickle the literal map and use base64 encoding to generate a representation of it
-    b64_encoded = base64.b64encode(cloudpickle.dumps(LiteralMap(literal_map_overridden)))
-    return f"{task_name}-{cache_version}-{b64_encoded}"
+    def size(self, tree_digest: str) -> int:
+        total = 0
+        for root, _, names in os.walk(self.tree_path(tree_digest)):
+            total += sum(os.path.getsize(os.path.join(root, f)) for f in names)
+        return total
+
+    def remove_unreferenced(self, referenced: typing.Set[str]) -> int:
+        removed = 0
+        for tree_digest in os.listdir(self._trees):
+            if tree_digest not in referenced:
+                shutil.rmtree(self.tree_path(tree_digest), ignore_errors=True)
+                removed += 1
+        # Objects that are not hard linked from any tree anymore can be dropped
+        for digest in os.listdir(self._objects):
+            path = os.path.join(self._objects, digest)
+            if os.stat(path).st_nlink <= 1:
+                os.remove(path)
+        return removed
+
+    def clear(self):
+        for d in (self._trees, self._objects):
+            shutil.rmtree(d, ignore_errors=True)
+            os.makedirs(d, exist_ok=True)
 
 
 class LocalTaskCache(object):
     """
     This class implements a persistent store able to cache the result of local task executions.
+
+    Entries are keyed by ``(task name, cache version, input digest)`` and tagged with the task name, which allows to
+    list, size and evict the entries of a single task. Local files and directories referenced by the cached outputs
+    (e.g. FlyteFile, FlyteDirectory, StructuredDataset or numpy blobs) are copied into a content-addressed store
+    managed by the cache, so that cache hits never point at deleted sandbox directories and identical artifacts are
+    only stored once.
+
+    The size of the cache, the time to live of its entries and the number of entries per task can be bounded, see
+    :py:class:`flytekit.configuration.internal.LocalCache`. The least recently used entries are evicted first.
     """
 
     _cache: Cache
+    _artifacts: _ArtifactStore
     _initialized: bool = False
 
     @staticmethod
     def initialize():
-        LocalTaskCache._cache = Cache(CACHE_LOCATION)
+        LocalTaskCache._cache = Cache(CACHE_LOCATION, tag_index=True, eviction_policy="least-recently-used")
+        LocalTaskCache._artifacts = _ArtifactStore(os.path.join(LocalTaskCache._cache.directory, "artifacts"))
         LocalTaskCache._initialized = True
 
     @staticmethod
@@ -57,15 +216,129 @@ class LocalTaskCache(object):
         if not LocalTaskCache._initialized:
             LocalTaskCache.initialize()
         LocalTaskCache._cache.clear()
+        LocalTaskCache._artifacts.clear()
 
     @staticmethod
     def get(task_name: str, cache_version: str, input_literal_map: LiteralMap) -> Optional[LiteralMap]:
         if not LocalTaskCache._initialized:
             LocalTaskCache.initialize()
-        return LocalTaskCache._cache.get(_calculate_cache_key(task_name, cache_version, input_literal_map))
+        key = _calculate_cache_key(task_name, cache_version, input_literal_map)
+        cached, expire_time = LocalTaskCache._cache.get(key, expire_time=True)
+        if not isinstance(cached, _CachedOutputs):
+            return None
+        if not all(os.path.isdir(LocalTaskCache._artifacts.tree_path(t)) for t in cached.trees):
+            # The artifacts the outputs point at are gone, so the entry can't be used anymore
+            LocalTaskCache._cache.delete(key)
+            return None
+
+        now = time.time()
+        LocalTaskCache._cache.set(
+            key,
+            cached._replace(last_accessed=now),
+            expire=None if expire_time is None else max(expire_time - now, 0),
+            tag=task_name,
+        )
+        return LiteralMap.from_flyte_idl(_literals_pb2.LiteralMap.FromString(cached.serialized))
+
+    @staticmethod
+    def set(task_name: str, cache_version: str, input_literal_map: LiteralMap, value: LiteralMap) -> LiteralMap:
+        """
+        Caches the outputs of a task, and returns them as they were stored, i.e. pointing at the artifacts managed by
+        the cache. These should be used downstream, so that the inputs of cached downstream tasks match across runs.
+        """
+        if not LocalTaskCache._initialized:
+            LocalTaskCache.initialize()
+        proto = value.to_flyte_idl()
+        trees = {}
+        for lit in proto.literals.values():
+            for holder in _offloaded_uri_holders(lit):
+                if FileAccessProvider.is_remote(holder.uri):
+                    continue
+                path = DiskPersistence.strip_file_header(holder.uri)
+                if os.path.exists(path):
+                    tree_digest, holder.uri = LocalTaskCache._artifacts.add(path)
+                    trees[tree_digest] = LocalTaskCache._artifacts.size(tree_digest)
+
+        serialized = proto.SerializeToString()
+        now = time.time()
+        LocalTaskCache._cache.add(
+            _calculate_cache_key(task_name, cache_version, input_literal_map),
+            _CachedOutputs(serialized, tuple(trees), sum(trees.values()) + len(serialized), now, now),
+            expire=_internal.LocalCache.TTL_SECONDS.read(),
+            tag=task_name,
+        )
+        LocalTaskCache._enforce_limits(task_name)
+        return LiteralMap.from_flyte_idl(proto)
+
+    @staticmethod
+    def _enforce_limits(task_name: str):
+        evicted = False
+        max_entries = _internal.LocalCache.MAX_ENTRIES_PER_TASK.read()
+        if max_entries:
+            entries = sorted(LocalTaskCache.entries(task_name), key=lambda e: e.last_accessed)
+            for e in entries[: max(len(entries) - max_entries, 0)]:
+                evicted |= LocalTaskCache._cache.delete((e.task_name, e.cache_version, e.digest))
+
+        size_limit = _internal.LocalCache.SIZE_LIMIT.read()
+        if size_limit:
+            entries = sorted(LocalTaskCache.entries(), key=lambda e: e.last_accessed)
+            total = sum(e.size for e in entries)
+            for e in entries:
+                if total <= size_limit:
+                    break
+                logger.debug(f"Evicting local cache entry {e} to honor the size limit of {size_limit} bytes")
+                evicted |= LocalTaskCache._cache.delete((e.task_name, e.cache_version, e.digest))
+                total -= e.size
+
+        if evicted:
+            LocalTaskCache.remove_unreferenced_artifacts()
+
+    @staticmethod
+    def entries(task_name: Optional[str] = None) -> typing.Iterator[LocalCacheEntry]:
+        """
+        Lists the cached entries, optionally only the ones of the given task. The size of an entry includes the size of
+        the artifacts it references, even if they are shared with other entries.
+        """
+        if not LocalTaskCache._initialized:
+            LocalTaskCache.initialize()
+        for key in LocalTaskCache._cache.iterkeys():
+            # Entries written by older versions of flytekit are keyed by a plain string and are skipped
+            if not isinstance(key, tuple) or (task_name is not None and key[0] != task_name):
+                continue
+            cached = LocalTaskCache._cache.get(key)
+            if isinstance(cached, _CachedOutputs):
+                yield LocalCacheEntry(key[0], key[1], key[2], cached.size, cached.stored_at, cached.last_accessed)
+
+    @staticmethod
+    def evict(task_name: str, cache_version: Optional[str] = None) -> int:
+        """
+        Removes the cached entries of the given task, optionally only the ones of one cache version, and returns the
+        number of removed entries. Artifacts that are not referenced by any other entry anymore are removed as well.
+        """
+        if not LocalTaskCache._initialized:
+            LocalTaskCache.initialize()
+        if cache_version is None:
+            count = LocalTaskCache._cache.evict(task_name)
+        else:
+            count = 0
+            for entry in list(LocalTaskCache.entries(task_name)):
+                if entry.cache_version == cache_version:
+                    count += LocalTaskCache._cache.delete((entry.task_name, entry.cache_version, entry.digest))
+        LocalTaskCache.remove_unreferenced_artifacts()
+        return count
 
     @staticmethod
-    def set(task_name: str, cache_version: str, input_literal_map: LiteralMap, value: LiteralMap) -> None:
+    def remove_unreferenced_artifacts() -> int:
+        """
+        Removes the stored artifacts that no cached entry refers to anymore, e.g. after entries expired, and returns
+        how many artifact trees were removed.
+        """
         if not LocalTaskCache._initialized:
             LocalTaskCache.initialize()
-        LocalTaskCache._cache.add(_calculate_cache_key(task_name, cache_version, input_literal_map), value)
+        LocalTaskCache._cache.expire()
+        referenced = set()
+        for key in LocalTaskCache._cache.iterkeys():
+            cached = LocalTaskCache._cache.get(key)
+            if isinstance(cached, _CachedOutputs):
+                referenced.update(cached.trees)
+        return LocalTaskCache._artifacts.remove_unreferenced(referenced)
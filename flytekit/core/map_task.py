@@ -3,13 +3,19 @@ Flytekit map tasks specify how to run a single task across a list of inputs. Map
 a reference task as well as run-time parameters that limit execution concurrency and failure tolerations.
 """
 
+import math
 import os
 import typing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from contextlib import contextmanager
+from functools import lru_cache
 from itertools import count
 from typing import Any, Dict, List, Optional, Type
 
+import cloudpickle
+
 from flytekit.configuration import SerializationSettings
+from flytekit.configuration import internal as _internal
 from flytekit.core import tracker
 from flytekit.core.base_task import PythonTask
 from flytekit.core.constants import SdkTaskType
@@ -17,6 +23,7 @@ from flytekit.core.context_manager import ExecutionState, FlyteContext, FlyteCon
 from flytekit.core.interface import transform_interface_to_list_interface
 from flytekit.core.python_function_task import PythonFunctionTask
 from flytekit.exceptions import scopes as exception_scopes
+from flytekit.loggers import logger
 from flytekit.models.array_job import ArrayJob
 from flytekit.models.interface import Variable
 from flytekit.models.task import Container, K8sPod, Sql
@@ -38,6 +45,7 @@ class MapPythonTask(PythonTask):
         python_function_task: PythonFunctionTask,
         concurrency: int = None,
         min_success_ratio: float = None,
+        batch_size: int = 1,
         **kwargs,
     ):
         """
@@ -45,15 +53,28 @@ class MapPythonTask(PythonTask):
         :param concurrency: If specified, this limits the number of mapped tasks than can run in parallel to the given
         batch size
         :param min_success_ratio: If specified, this determines the minimum fraction of total jobs which can complete
-            successfully before terminating this task and marking it successful.
+            successfully before terminating this task and marking it successful. If less than 1, the outputs are
+            collections of optional values, failed jobs produce None.
+        :param batch_size: The number of consecutive elements of the inputs every array job processes, see
+            :py:func:`map_task`.
         """
+        if batch_size is None or batch_size < 1:
+            raise ValueError(f"The batch size of map tasks must be a positive integer, received {batch_size}")
+        if batch_size > 1 and min_success_ratio is not None and min_success_ratio < 1:
+            # The array plugin counts the failures of whole batches, not of their elements.
+            raise ValueError("Batched map tasks do not support a min_success_ratio less than 1")
+
         if len(python_function_task.python_interface.inputs.keys()) > 1:
             raise ValueError("Map tasks only accept python function tasks with 0 or 1 inputs")
 
         if len(python_function_task.python_interface.outputs.keys()) > 1:
             raise ValueError("Map tasks only accept python function tasks with 0 or 1 outputs")
 
-        collection_interface = transform_interface_to_list_interface(python_function_task.python_interface)
+        # Failed instances produce None when some of them are allowed to fail.
+        collection_interface = transform_interface_to_list_interface(
+            python_function_task.python_interface,
+            optional_outputs=min_success_ratio is not None and min_success_ratio < 1,
+        )
         instance = next(self._ids)
         _, mod, f, _ = tracker.extract_task_module(python_function_task.task_function)
         name = f"{mod}.mapper_{f}_{instance}"
@@ -62,6 +83,7 @@ class MapPythonTask(PythonTask):
         self._run_task = python_function_task
         self._max_concurrency = concurrency
         self._min_success_ratio = min_success_ratio
+        self._batch_size = batch_size
         self._array_task_interface = python_function_task.python_interface
         if "metadata" not in kwargs and python_function_task.metadata:
             kwargs["metadata"] = python_function_task.metadata
@@ -89,6 +111,7 @@ class MapPythonTask(PythonTask):
             "{{.checkpointOutputPrefix}}",
             "--prev-checkpoint",
             "{{.prevCheckpointPrefix}}",
+            *(["--batch-size", str(self._batch_size)] if self._batch_size > 1 else []),
             "--resolver",
             self._run_task.task_resolver.location,
             "--",
@@ -129,12 +152,25 @@ class MapPythonTask(PythonTask):
         return ArrayJob(parallelism=self._max_concurrency, min_success_ratio=self._min_success_ratio).to_dict()
 
     def get_config(self, settings: SerializationSettings) -> Dict[str, str]:
-        return self._run_task.get_config(settings)
+        config = self._run_task.get_config(settings)
+        if self._batch_size > 1:
+            if not _internal.LocalSDK.MAP_TASK_BATCHING.read():
+                raise ValueError(
+                    f"Map task {self.name} has a batch size of {self._batch_size}, which requires an array plugin that"
+                    f" supports batching. Set sdk.map_task_batching if the Flyte backend has one."
+                )
+            # Tells the array plugin to launch one job per batch and to concatenate the collections they output.
+            config = {**(config or {}), "batch_size": str(self._batch_size)}
+        return config
 
     @property
     def run_task(self) -> PythonFunctionTask:
         return self._run_task
 
+    @property
+    def batch_size(self) -> int:
+        return self._batch_size
+
     def execute(self, **kwargs) -> Any:
         ctx = FlyteContextManager.current_context()
         if ctx.execution_state and ctx.execution_state.mode == ExecutionState.Mode.TASK_EXECUTION:
@@ -166,6 +202,9 @@ class MapPythonTask(PythonTask):
         if ctx.execution_state is not None and ctx.execution_state.mode == ExecutionState.Mode.LOCAL_WORKFLOW_EXECUTION:
             # In workflow execution mode we actually need to use the parent (mapper) task output interface.
             return self.interface.outputs
+        if self._batch_size > 1:
+            # Every array job of a batched map task outputs the collection of the outputs of its batch.
+            return self.interface.outputs
         return self._run_task.interface.outputs
 
     def get_type_for_output_var(self, k: str, v: Any) -> Optional[Type[Any]]:
@@ -179,6 +218,8 @@ class MapPythonTask(PythonTask):
         if ctx.execution_state is not None and ctx.execution_state.mode == ExecutionState.Mode.LOCAL_WORKFLOW_EXECUTION:
             # In workflow execution mode we actually need to use the parent (mapper) task output interface.
             return self._python_interface.outputs[k]
+        if self._batch_size > 1:
+            return self._python_interface.outputs[k]
         return self._run_task._python_interface.outputs[k]
 
     def _execute_map_task(self, ctx: FlyteContext, **kwargs) -> Any:
@@ -187,22 +228,35 @@ class MapPythonTask(PythonTask):
         Flyte platform. Individual instances of the map task, aka array task jobs are passed the full set of inputs but
         only produce a single output based on the map task (array task) instance. The array plugin handler will actually
         create a collection from these individual outputs as the final map task output value.
+
+        Array jobs of batched map tasks process the elements of the batch at their index one after the other, and
+        produce the collection of their outputs.
         """
         task_index = self._compute_array_job_index()
-        map_task_inputs = {}
-        for k in self.interface.inputs.keys():
-            map_task_inputs[k] = kwargs[k][task_index]
-        return exception_scopes.user_entry_point(self._run_task.execute)(**map_task_inputs)
+        if self._batch_size == 1:
+            map_task_inputs = {}
+            for k in self.interface.inputs.keys():
+                map_task_inputs[k] = kwargs[k][task_index]
+            return exception_scopes.user_entry_point(self._run_task.execute)(**map_task_inputs)
+
+        batch = slice(task_index * self._batch_size, (task_index + 1) * self._batch_size)
+        batch_inputs = {k: kwargs[k][batch] for k in self.interface.inputs.keys()}
+        outputs = []
+        for i in range(len(next(iter(batch_inputs.values()), []))):
+            o = exception_scopes.user_entry_point(self._run_task.execute)(**{k: v[i] for k, v in batch_inputs.items()})
+            outputs.append(o)
+        return outputs if self.interface.outputs else None
 
     def _raw_execute(self, **kwargs) -> Any:
         """
         This is called during locally run executions. Unlike array task execution on the Flyte platform, _raw_execute
-        produces the full output collection.
+        produces the full output collection. Depending on the ``sdk.map_task_executor`` setting, the instances run one
+        after the other or in a thread or process pool of at most ``concurrency`` workers. Either way the outputs are
+        in the order of the inputs, and failed instances produce None as long as ``min_success_ratio`` is satisfied.
         """
         outputs_expected = True
         if not self.interface.outputs:
             outputs_expected = False
-        outputs = []
 
         any_input_key = (
             list(self._run_task.interface.inputs.keys())[0]
@@ -210,18 +264,90 @@ class MapPythonTask(PythonTask):
             else None
         )
 
+        instances_inputs = []
         for i in range(len(kwargs[any_input_key])):
             single_instance_inputs = {}
             for k in self.interface.inputs.keys():
                 single_instance_inputs[k] = kwargs[k][i]
-            o = exception_scopes.user_entry_point(self._run_task.execute)(**single_instance_inputs)
-            if outputs_expected:
-                outputs.append(o)
+            instances_inputs.append(single_instance_inputs)
+
+        executor = (_internal.LocalSDK.MAP_TASK_EXECUTOR.read() or "serial").lower()
+        if executor not in ("serial", "thread", "process"):
+            raise ValueError(f"Unknown map task executor {executor}, expected one of serial, thread or process")
+        if executor == "serial" or len(instances_inputs) <= 1:
+            results = (
+                self._run_instance(exception_scopes.user_entry_point(self._run_task.execute), inputs)
+                for inputs in instances_inputs
+            )
+            outputs = self._collect_outputs(results, len(instances_inputs))
+        else:
+            max_workers = min(self._max_concurrency or os.cpu_count() or 1, len(instances_inputs))
+            if executor == "thread":
+                pool = ThreadPoolExecutor(max_workers=max_workers)
+                futures = [
+                    pool.submit(FlyteContextManager.propagate(self._run_task.execute), **inputs)
+                    for inputs in instances_inputs
+                ]
+            else:
+                pool = ProcessPoolExecutor(max_workers=max_workers)
+                payload = cloudpickle.dumps(self._run_task)
+                futures = [pool.submit(_execute_in_process, payload, inputs) for inputs in instances_inputs]
+            try:
+                # The results are read back in order on this thread, so that the errors raised by the instances are
+                # scoped as user errors just like in the serial case.
+                results = (
+                    self._run_instance(exception_scopes.user_entry_point(future.result), {}) for future in futures
+                )
+                outputs = self._collect_outputs(results, len(instances_inputs))
+            finally:
+                for future in futures:
+                    future.cancel()
+                pool.shutdown(wait=True)
+
+        return outputs if outputs_expected else []
 
+    @staticmethod
+    def _run_instance(fn: typing.Callable, inputs: Dict[str, Any]) -> typing.Tuple[Any, Optional[BaseException]]:
+        try:
+            return fn(**inputs), None
+        except Exception as e:
+            return None, e
+
+    def _collect_outputs(self, results: typing.Iterable[typing.Tuple[Any, Optional[BaseException]]], total: int):
+        """
+        Collects the outputs of the instances in order. Failed instances produce None, until there are more failures
+        than ``min_success_ratio`` allows, in which case the error of that instance is raised.
+        """
+        min_successes = math.ceil(total * (self._min_success_ratio if self._min_success_ratio is not None else 1.0))
+        failures = 0
+        outputs = []
+        for o, error in results:
+            if error is not None:
+                failures += 1
+                if total - failures < min_successes:
+                    raise error
+                logger.warning(f"Instance {len(outputs)} of {self.name} failed, its output is None: {error}")
+            outputs.append(o)
         return outputs
 
 
-def map_task(task_function: PythonFunctionTask, concurrency: int = 0, min_success_ratio: float = 1.0, **kwargs):
+def _execute_in_process(payload: bytes, inputs: Dict[str, Any]) -> Any:
+    return _load_task(payload).execute(**inputs)
+
+
+@lru_cache(maxsize=1)
+def _load_task(payload: bytes) -> PythonFunctionTask:
+    # Every process of the pool runs instances of the same task, so it is only unpickled once per process.
+    return cloudpickle.loads(payload)
+
+
+def map_task(
+    task_function: PythonFunctionTask,
+    concurrency: int = 0,
+    min_success_ratio: float = 1.0,
+    batch_size: int = 1,
+    **kwargs,
+):
     """
     Use a map task for parallelizable tasks that run across a list of an input type. A map task can be composed of
     any individual :py:class:`flytekit.PythonFunctionTask`.
@@ -262,13 +388,27 @@ def map_task(task_function: PythonFunctionTask, concurrency: int = 0, min_succes
     :param task_function: This argument is implicitly passed and represents the repeatable function
     :param concurrency: If specified, this limits the number of mapped tasks than can run in parallel to the given batch
         size. If the size of the input exceeds the concurrency value, then multiple batches will be run serially until
-        all inputs are processed. If left unspecified, this means unbounded concurrency.
+        all inputs are processed. If left unspecified, this means unbounded concurrency. Local executions honor it
+        when ``sdk.map_task_executor`` is set to ``thread`` or ``process``.
     :param min_success_ratio: If specified, this determines the minimum fraction of total jobs which can complete
-        successfully before terminating this task and marking it successful.
+        successfully before terminating this task and marking it successful. If less than 1, the outputs are
+        collections of optional values, failed jobs produce None.
+    :param batch_size: If greater than 1, every array job processes this many consecutive elements of the inputs,
+        one after the other, and outputs the collection of their outputs. This amortizes the cost of starting a job
+        over many small elements. It requires an array plugin that launches one job per batch and concatenates the
+        collections they output; the batch size is passed to it in the task config. The stock K8s Array and AWS batch
+        plugins don't, so serializing a batched map task fails unless ``sdk.map_task_batching`` is set. Batched map
+        tasks can't have a ``min_success_ratio`` less than 1.
 
     """
     if not isinstance(task_function, PythonFunctionTask):
         raise ValueError(
             f"Only Flyte python task types are supported in map tasks currently, received {type(task_function)}"
         )
-    return MapPythonTask(task_function, concurrency=concurrency, min_success_ratio=min_success_ratio, **kwargs)
+    return MapPythonTask(
+        task_function,
+        concurrency=concurrency,
+        min_success_ratio=min_success_ratio,
+        batch_size=batch_size,
+        **kwargs,
+    )
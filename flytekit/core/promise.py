@@ -994,7 +994,10 @@ def flyte_entity_call_handler(entity: Union[SupportsNodeCreation], *args, **kwar
                 return None
         return cast(LocallyExecutable, entity).local_execute(ctx, **kwargs)
     else:
-        with FlyteContextManager.with_context(
+        # We have to lazy load, until we fix the imports
+        from flytekit.types.structured.structured_dataset import _local_dataframes
+
+        with _local_dataframes.scope(), FlyteContextManager.with_context(
             ctx.with_execution_state(
                 ctx.new_execution_state().with_params(mode=ExecutionState.Mode.LOCAL_WORKFLOW_EXECUTION)
             )
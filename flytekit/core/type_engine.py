@@ -1,13 +1,18 @@
 from __future__ import annotations
 
 import collections
+import concurrent.futures
 import dataclasses
 import datetime as _datetime
 import enum
+import importlib
 import inspect
 import json as _json
 import mimetypes
+import pathlib
+import sys
 import textwrap
+import threading
 import typing
 from abc import ABC, abstractmethod
 from functools import lru_cache
@@ -25,7 +30,7 @@ from marshmallow_jsonschema import JSONSchema
 from typing_extensions import Annotated, get_args, get_origin
 
 from flytekit.core.annotation import FlyteAnnotation
-from flytekit.core.context_manager import FlyteContext
+from flytekit.core.context_manager import FlyteContext, FlyteContextManager
 from flytekit.core.hash import HashMethod
 from flytekit.core.type_helpers import load_type_from_tag
 from flytekit.exceptions import user as user_exceptions
@@ -50,6 +55,7 @@ from flytekit.models.literals import (
 from flytekit.models.types import LiteralType, SimpleType, StructuredDatasetType, TypeStructure, UnionType
 
 T = typing.TypeVar("T")
+_NoneType = type(None)
 DEFINITIONS = "definitions"
 
 
@@ -549,6 +555,29 @@ class ProtobufTransformer(TypeTransformer[_proto_reflection.GeneratedProtocolMes
         raise ValueError(f"Transformer {self} cannot reverse {literal_type}")
 
 
+def convert_concurrently(
+    convert: typing.Callable[[str], typing.Any], names: typing.Iterable[str], max_workers: int = 1
+) -> typing.Dict[str, typing.Any]:
+    """
+    Calls ``convert`` for every variable name and returns the results by name, in the same order. If ``max_workers`` is
+    greater than 1, the conversions run on that many threads at most, each with a copy of the current flyte context.
+    All the conversions are run to completion, and if several fail the error of the first variable in order is raised,
+    so the error reported does not depend on the order in which the conversions finish.
+    """
+    names = list(names)
+    if max_workers <= 1 or len(names) <= 1:
+        return {n: convert(n) for n in names}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(max_workers, len(names))) as executor:
+        futures = {n: executor.submit(FlyteContextManager.propagate(convert), n) for n in names}
+    return {n: f.result() for n, f in futures.items()}
+
+
+class TransformerCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    currsize: int
+
+
 class TypeEngine(typing.Generic[T]):
     """
     Core Extensible TypeEngine of Flytekit. This should be used to extend the capabilities of FlyteKits type system.
@@ -559,6 +588,21 @@ class TypeEngine(typing.Generic[T]):
     _REGISTRY: typing.Dict[type, TypeTransformer[T]] = {}
     _RESTRICTED_TYPES: typing.List[type] = []
     _DATACLASS_TRANSFORMER: TypeTransformer = DataclassTransformer()
+    # Least recently used first. Bounded, since types created on the fly (FlyteFile["csv"], Annotated variants...) would
+    # otherwise be kept alive forever.
+    _TRANSFORMER_CACHE: "collections.OrderedDict[type, TypeTransformer[T]]" = collections.OrderedDict()
+    _TRANSFORMER_CACHE_MAXSIZE: int = 1024
+    _TRANSFORMER_CACHE_HITS: int = 0
+    _TRANSFORMER_CACHE_MISSES: int = 0
+    # Modules registering the transformers of types backed by heavy packages (numpy, pandas, pyarrow...). They are
+    # imported the first time a type cannot be resolved with the transformers registered so far.
+    _LAZY_TRANSFORMER_MODULES: typing.List[str] = [
+        "flytekit.types.numpy",
+        "flytekit.types.schema",
+        "flytekit.types.structured",
+    ]
+    _LAZY_TRANSFORMERS_LOADED: bool = False
+    _LAZY_TRANSFORMERS_LOCK = threading.RLock()
 
     @classmethod
     def register(
@@ -578,6 +622,7 @@ class TypeEngine(typing.Generic[T]):
                     f" Cannot override with {transformer.name}"
                 )
             cls._REGISTRY[t] = transformer
+        cls._TRANSFORMER_CACHE.clear()
 
     @classmethod
     def register_restricted_type(
@@ -592,6 +637,7 @@ class TypeEngine(typing.Generic[T]):
     def register_additional_type(cls, transformer: TypeTransformer, additional_type: Type, override=False):
         if additional_type not in cls._REGISTRY or override:
             cls._REGISTRY[additional_type] = transformer
+            cls._TRANSFORMER_CACHE.clear()
 
     @classmethod
     def get_transformer(cls, python_type: Type) -> TypeTransformer[T]:
@@ -611,13 +657,66 @@ class TypeEngine(typing.Generic[T]):
             if v is of type data class, use the dataclass transformer
 
         Step 4:
-            Walk the inheritance hierarchy of v and find a transformer that matches the first base class.
-            This is potentially non-deterministic - will depend on the registration pattern.
+            Walk the method resolution order of v (and then of its metaclass) and pick the transformer registered for
+            the first, i.e. most specific, base class. If nothing matches, fall back to ``isinstance``/``issubclass``
+            checks against every registered type in registration order, to cover virtual subclasses of ABCs.
+
+        Resolved transformers are memoized per python type (including parameterized generics and ``Annotated`` types)
+        until the registry changes, keeping the most recently used ones. Use :py:meth:`transformer_cache_info` to inspect the hit/miss counters.
+        """
+        try:
+            transformer = cls._TRANSFORMER_CACHE.get(python_type)
+        except TypeError:
+            # Unhashable types, e.g. Annotated[int, {"a": 1}], are resolved every time.
+            return cls._resolve_transformer_or_import(python_type)
+
+        if transformer is not None:
+            cls._TRANSFORMER_CACHE_HITS += 1
+            try:
+                cls._TRANSFORMER_CACHE.move_to_end(python_type)
+            except KeyError:
+                # Evicted or cleared by another thread in the meantime.
+                pass
+            return transformer
+
+        cls._TRANSFORMER_CACHE_MISSES += 1
+        transformer = cls._resolve_transformer_or_import(python_type)
+        cls._TRANSFORMER_CACHE[python_type] = transformer
+        while len(cls._TRANSFORMER_CACHE) > cls._TRANSFORMER_CACHE_MAXSIZE:
+            try:
+                cls._TRANSFORMER_CACHE.popitem(last=False)
+            except KeyError:
+                break
+        return transformer
 
-            TODO lets make this deterministic by using an ordered dict
+    @classmethod
+    def _resolve_transformer_or_import(cls, python_type: Type) -> TypeTransformer[T]:
+        try:
+            return cls._resolve_transformer(python_type)
+        except ValueError:
+            if cls._LAZY_TRANSFORMERS_LOADED:
+                raise
+        cls.lazy_import_transformers()
+        return cls._resolve_transformer(python_type)
 
+    @classmethod
+    def lazy_import_transformers(cls):
+        """
+        Imports the modules that register the transformers of the types backed by heavy packages, like numpy arrays
+        and dataframes, unless it was done already. This is done on demand so that importing flytekit stays cheap.
         """
+        with cls._LAZY_TRANSFORMERS_LOCK:
+            if cls._LAZY_TRANSFORMERS_LOADED:
+                return
+            cls._LAZY_TRANSFORMERS_LOADED = True
+            for module in cls._LAZY_TRANSFORMER_MODULES:
+                try:
+                    importlib.import_module(module)
+                except ImportError as e:
+                    logger.debug(f"Not registering the transformers of {module}: {e}")
 
+    @classmethod
+    def _resolve_transformer(cls, python_type: Type) -> TypeTransformer[T]:
         # Step 1
         if get_origin(python_type) is Annotated:
             python_type = get_args(python_type)[0]
@@ -641,8 +740,18 @@ class TypeEngine(typing.Generic[T]):
         if dataclasses.is_dataclass(python_type):
             return cls._DATACLASS_TRANSFORMER
 
+        # Step 4
         # To facilitate cases where users may specify one transformer for multiple types that all inherit from one
-        # parent.
+        # parent. Classes are matched through their own MRO first, and then through the MRO of their metaclass, e.g.
+        # generated protobuf messages are instances of GeneratedProtocolMessageType.
+        if inspect.isclass(python_type):
+            for base_type in inspect.getmro(python_type)[1:]:
+                if base_type in cls._REGISTRY:
+                    return cls._REGISTRY[base_type]
+        for base_type in inspect.getmro(type(python_type)):
+            if base_type in cls._REGISTRY:
+                return cls._REGISTRY[base_type]
+
         for base_type in cls._REGISTRY.keys():
             if base_type is None:
                 continue  # None is actually one of the keys, but isinstance/issubclass doesn't work on it
@@ -657,6 +766,26 @@ class TypeEngine(typing.Generic[T]):
                 logger.debug(f"Invalid base type {base_type} in call to isinstance", exc_info=True)
         raise ValueError(f"Type {python_type} not supported currently in Flytekit. Please register a new transformer")
 
+    @classmethod
+    def transformer_cache_info(cls) -> TransformerCacheInfo:
+        """
+        Returns the hit/miss counters and the current size of the transformer resolution cache.
+        """
+        return TransformerCacheInfo(
+            hits=cls._TRANSFORMER_CACHE_HITS,
+            misses=cls._TRANSFORMER_CACHE_MISSES,
+            currsize=len(cls._TRANSFORMER_CACHE),
+        )
+
+    @classmethod
+    def clear_transformer_cache(cls):
+        """
+        Drops every memoized transformer resolution and resets the hit/miss counters.
+        """
+        cls._TRANSFORMER_CACHE.clear()
+        cls._TRANSFORMER_CACHE_HITS = 0
+        cls._TRANSFORMER_CACHE_MISSES = 0
+
     @classmethod
     def to_literal_type(cls, python_type: Type) -> LiteralType:
         """
@@ -744,16 +873,19 @@ class TypeEngine(typing.Generic[T]):
 
     @classmethod
     def literal_map_to_kwargs(
-        cls, ctx: FlyteContext, lm: LiteralMap, python_types: typing.Dict[str, type]
+        cls, ctx: FlyteContext, lm: LiteralMap, python_types: typing.Dict[str, type], max_workers: int = 1
     ) -> typing.Dict[str, typing.Any]:
         """
-        Given a ``LiteralMap`` (usually an input into a task - intermediate), convert to kwargs for the task
+        Given a ``LiteralMap`` (usually an input into a task - intermediate), convert to kwargs for the task. The
+        values are converted concurrently on at most ``max_workers`` threads, see :py:func:`convert_concurrently`.
         """
         if len(lm.literals) != len(python_types):
             raise ValueError(
                 f"Received more input values {len(lm.literals)}" f" than allowed by the input spec {len(python_types)}"
             )
-        return {k: TypeEngine.to_python_value(ctx, lm.literals[k], v) for k, v in python_types.items()}
+        return convert_concurrently(
+            lambda k: TypeEngine.to_python_value(ctx, lm.literals[k], python_types[k]), python_types, max_workers
+        )
 
     @classmethod
     def dict_to_literal_map(
@@ -808,6 +940,7 @@ class TypeEngine(typing.Generic[T]):
         """
         Transforms a flyte-specific ``LiteralType`` to a regular python value.
         """
+        cls.lazy_import_transformers()
         for _, transformer in cls._REGISTRY.items():
             try:
                 return transformer.guess_python_type(flyte_type)
@@ -828,6 +961,10 @@ class ListTransformer(TypeTransformer[T]):
     Transformer that handles a univariate typing.List[T]
     """
 
+    OFFLOADED_COLLECTION_FORMAT = "OffloadedCollection"
+    # Primitive fields of the collections that can be offloaded into a single .npy blob, and their numpy dtype
+    _OFFLOADABLE_PRIMITIVES = {"integer": "int64", "float_value": "float64", "boolean": "bool"}
+
     def __init__(self):
         super().__init__("Typed List", list)
 
@@ -858,21 +995,166 @@ class ListTransformer(TypeTransformer[T]):
         except Exception as e:
             raise ValueError(f"Type of Generic List type is not supported, {e}")
 
+    @staticmethod
+    def _simple_element_transformer(t: Type[T]) -> Optional[SimpleTransformer]:
+        """
+        Returns the element transformer if the elements are plain primitives (int, float, str, bool, datetime...) that
+        can be converted in bulk, without going through the TypeEngine for every single element.
+        """
+        try:
+            transformer = TypeEngine.get_transformer(t)
+        except ValueError:
+            return None
+        if type(transformer) is SimpleTransformer and transformer.python_type is t:
+            return transformer
+        return None
+
+    @staticmethod
+    def _is_ndarray(v: typing.Any) -> bool:
+        # Avoid importing numpy here, if it has not been imported the value cannot be an array.
+        np = sys.modules.get("numpy")
+        return np is not None and isinstance(v, np.ndarray)
+
     def to_literal(self, ctx: FlyteContext, python_val: T, python_type: Type[T], expected: LiteralType) -> Literal:
+        t = self.get_sub_type(python_type)
+        simple_transformer = self._simple_element_transformer(t)
+        if simple_transformer is not None and self._is_ndarray(python_val) and python_val.ndim == 1:
+            python_val = python_val.tolist()
+
         if type(python_val) != list:
             raise TypeTransformerFailedError("Expected a list")
 
-        t = self.get_sub_type(python_type)
+        if simple_transformer is not None:
+            to_literal = simple_transformer._to_literal_transformer
+            lit_list = []
+            for x in python_val:
+                if type(x) != t:
+                    raise TypeTransformerFailedError(f"Expected value of type {t} but got type {type(x)}")
+                lit_list.append(to_literal(x))
+            return Literal(collection=LiteralCollection(literals=lit_list))
+
         lit_list = [TypeEngine.to_literal(ctx, x, t, expected.collection_type) for x in python_val]  # type: ignore
         return Literal(collection=LiteralCollection(literals=lit_list))
 
+    @classmethod
+    def _offloadable_field(cls, lits: typing.List[Literal]) -> Optional[str]:
+        """
+        Returns the primitive field shared by all the given literals, if that field can be offloaded.
+        """
+        if not lits or lits[0].scalar is None or lits[0].scalar.primitive is None:
+            return None
+        first = lits[0].scalar.primitive
+        field = next((f for f in cls._OFFLOADABLE_PRIMITIVES if getattr(first, f) is not None), None)
+        if field is None:
+            return None
+        for x in lits:
+            if x.hash or x.scalar is None or x.scalar.primitive is None or getattr(x.scalar.primitive, field) is None:
+                return None
+        return field
+
+    @classmethod
+    def offload_collections(cls, ctx: FlyteContext, lv: Literal, min_length: int) -> Literal:
+        """
+        Replaces every collection of at least ``min_length`` int, float or bool primitives found in ``lv`` with a
+        single ``.npy`` blob, which is orders of magnitude smaller to serialize and faster to parse than one Literal
+        message per element. :py:meth:`to_python_value` transparently decodes these blobs back into lists.
+
+        Only flytekit tasks can consume offloaded collections, so this is strictly opt-in, see
+        ``flytekit.configuration.internal.Literals.COLLECTION_OFFLOAD_THRESHOLD``.
+        """
+        if lv.collection is not None:
+            lits = lv.collection.literals
+            field = cls._offloadable_field(lits) if len(lits) >= min_length else None
+            if field is None:
+                return Literal(
+                    collection=LiteralCollection(literals=[cls.offload_collections(ctx, x, min_length) for x in lits]),
+                    hash=lv.hash,
+                )
+
+            import numpy as np
+
+            dtype = cls._OFFLOADABLE_PRIMITIVES[field]
+            arr = np.fromiter((getattr(x.scalar.primitive, field) for x in lits), dtype=dtype, count=len(lits))
+            local_path = ctx.file_access.get_random_local_path() + ".npy"
+            pathlib.Path(local_path).parent.mkdir(parents=True, exist_ok=True)
+            np.save(file=local_path, arr=arr, allow_pickle=False)
+            remote_path = ctx.file_access.get_random_remote_path(local_path)
+            ctx.file_access.put_data(local_path, remote_path, is_multipart=False)
+            meta = BlobMetadata(
+                type=_core_types.BlobType(
+                    format=cls.OFFLOADED_COLLECTION_FORMAT,
+                    dimensionality=_core_types.BlobType.BlobDimensionality.SINGLE,
+                )
+            )
+            return Literal(scalar=Scalar(blob=Blob(metadata=meta, uri=remote_path)), hash=lv.hash)
+
+        if lv.map is not None:
+            return Literal(
+                map=LiteralMap(
+                    literals={k: cls.offload_collections(ctx, v, min_length) for k, v in lv.map.literals.items()}
+                ),
+                hash=lv.hash,
+            )
+        return lv
+
+    @staticmethod
+    def _element_type(t: Type[T]) -> Type:
+        """
+        Strips Annotated and Optional from the element type of a list.
+        """
+        while True:
+            if get_origin(t) is Annotated:
+                t = get_args(t)[0]
+                continue
+            args = [a for a in get_args(t) if a is not _NoneType] if get_origin(t) is typing.Union else []
+            if len(args) != 1:
+                return t
+            t = args[0]
+
+    def _load_offloaded_collection(self, ctx: FlyteContext, lv: Literal, st: Type[T]) -> typing.List[T]:
+        import numpy as np
+
+        local_path = ctx.file_access.get_random_local_path()
+        ctx.file_access.get_data(lv.scalar.blob.uri, local_path, is_multipart=False)
+        arr = np.load(local_path, allow_pickle=False)
+        # Offloaded collections have no nulls, so they can be read as lists of the Optional or Annotated element type
+        st = self._element_type(st)
+        if st is float and arr.dtype.kind in "iu":
+            arr = arr.astype("float64")
+        values = arr.tolist()
+        if values and type(values[0]) != st:
+            raise TypeTransformerFailedError(f"Cannot convert offloaded collection of {arr.dtype} to {st}")
+        return values
+
     def to_python_value(self, ctx: FlyteContext, lv: Literal, expected_python_type: Type[T]) -> typing.List[T]:
+        if (
+            lv.scalar is not None
+            and lv.scalar.blob is not None
+            and lv.scalar.blob.metadata.type.format == self.OFFLOADED_COLLECTION_FORMAT
+        ):
+            return self._load_offloaded_collection(ctx, lv, self.get_sub_type(expected_python_type))
+
         try:
             lits = lv.collection.literals
         except AttributeError:
             raise TypeTransformerFailedError()
 
         st = self.get_sub_type(expected_python_type)
+        simple_transformer = self._simple_element_transformer(st)
+        if simple_transformer is not None:
+            from_literal = simple_transformer._from_literal_transformer
+            res = []
+            for x in lits:
+                try:
+                    v = from_literal(x)
+                except AttributeError:
+                    # Assume that this is because a property on `x` was None
+                    raise TypeTransformerFailedError(f"Cannot convert literal {x}")
+                if type(v) != st:
+                    raise TypeTransformerFailedError(f"Cannot convert literal {x} to {st}")
+                res.append(v)
+            return res
+
         return [TypeEngine.to_python_value(ctx, x, st) for x in lits]
 
     def guess_python_type(self, literal_type: LiteralType) -> Type[list]:
@@ -1,14 +1,17 @@
 from __future__ import annotations
 
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from dataclasses import dataclass
 from enum import Enum
 from functools import update_wrapper
-from typing import Any, Callable, Dict, List, Optional, Tuple, Type, Union
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Type, Union
 
+from flytekit.configuration import internal as _internal
 from flytekit.core import constants as _common_constants
 from flytekit.core.base_task import PythonTask
 from flytekit.core.class_based_resolver import ClassStorageTaskResolver
-from flytekit.core.condition import ConditionalSection
+from flytekit.core.condition import BranchNode, ConditionalSection
 from flytekit.core.context_manager import CompilationState, FlyteContext, FlyteContextManager, FlyteEntities
 from flytekit.core.docstring import Docstring
 from flytekit.core.interface import (
@@ -161,6 +164,124 @@ def get_promise_map(
     return entity_kwargs
 
 
+def run_node(node: Node, outputs_cache: Dict[Node, Dict[str, Promise]]) -> Dict[str, Promise]:
+    """
+    Locally runs the entity of a node, with the inputs its bindings resolve to in the given map of nodes to their
+    outputs, and returns the outputs of the node by name.
+    """
+    # Retrieve the entity from the node, and call it by looking up the promises the node's bindings require,
+    # and then fill them in using the node output tracker map we have.
+    entity = node.flyte_entity
+    entity_kwargs = get_promise_map(node.bindings, outputs_cache)
+
+    # Handle the calling and outputs of each node's entity
+    results = entity(**entity_kwargs)
+    expected_output_names = list(entity.python_interface.outputs.keys())
+
+    if isinstance(results, VoidPromise) or results is None:
+        return {}  # Move along, nothing to assign
+
+    # Because we should've already returned in the above check, we just raise an Exception here.
+    if len(entity.python_interface.outputs) == 0:
+        raise FlyteValueException(results, "Interface output should've been VoidPromise or None.")
+
+    # if there's only one output,
+    if len(expected_output_names) == 1:
+        if entity.python_interface.output_tuple_name and isinstance(results, tuple):
+            return {expected_output_names[0]: results[0]}
+        return {expected_output_names[0]: results}
+
+    if len(results) != len(expected_output_names):
+        raise FlyteValueException(results, f"Different lengths {results} {expected_output_names}")
+    return {expected_output_names[idx]: r for idx, r in enumerate(results)}
+
+
+def run_nodes_concurrently(
+    nodes: List[Node],
+    outputs_cache: Dict[Node, Dict[str, Promise]],
+    max_workers: int,
+    failure_policy: Optional[WorkflowFailurePolicy] = None,
+) -> Dict[str, float]:
+    """
+    Locally runs the given nodes in a pool of threads, starting every node as soon as the nodes it depends on, through
+    its bindings or explicitly, have completed. The outputs of the nodes are added to the outputs cache, which must
+    already hold the outputs of the nodes they depend on that are not part of the given nodes, e.g. the inputs of the
+    workflow. Returns the duration, in seconds, of every node that ran by node id.
+
+    With the FAIL_IMMEDIATELY policy no node is started after a failure, otherwise all the nodes that do not depend on
+    a failed node run. Either way the running nodes are waited for and the first error is raised.
+    """
+    node_set = set(nodes)
+    upstream = {n: {u for u in n.upstream_nodes if u in node_set} for n in nodes}
+    for n in nodes:
+        upstream[n].update(
+            b.promise.node for bd in n.bindings for b in _iter_binding_data(bd.binding) if b.promise.node in upstream
+        )
+    downstream = {n: [] for n in nodes}
+    for n, ups in upstream.items():
+        for u in ups:
+            downstream[u].append(n)
+
+    fail_immediately = failure_policy in (None, WorkflowFailurePolicy.FAIL_IMMEDIATELY)
+    timings = {}
+    error = None
+    skipped = set()
+    remaining = {n: len(ups) for n, ups in upstream.items()}
+    ready = [n for n in nodes if remaining[n] == 0]
+
+    def _timed_run(node: Node, outputs: Dict[Node, Dict[str, Promise]]) -> Tuple[Dict[str, Promise], float]:
+        start = time.perf_counter()
+        node_outputs = run_node(node, outputs)
+        return node_outputs, time.perf_counter() - start
+
+    running = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while ready or running:
+            while ready and len(running) < max_workers and (error is None or not fail_immediately):
+                node = ready.pop(0)
+                # The workers only read the outputs of the nodes that completed before they were started.
+                running[pool.submit(FlyteContextManager.propagate(_timed_run), node, dict(outputs_cache))] = node
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                node = running.pop(future)
+                try:
+                    outputs_cache[node], timings[node.id] = exception_scopes.user_entry_point(future.result)()
+                except Exception as e:
+                    logger.error(f"Node {node.id} failed: {e}")
+                    error = error or e
+                    to_skip = list(downstream[node])
+                    while to_skip:
+                        n = to_skip.pop()
+                        if n not in skipped:
+                            skipped.add(n)
+                            to_skip.extend(downstream[n])
+                    continue
+                logger.info(f"Node {node.id} ({node.flyte_entity.name}) completed in {timings[node.id]:.3f}s")
+                for n in downstream[node]:
+                    remaining[n] -= 1
+                    if remaining[n] == 0 and n not in skipped:
+                        ready.append(n)
+    if error is not None:
+        raise error
+    return timings
+
+
+def _iter_binding_data(binding_data: _literal_models.BindingData) -> Iterator[_literal_models.BindingData]:
+    """
+    Yields the binding data, nested in the given one, that are promises.
+    """
+    if binding_data.promise is not None:
+        yield binding_data
+    elif binding_data.collection is not None:
+        for bd in binding_data.collection.bindings:
+            yield from _iter_binding_data(bd)
+    elif binding_data.map is not None:
+        for bd in binding_data.map.bindings.values():
+            yield from _iter_binding_data(bd)
+
+
 class WorkflowBase(object):
     def __init__(
         self,
@@ -179,6 +300,7 @@ class WorkflowBase(object):
         self._unbound_inputs = set()
         self._nodes = []
         self._output_bindings: Optional[List[_literal_models.Binding]] = []
+        self._node_timings: Dict[str, float] = {}
         FlyteEntities.entities.append(self)
         super().__init__(**kwargs)
 
@@ -237,9 +359,55 @@ class WorkflowBase(object):
         input_kwargs.update(kwargs)
         return flyte_entity_call_handler(self, *args, **input_kwargs)
 
+    @property
+    def node_timings(self) -> Dict[str, float]:
+        """
+        The duration in seconds of every node, by node id, of the last local execution of this workflow that ran its
+        nodes concurrently. See ``sdk.local_workflow_concurrency``.
+        """
+        return self._node_timings
+
     def execute(self, **kwargs):
         raise Exception("Should not be called")
 
+    def _run_nodes_concurrently(self, nodes: List[Node], outputs_cache: Dict[Node, Dict[str, Promise]]) -> bool:
+        """
+        Runs the given nodes concurrently if ``sdk.local_workflow_concurrency`` allows more than one node to run at a
+        time and all of them can be run on their own, i.e. they are not part of a conditional. Returns whether the nodes
+        were run, their outputs are then in the outputs cache.
+        """
+        concurrency = _internal.LocalSDK.LOCAL_WORKFLOW_CONCURRENCY.read()
+        if not concurrency or concurrency <= 1 or not nodes:
+            return False
+        if any(isinstance(n.flyte_entity, BranchNode) for n in nodes):
+            logger.info(f"Workflow {self.name} has conditional nodes, its nodes run one after the other")
+            return False
+        self._node_timings = run_nodes_concurrently(
+            nodes, outputs_cache, concurrency, self.workflow_metadata.on_failure if self.workflow_metadata else None
+        )
+        return True
+
+    def _outputs_from_bindings(self, outputs_cache: Dict[Node, Dict[str, Promise]]):
+        """
+        Returns the outputs of a workflow whose nodes ran node by node, by fulfilling all of the workflow's output
+        bindings from the outputs of its nodes.
+        """
+        if len(self.python_interface.outputs) == 0:
+            return VoidPromise(self.name)
+
+        # The return style here has to match what 1) what the workflow would've returned had it been declared
+        # functionally, and 2) what a user would return in mock function. That is, if it's a tuple, then it
+        # should be a tuple here, if it's a one element named tuple, then we do a one-element non-named tuple,
+        # if it's a single element then we return a single element
+        if len(self.output_bindings) == 1:
+            # Again use presence of output_tuple_name to understand that we're dealing with a one-element
+            # named tuple
+            if self.python_interface.output_tuple_name:
+                return (get_promise(self.output_bindings[0].binding, outputs_cache),)
+            # Just a normal single element
+            return get_promise(self.output_bindings[0].binding, outputs_cache)
+        return tuple([get_promise(b.binding, outputs_cache) for b in self.output_bindings])
+
     def local_execute(self, ctx: FlyteContext, **kwargs) -> Union[Tuple[Promise], Promise, VoidPromise]:
         # This is done to support the invariant that Workflow local executions always work with Promise objects
         # holding Flyte literal values. Even in a wf, a user can call a sub-workflow with a Python native value.
@@ -399,59 +567,12 @@ class ImperativeWorkflow(WorkflowBase):
         for k, v in kwargs.items():
             intermediate_node_outputs[GLOBAL_START_NODE][k] = v
 
-        # Next iterate through the nodes in order.
-        for node in self.compilation_state.nodes:
-            if node not in intermediate_node_outputs.keys():
-                intermediate_node_outputs[node] = {}
-
-            # Retrieve the entity from the node, and call it by looking up the promises the node's bindings require,
-            # and then fill them in using the node output tracker map we have.
-            entity = node.flyte_entity
-            entity_kwargs = get_promise_map(node.bindings, intermediate_node_outputs)
-
-            # Handle the calling and outputs of each node's entity
-            results = entity(**entity_kwargs)
-            expected_output_names = list(entity.python_interface.outputs.keys())
-
-            if isinstance(results, VoidPromise) or results is None:
-                continue  # pragma: no cover # Move along, nothing to assign
-
-            # Because we should've already returned in the above check, we just raise an Exception here.
-            if len(entity.python_interface.outputs) == 0:
-                raise FlyteValueException(results, "Interface output should've been VoidPromise or None.")
+        # Next iterate through the nodes in order, unless they are allowed to run concurrently.
+        if not self._run_nodes_concurrently(self.compilation_state.nodes, intermediate_node_outputs):
+            for node in self.compilation_state.nodes:
+                intermediate_node_outputs[node] = run_node(node, intermediate_node_outputs)
 
-            # if there's only one output,
-            if len(expected_output_names) == 1:
-                if entity.python_interface.output_tuple_name and isinstance(results, tuple):
-                    intermediate_node_outputs[node][expected_output_names[0]] = results[0]
-                else:
-                    intermediate_node_outputs[node][expected_output_names[0]] = results
-
-            else:
-                if len(results) != len(expected_output_names):
-                    raise FlyteValueException(results, f"Different lengths {results} {expected_output_names}")
-                for idx, r in enumerate(results):
-                    intermediate_node_outputs[node][expected_output_names[idx]] = r
-
-        # The rest of this function looks like the above but now we're doing it for the workflow as a whole rather
-        # than just one node at a time.
-        if len(self.python_interface.outputs) == 0:
-            return VoidPromise(self.name)
-
-        # The values that we return below from the output have to be pulled by fulfilling all of the
-        # workflow's output bindings.
-        # The return style here has to match what 1) what the workflow would've returned had it been declared
-        # functionally, and 2) what a user would return in mock function. That is, if it's a tuple, then it
-        # should be a tuple here, if it's a one element named tuple, then we do a one-element non-named tuple,
-        # if it's a single element then we return a single element
-        if len(self.output_bindings) == 1:
-            # Again use presence of output_tuple_name to understand that we're dealing with a one-element
-            # named tuple
-            if self.python_interface.output_tuple_name:
-                return (get_promise(self.output_bindings[0].binding, intermediate_node_outputs),)
-            # Just a normal single element
-            return get_promise(self.output_bindings[0].binding, intermediate_node_outputs)
-        return tuple([get_promise(b.binding, intermediate_node_outputs) for b in self.output_bindings])
+        return self._outputs_from_bindings(intermediate_node_outputs)
 
     def add_entity(self, entity: Union[PythonTask, LaunchPlan, WorkflowBase], **kwargs) -> Node:
         """
@@ -682,7 +803,13 @@ class PythonFunctionWorkflow(WorkflowBase, ClassStorageTaskResolver):
         This function is here only to try to streamline the pattern between workflows and tasks. Since tasks
         call execute from dispatch_execute which is in local_execute, workflows should also call an execute inside
         local_execute. This makes mocking cleaner.
+
+        If ``sdk.local_workflow_concurrency`` is set, the compiled nodes are run instead of the workflow function, so
+        that the nodes which do not depend on each other run concurrently.
         """
+        intermediate_node_outputs = {GLOBAL_START_NODE: dict(kwargs)}  # type: Dict[Node, Dict[str, Promise]]
+        if self._run_nodes_concurrently(self.nodes, intermediate_node_outputs):
+            return self._outputs_from_bindings(intermediate_node_outputs)
         return exception_scopes.user_entry_point(self._workflow_function)(**kwargs)
 
 
@@ -1,8 +1,11 @@
+import typing
 from typing import Any, Optional
 
-import pandas
 from typing_extensions import Protocol, runtime_checkable
 
+if typing.TYPE_CHECKING:
+    import pandas
+
 
 @runtime_checkable
 class Renderable(Protocol):
@@ -21,6 +24,8 @@ class TopFrameRenderer:
     def __init__(self, max_rows: Optional[int] = None):
         self._max_rows = max_rows
 
-    def to_html(self, df: pandas.DataFrame) -> str:
+    def to_html(self, df: "pandas.DataFrame") -> str:
+        import pandas
+
         assert isinstance(df, pandas.DataFrame)
         return df.to_html(max_rows=self._max_rows)
@@ -1,3 +1,4 @@
+import threading as _threading
 from sys import exc_info as _exc_info
 from traceback import format_tb as _format_tb
 
@@ -126,12 +127,20 @@ _NULL_CONTEXT = 0
 _USER_CONTEXT = 1
 _SYSTEM_CONTEXT = 2
 
-# Keep the stack with a null-context so we never have to range check when peeking back.
-_CONTEXT_STACK = [_NULL_CONTEXT]
+# Every thread keeps its own stack of scopes, so that user code running concurrently (e.g. the instances of a map task
+# executed locally) does not interleave its scopes.
+_SCOPES = _threading.local()
+
+
+def _context_stack() -> list:
+    if not hasattr(_SCOPES, "stack"):
+        # Keep the stack with a null-context so we never have to range check when peeking back.
+        _SCOPES.stack = [_NULL_CONTEXT]
+    return _SCOPES.stack
 
 
 def _is_base_context():
-    return _CONTEXT_STACK[-2] == _NULL_CONTEXT
+    return _context_stack()[-2] == _NULL_CONTEXT
 
 
 @_decorator
@@ -151,7 +160,7 @@ def system_entry_point(wrapped, instance, args, kwargs):
     We will dispatch metrics and such appropriately.
     """
     try:
-        _CONTEXT_STACK.append(_SYSTEM_CONTEXT)
+        _context_stack().append(_SYSTEM_CONTEXT)
         if _is_base_context():
             # If this is the first time either of this decorator, or the one below is called, then we unwrap the
             # exception. The first time these decorators are used is currently in the entrypoint.py file. The scoped
@@ -174,7 +183,7 @@ def system_entry_point(wrapped, instance, args, kwargs):
                 # System error, raise full stack-trace all the way up the chain.
                 raise FlyteScopedSystemException(*_exc_info(), kind=_error_model.ContainerError.Kind.RECOVERABLE)
     finally:
-        _CONTEXT_STACK.pop()
+        _context_stack().pop()
 
 
 @_decorator
@@ -191,7 +200,7 @@ def user_entry_point(wrapped, instance, args, kwargs):
     to the user.
     """
     try:
-        _CONTEXT_STACK.append(_USER_CONTEXT)
+        _context_stack().append(_USER_CONTEXT)
         if _is_base_context():
             # See comment at this location for system_entry_point
             try:
@@ -213,4 +222,4 @@ def user_entry_point(wrapped, instance, args, kwargs):
                 # This will also catch FlyteUserException re-raised by the system_entry_point handler
                 raise FlyteScopedUserException(*_exc_info())
     finally:
-        _CONTEXT_STACK.pop()
+        _context_stack().pop()
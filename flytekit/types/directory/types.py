@@ -1,15 +1,18 @@
 from __future__ import annotations
 
+import fnmatch
 import os
 import pathlib
 import typing
+import uuid
 from dataclasses import dataclass, field
 from pathlib import Path
 
 from dataclasses_json import config, dataclass_json
 from marshmallow import fields
 
-from flytekit.core.context_manager import FlyteContext
+from flytekit.core.context_manager import FlyteContext, FlyteContextManager
+from flytekit.core.data_persistence import UnsupportedPersistenceOp
 from flytekit.core.type_engine import TypeEngine, TypeTransformer
 from flytekit.models import types as _type_models
 from flytekit.models.core import types as _core_types
@@ -30,9 +33,10 @@ class FlyteDirectory(os.PathLike, typing.Generic[T]):
     """
     .. warning::
 
-        This class should not be used on very large datasets, as merely listing the dataset will cause
-        the entire dataset to be downloaded. Listing on S3 and other backend object stores is not consistent
-        and we should not need data to be downloaded to list.
+        Accessing the path of a remote directory, e.g. with ``os.listdir``, downloads the entire directory. For very
+        large datasets, use :py:meth:`FlyteDirectory.listdir` to list the files without downloading them, and
+        :py:meth:`FlyteDirectory.fetch` or :py:meth:`FlyteDirectory.download_files` to download only some of them.
+        Listing on S3 and other backend object stores is not consistent.
 
     Please first read through the comments on the :py:class:`flytekit.types.file.FlyteFile` class as the
     implementation here is similar.
@@ -127,6 +131,7 @@ class FlyteDirectory(os.PathLike, typing.Generic[T]):
         self._downloaded = False
         self._remote_directory = remote_directory
         self._remote_source = None
+        self._listing: typing.Optional[typing.List[str]] = None
 
     def __fspath__(self):
         """
@@ -178,6 +183,92 @@ class FlyteDirectory(os.PathLike, typing.Generic[T]):
     def download(self) -> str:
         return self.__fspath__()
 
+    def _is_lazy(self) -> bool:
+        return self._remote_source is not None and not self._downloaded
+
+    def listdir(self, pattern: typing.Optional[str] = None) -> typing.List[str]:
+        """
+        Returns the paths of the files in this directory and its subdirectories, relative to it and separated by /.
+        The files of a remote directory are listed without downloading them, unless the persistence plugin cannot
+        list directories.
+
+        :param pattern: A glob pattern the relative paths must match, e.g. ``*.parquet``. By default, directories with
+            a format only list the files with that extension, e.g. ``FlyteDirectory["parquet"]`` lists ``*.parquet``.
+        """
+        if self._is_lazy() and self._listing is None:
+            try:
+                self._listing = FlyteContextManager.current_context().file_access.list_files(self._remote_source)
+            except UnsupportedPersistenceOp:
+                self.download()
+        if self._is_lazy():
+            names = self._listing
+        else:
+            root = self.download()
+            names = [
+                os.path.relpath(os.path.join(d, f), root).replace(os.sep, "/")
+                for d, _, files in os.walk(root)
+                for f in files
+            ]
+
+        if pattern is None and self.extension():
+            pattern = f"*.{self.extension()}"
+        return sorted(n for n in names if pattern is None or fnmatch.fnmatch(n, pattern))
+
+    def _local_path(self, name: str) -> str:
+        parts = name.split("/")
+        root = os.path.abspath(self.path)
+        local_path = os.path.join(self.path, *parts)
+        if os.path.isabs(name) or ".." in parts or os.path.commonpath([root, os.path.abspath(local_path)]) != root:
+            raise ValueError(f"{name} is not the path of a file relative to the directory {self.path}")
+        return local_path
+
+    @staticmethod
+    def _partial_path(local_path: str) -> str:
+        # Files are downloaded next to their final location and renamed once complete, so that an interrupted download
+        # is never mistaken for a fetched file.
+        directory, base = os.path.split(local_path)
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, f".{base}.{uuid.uuid4().hex}.partial")
+
+    def fetch(self, name: str) -> str:
+        """
+        Returns the local path of a single file of this directory, given its path relative to the directory. A remote
+        file is downloaded on first access only, without downloading the rest of the directory.
+        """
+        local_path = self._local_path(name)
+        if self._is_lazy() and not os.path.exists(local_path):
+            remote_path = f"{self._remote_source.rstrip('/')}/{name}"
+            partial_path = self._partial_path(local_path)
+            try:
+                FlyteContextManager.current_context().file_access.get_data(remote_path, partial_path)
+                os.replace(partial_path, local_path)
+            finally:
+                if os.path.exists(partial_path):
+                    os.remove(partial_path)
+        return local_path
+
+    def download_files(self, pattern: typing.Optional[str] = None) -> typing.List[str]:
+        """
+        Downloads the files matching the pattern, see :py:meth:`listdir`, concurrently and returns their local paths.
+        Files that were already fetched are not downloaded again.
+        """
+        names = self.listdir(pattern)
+        local_paths = [self._local_path(n) for n in names]
+        if self._is_lazy():
+            source = self._remote_source.rstrip("/")
+            missing = [(n, p, self._partial_path(p)) for n, p in zip(names, local_paths) if not os.path.exists(p)]
+            try:
+                FlyteContextManager.current_context().file_access.get_data_batch(
+                    [(f"{source}/{n}", partial, False) for n, _, partial in missing]
+                )
+                for _, p, partial in missing:
+                    os.replace(partial, p)
+            finally:
+                for _, _, partial in missing:
+                    if os.path.exists(partial):
+                        os.remove(partial)
+        return local_paths
+
     def __repr__(self):
         return self.path
 
@@ -23,6 +23,9 @@ def noop():
 
 T = typing.TypeVar("T")
 
+# The keyword arguments of the builtin open, that can be passed to FlyteFile.open whether it streams or not.
+_OPEN_KWARGS = ("buffering", "encoding", "errors", "newline")
+
 
 @dataclass_json
 @dataclass
@@ -142,6 +145,17 @@ class FlyteFile(os.PathLike, typing.Generic[T]):
 
         def t2() -> flytekit_typing.FlyteFile["csv"]:
             return "/tmp/local_file.csv"
+
+    Remote files can also be read or written without a local copy, with :py:meth:`FlyteFile.open` ::
+
+        @task
+        def t3(f: FlyteFile) -> FlyteFile:
+            with f.open("rb", streaming=True) as r:
+                header = r.read(1024)
+            out = FlyteFile("out.bin")
+            with out.open("wb", streaming=True) as w:
+                w.write(header)
+            return out
     """
 
     @classmethod
@@ -219,6 +233,54 @@ class FlyteFile(os.PathLike, typing.Generic[T]):
     def download(self) -> str:
         return self.__fspath__()
 
+    def open(self, mode: str = "rb", streaming: bool = False, **kwargs) -> typing.IO:
+        """
+        Opens the file. By default, a remote file is downloaded first and the local copy is opened.
+
+        With ``streaming=True``, a remote file that was not downloaded is read directly from the blob store instead:
+        the file object is seekable and only fetches the byte ranges that are read. Writing with ``streaming=True``
+        uploads the file as it is written, to ``remote_path`` if it was given or to a random location under the raw
+        output prefix otherwise, and returning this FlyteFile from a task does not upload it again. ``path`` is not
+        written to then: once the written file is closed, accessing the local file through :py:func:`os.fspath`,
+        ``download`` or ``open`` downloads it from the remote location. Remote files can only be read or written whole,
+        so appending or updating them (modes with ``a`` or ``+``) is not supported when streaming. Persistence plugins
+        that cannot open remote files fall back to the local copy.
+
+        :param mode: The mode to open the file with, as in :py:func:`open`.
+        :param streaming: If true, read and write the remote file directly.
+        :param kwargs: Passed to the persistence plugin when streaming, to :py:func:`open` otherwise. When the local
+          copy is opened instead of the remote file, only the arguments of :py:func:`open` are accepted.
+        """
+        from flytekit.core.context_manager import FlyteContextManager
+        from flytekit.core.data_persistence import UnsupportedPersistenceOp
+
+        if streaming:
+            if "a" in mode or "+" in mode:
+                raise ValueError(f"Cannot stream {self.path} with mode {mode}, remote files are read or written whole")
+            file_access = FlyteContextManager.current_context().file_access
+            try:
+                if "r" in mode:
+                    if self._remote_source is not None and not self._downloaded:
+                        return file_access.open(self._remote_source, mode, **kwargs)
+                elif self._remote_path is not False and self._remote_source is None:
+                    remote_path = self._remote_path or file_access.get_random_remote_path(str(self.path))
+                    f = file_access.open(remote_path, mode, **kwargs)
+                    # The file is already uploaded when this FlyteFile is converted to a literal
+                    self._remote_source = remote_path
+                    local_path = self.path
+                    self._downloader = lambda: file_access.get_data(remote_path, local_path)
+                    self._downloaded = False
+                    return f
+            except UnsupportedPersistenceOp as e:
+                logger.debug(f"Cannot stream {self.path}, opening a local copy instead: {e}")
+            unsupported = sorted(set(kwargs) - set(_OPEN_KWARGS))
+            if unsupported:
+                raise ValueError(f"Cannot open the local copy of {self.path} with the arguments {unsupported}")
+
+        if "r" in mode:
+            return open(self.download(), mode, **kwargs)
+        return open(self.path, mode, **kwargs)
+
     def __repr__(self):
         return self.path
 
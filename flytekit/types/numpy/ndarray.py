@@ -1,19 +1,52 @@
 import pathlib
 import typing
+from collections import OrderedDict
 from typing import Type
 
 import numpy as np
+from typing_extensions import Annotated, get_args, get_origin
 
 from flytekit.core.context_manager import FlyteContext
+from flytekit.core.data_persistence import UnsupportedPersistenceOp
 from flytekit.core.type_engine import TypeEngine, TypeTransformer, TypeTransformerFailedError
+from flytekit.loggers import logger
 from flytekit.models.core import types as _core_types
 from flytekit.models.literals import Blob, BlobMetadata, Literal, Scalar
 from flytekit.models.types import LiteralType
 
 
+def extract_metadata(t: Type[np.ndarray]) -> typing.Tuple[Type[np.ndarray], typing.Dict[str, typing.Any]]:
+    """
+    Splits ``Annotated[np.ndarray, kwtypes(...)]`` into the array type and the options given with kwtypes, e.g.
+
+    .. code-block:: python
+
+        @task
+        def t1(a: Annotated[np.ndarray, kwtypes(mmap_mode="r", dtype=np.float32, shape=(None, 3))]):
+            ...
+
+        @task
+        def t2() -> Annotated[np.ndarray, kwtypes(compressed=True)]:
+            ...
+
+    The supported options are:
+
+    - ``mmap_mode``: Memory-maps the downloaded file instead of reading it into memory, see :py:func:`numpy.load`.
+    - ``compressed``: Writes the array as a compressed ``.npz`` file. These cannot be memory-mapped.
+    - ``dtype`` and ``shape``: Validates the array before it is downloaded. ``None`` in the shape matches any length.
+    """
+    if get_origin(t) is Annotated:
+        base_type, metadata = get_args(t)[0], get_args(t)[1]
+        if not isinstance(metadata, OrderedDict):
+            raise TypeTransformerFailedError(f"{t}'s metadata needs to be of type kwtypes.")
+        return base_type, metadata
+    return t, {}
+
+
 class NumpyArrayTransformer(TypeTransformer[np.ndarray]):
     """
-    TypeTransformer that supports np.ndarray as a native type.
+    TypeTransformer that supports np.ndarray as a native type. See :py:func:`extract_metadata` for the options that
+    can be given with ``Annotated``.
     """
 
     NUMPY_ARRAY_FORMAT = "NumpyArray"
@@ -31,18 +64,26 @@ class NumpyArrayTransformer(TypeTransformer[np.ndarray]):
     def to_literal(
         self, ctx: FlyteContext, python_val: np.ndarray, python_type: Type[np.ndarray], expected: LiteralType
     ) -> Literal:
+        _, metadata = extract_metadata(python_type)
         meta = BlobMetadata(
             type=_core_types.BlobType(
                 format=self.NUMPY_ARRAY_FORMAT, dimensionality=_core_types.BlobType.BlobDimensionality.SINGLE
             )
         )
+        self._validate(python_val.dtype, python_val.shape, metadata)
 
-        local_path = ctx.file_access.get_random_local_path() + ".npy"
+        compressed = metadata.get("compressed", False)
+        local_path = ctx.file_access.get_random_local_path() + (".npz" if compressed else ".npy")
         pathlib.Path(local_path).parent.mkdir(parents=True, exist_ok=True)
 
         # save numpy array to a file
         # allow_pickle=False prevents numpy from trying to save object arrays (dtype=object) using pickle
-        np.save(file=local_path, arr=python_val, allow_pickle=False)
+        if compressed:
+            if python_val.dtype.hasobject:
+                raise TypeError("Object arrays cannot be saved when allow_pickle=False")
+            np.savez_compressed(local_path, python_val)
+        else:
+            np.save(file=local_path, arr=python_val, allow_pickle=False)
 
         remote_path = ctx.file_access.get_random_remote_path(local_path)
         ctx.file_access.put_data(local_path, remote_path, is_multipart=False)
@@ -52,13 +93,61 @@ class NumpyArrayTransformer(TypeTransformer[np.ndarray]):
         try:
             uri = lv.scalar.blob.uri
         except AttributeError:
-            TypeTransformerFailedError(f"Cannot convert from {lv} to {expected_python_type}")
+            raise TypeTransformerFailedError(f"Cannot convert from {lv} to {expected_python_type}")
+
+        _, metadata = extract_metadata(expected_python_type)
+        validate = "dtype" in metadata or "shape" in metadata
+        header = self.read_header(ctx, uri) if validate else None
+        if header is not None:
+            self._validate(*header, metadata)
 
         local_path = ctx.file_access.get_random_local_path()
         ctx.file_access.get_data(uri, local_path, is_multipart=False)
 
-        # load numpy array from a file
-        return np.load(file=local_path)
+        # load numpy array from a file, .npz files are loaded as a lazy mapping of arrays
+        arr = np.load(file=local_path, mmap_mode=metadata.get("mmap_mode"))
+        if isinstance(arr, np.lib.npyio.NpzFile):
+            with arr:
+                arr = arr["arr_0"]
+        if validate and header is None:
+            self._validate(arr.dtype, arr.shape, metadata)
+        return arr
+
+    @staticmethod
+    def read_header(ctx: FlyteContext, uri: str) -> typing.Optional[typing.Tuple[np.dtype, typing.Tuple[int, ...]]]:
+        """
+        Returns the dtype and the shape of the ``.npy`` file at the given uri, reading only its header. Returns None if
+        the file is compressed, has a format version this doesn't know, or the persistence plugin cannot read part of a
+        file.
+        """
+        try:
+            with ctx.file_access.open(uri, "rb") as f:
+                if f.read(len(np.lib.format.MAGIC_PREFIX)) != np.lib.format.MAGIC_PREFIX:
+                    return None
+                f.seek(0)
+                version = np.lib.format.read_magic(f)
+                if version == (1, 0):
+                    shape, _, dtype = np.lib.format.read_array_header_1_0(f)
+                elif version == (2, 0):
+                    shape, _, dtype = np.lib.format.read_array_header_2_0(f)
+                elif version == (3, 0):
+                    # Version 3.0 headers are encoded in utf-8, numpy has no public reader for them
+                    shape, _, dtype = np.lib.format._read_array_header(f, version)
+                else:
+                    return None
+                return dtype, shape
+        except UnsupportedPersistenceOp as e:
+            logger.debug(f"Cannot read the header of {uri}, the array is validated after the download: {e}")
+            return None
+
+    @staticmethod
+    def _validate(dtype: np.dtype, shape: typing.Tuple[int, ...], metadata: typing.Dict[str, typing.Any]):
+        if "dtype" in metadata and np.dtype(metadata["dtype"]) != dtype:
+            raise TypeTransformerFailedError(f"Expected an array of dtype {np.dtype(metadata['dtype'])}, got {dtype}")
+        if "shape" in metadata:
+            expected = tuple(metadata["shape"])
+            if len(expected) != len(shape) or any(e is not None and e != s for e, s in zip(expected, shape)):
+                raise TypeTransformerFailedError(f"Expected an array of shape {expected}, got {shape}")
 
     def guess_python_type(self, literal_type: LiteralType) -> typing.Type[np.ndarray]:
         if (
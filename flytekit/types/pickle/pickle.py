@@ -1,10 +1,15 @@
+import bz2
+import gzip
+import lzma
 import os
 import typing
 from typing import Type
 
 import cloudpickle
 
+from flytekit.configuration import internal as _internal
 from flytekit.core.context_manager import FlyteContext
+from flytekit.core.data_persistence import UnsupportedPersistenceOp
 from flytekit.core.type_engine import TypeEngine, TypeTransformer
 from flytekit.models.core import types as _core_types
 from flytekit.models.literals import Blob, BlobMetadata, Literal, Scalar
@@ -13,6 +18,39 @@ from flytekit.models.types import LiteralType
 T = typing.TypeVar("T")
 
 
+def _zstd_open(f: typing.IO, mode: str) -> typing.IO:
+    import zstandard
+
+    if "r" in mode:
+        return zstandard.ZstdDecompressor().stream_reader(f, closefd=False)
+    return zstandard.ZstdCompressor().stream_writer(f, closefd=False)
+
+
+def _lz4_open(f: typing.IO, mode: str) -> typing.IO:
+    import lz4.frame
+
+    return lz4.frame.open(f, mode)
+
+
+class _Codec(typing.NamedTuple):
+    """
+    A compression format of pickles. ``open`` wraps a binary file in a (de)compressing stream, without closing the file
+    when the stream is closed. Compressed pickles are recognized by their first bytes when they are read.
+    """
+
+    magic: bytes
+    open: typing.Callable[[typing.IO, str], typing.IO]
+
+
+_CODECS: typing.Dict[str, _Codec] = {
+    "gzip": _Codec(b"\x1f\x8b", lambda f, mode: gzip.GzipFile(fileobj=f, mode=mode)),
+    "bz2": _Codec(b"BZh", bz2.BZ2File),
+    "lzma": _Codec(b"\xfd7zXZ\x00", lzma.LZMAFile),
+    "zstd": _Codec(b"\x28\xb5\x2f\xfd", _zstd_open),
+    "lz4": _Codec(b"\x04\x22\x4d\x18", _lz4_open),
+}
+
+
 class FlytePickle(typing.Generic[T]):
     """
     This type is only used by flytekit internally. User should not use this type.
@@ -50,15 +88,19 @@ class FlytePickleTransformer(TypeTransformer[FlytePickle]):
 
     def to_python_value(self, ctx: FlyteContext, lv: Literal, expected_python_type: Type[T]) -> T:
         uri = lv.scalar.blob.uri
-        # Deserialize the pickle, and return data in the pickle,
-        # and download pickle file to local first if file is not in the local file systems.
-        if ctx.file_access.is_remote(uri):
-            local_path = ctx.file_access.get_random_local_path()
-            ctx.file_access.get_data(uri, local_path, False)
-            uri = local_path
-        with open(uri, "rb") as infile:
-            data = cloudpickle.load(infile)
-        return data
+        # Deserialize the pickle while it is read from the store, and download pickle file to local first if the
+        # persistence plugin cannot stream it.
+        if not ctx.file_access.is_remote(uri):
+            infile = open(uri, "rb")
+        else:
+            try:
+                infile = ctx.file_access.open(uri, "rb")
+            except UnsupportedPersistenceOp:
+                local_path = ctx.file_access.get_random_local_path()
+                ctx.file_access.get_data(uri, local_path, False)
+                infile = open(local_path, "rb")
+        with infile:
+            return self._load(infile)
 
     def to_literal(self, ctx: FlyteContext, python_val: T, python_type: Type[T], expected: LiteralType) -> Literal:
         meta = BlobMetadata(
@@ -66,18 +108,49 @@ class FlytePickleTransformer(TypeTransformer[FlytePickle]):
                 format=self.PYTHON_PICKLE_FORMAT, dimensionality=_core_types.BlobType.BlobDimensionality.SINGLE
             )
         )
-        # Dump the task output into pickle
-        local_dir = ctx.file_access.get_random_local_directory()
-        os.makedirs(local_dir, exist_ok=True)
-        local_path = ctx.file_access.get_random_local_path()
-        uri = os.path.join(local_dir, local_path)
-        with open(uri, "w+b") as outfile:
-            cloudpickle.dump(python_val, outfile)
+        compression = _internal.LocalSDK.PICKLE_COMPRESSION.read()
+        if compression and compression not in _CODECS:
+            raise ValueError(f"Unknown pickle compression {compression}, expected one of {list(_CODECS)}")
+        codec = _CODECS[compression] if compression else None
+
+        # Dump the task output into pickle, straight into the store if the persistence plugin can write streams so
+        # that no local copy is made.
+        remote_path = ctx.file_access.get_random_remote_path()
+        try:
+            with ctx.file_access.open(remote_path, "wb") as outfile:
+                self._dump(python_val, outfile, codec)
+        except UnsupportedPersistenceOp:
+            local_dir = ctx.file_access.get_random_local_directory()
+            os.makedirs(local_dir, exist_ok=True)
+            local_path = ctx.file_access.get_random_local_path()
+            uri = os.path.join(local_dir, local_path)
+            with open(uri, "w+b") as outfile:
+                self._dump(python_val, outfile, codec)
 
-        remote_path = ctx.file_access.get_random_remote_path(uri)
-        ctx.file_access.put_data(uri, remote_path, is_multipart=False)
+            remote_path = ctx.file_access.get_random_remote_path(uri)
+            ctx.file_access.put_data(uri, remote_path, is_multipart=False)
         return Literal(scalar=Scalar(blob=Blob(metadata=meta, uri=remote_path)))
 
+    @staticmethod
+    def _dump(python_val: typing.Any, outfile: typing.IO, codec: typing.Optional[_Codec]):
+        # cloudpickle uses the highest pickle protocol, with which the buffers of large objects like numpy arrays are
+        # written to the file as they are instead of being copied into the pickle first.
+        if codec is None:
+            cloudpickle.dump(python_val, outfile)
+            return
+        with codec.open(outfile, "wb") as stream:
+            cloudpickle.dump(python_val, stream)
+
+    @staticmethod
+    def _load(infile: typing.IO) -> typing.Any:
+        head = infile.read(max(len(c.magic) for c in _CODECS.values()))
+        infile.seek(0)
+        for codec in _CODECS.values():
+            if head.startswith(codec.magic):
+                with codec.open(infile, "rb") as stream:
+                    return cloudpickle.load(stream)
+        return cloudpickle.load(infile)
+
     def guess_python_type(self, literal_type: LiteralType) -> typing.Type[FlytePickle[typing.Any]]:
         if (
             literal_type.blob is not None
@@ -17,6 +17,10 @@ Flytekit StructuredDataset
 from flytekit.configuration.internal import LocalSDK
 from flytekit.loggers import logger
 
+# The handlers registered below take over the dataframe and array types from the transformers of these modules, which
+# would fail to register if they were imported afterwards.
+from flytekit.types import numpy, schema  # noqa: F401
+
 from .basic_dfs import (
     ArrowToParquetEncodingHandler,
     PandasToParquetEncodingHandler,
@@ -1,13 +1,17 @@
+import concurrent.futures
+import contextlib
 import os
 import typing
-from typing import TypeVar
+from typing import Generator, Optional, TypeVar
 
 import pandas as pd
 import pyarrow as pa
+import pyarrow.compute as pc
 import pyarrow.parquet as pq
 
 from flytekit import FlyteContext
-from flytekit.core.data_persistence import DataPersistencePlugins
+from flytekit.configuration import internal as _internal
+from flytekit.core.data_persistence import DataPersistencePlugins, UnsupportedPersistenceOp
 from flytekit.models import literals
 from flytekit.models.literals import StructuredDatasetMetadata
 from flytekit.models.types import StructuredDatasetType
@@ -16,6 +20,7 @@ from flytekit.types.structured.structured_dataset import (
     LOCAL,
     PARQUET,
     S3,
+    Filters,
     StructuredDataset,
     StructuredDatasetDecoder,
     StructuredDatasetEncoder,
@@ -24,6 +29,299 @@ from flytekit.types.structured.structured_dataset import (
 
 T = TypeVar("T")
 
+# Summary of the row groups of all the files of a sharded dataset, following the convention of Spark and Dask
+METADATA_FILE = "_metadata"
+
+
+def _columns(current_task_metadata: Optional[StructuredDatasetMetadata]) -> Optional[typing.List[str]]:
+    if current_task_metadata is None:
+        return None
+    if current_task_metadata.structured_dataset_type and current_task_metadata.structured_dataset_type.columns:
+        return [c.name for c in current_task_metadata.structured_dataset_type.columns]
+    return None
+
+
+@contextlib.contextmanager
+def _open_file(ctx: FlyteContext, path: str) -> Generator[typing.IO, None, None]:
+    """
+    Opens a file of the dataset to read it while it is downloaded, or downloads it first and removes it afterwards if
+    the persistence plugin cannot stream it.
+    """
+    try:
+        stream = ctx.file_access.open(path, "rb")
+    except UnsupportedPersistenceOp:
+        stream = None
+    if stream is not None:
+        with stream:
+            yield stream
+        return
+
+    local_path = ctx.file_access.get_random_local_path()
+    ctx.file_access.get_data(path, local_path, is_multipart=False)
+    try:
+        with open(local_path, "rb") as f:
+            yield f
+    finally:
+        os.remove(local_path)
+
+
+_COMPARISONS = {
+    "=": pc.equal,
+    "==": pc.equal,
+    "!=": pc.not_equal,
+    "<": pc.less,
+    "<=": pc.less_equal,
+    ">": pc.greater,
+    ">=": pc.greater_equal,
+}
+
+
+def _cannot_match(op: str, value: typing.Any, low: typing.Any, high: typing.Any) -> bool:
+    """
+    Returns true if no value between the given statistics of a column can satisfy the predicate.
+    """
+    try:
+        if op in ("=", "=="):
+            return value < low or value > high
+        if op == "!=":
+            return low == high == value
+        if op == "<":
+            return low >= value
+        if op == "<=":
+            return low > value
+        if op == ">":
+            return high <= value
+        if op == ">=":
+            return high < value
+        if op == "in":
+            return all(v < low or v > high for v in value)
+        if op == "not in":
+            return low == high and low in value
+    except TypeError:
+        # The value cannot be compared with the statistics, e.g. a string with the statistics of an int column
+        pass
+    return False
+
+
+def _may_match(row_group: pq.RowGroupMetaData, filters: Filters) -> bool:
+    """
+    Returns false if the column statistics of the row group rule out every row.
+    """
+    ranges = {}
+    for j in range(row_group.num_columns):
+        column = row_group.column(j)
+        if column.statistics is not None and column.statistics.has_min_max:
+            ranges[column.path_in_schema] = (column.statistics.min, column.statistics.max)
+    return any(
+        not any(col in ranges and _cannot_match(op, value, *ranges[col]) for col, op, value in conjunction)
+        for conjunction in filters
+    )
+
+
+def _check_filters(schema: pa.Schema, filters: Filters):
+    for conjunction in filters:
+        for col, _, _ in conjunction:
+            if schema.get_field_index(col) == -1:
+                raise ValueError(
+                    f"Cannot filter on the column {col}, it is not a column of the dataset: {schema.names}"
+                )
+
+
+def _row_groups(metadata: pq.FileMetaData, filters: Filters) -> typing.List[int]:
+    """
+    Returns the row groups of a parquet file whose column statistics do not rule out every row.
+    """
+    _check_filters(metadata.schema.to_arrow_schema(), filters)
+    return [i for i in range(metadata.num_row_groups) if _may_match(metadata.row_group(i), filters)]
+
+
+def _filter(
+    data: typing.Union[pa.Table, pa.RecordBatch], filters: Filters, columns: Optional[typing.List[str]]
+) -> typing.Union[pa.Table, pa.RecordBatch]:
+    """
+    Keeps the rows matching the filters, and then only the given columns if any.
+    """
+    _check_filters(data.schema, filters)
+    mask = None
+    for conjunction in filters:
+        matches = None
+        for col, op, value in conjunction:
+            array = data.column(data.schema.get_field_index(col))
+            if op in ("in", "not in"):
+                match = pc.is_in(array, value_set=pa.array(value, type=array.type))
+                match = pc.invert(match) if op == "not in" else match
+            else:
+                match = _COMPARISONS[op](array, value)
+            matches = match if matches is None else pc.and_kleene(matches, match)
+        mask = matches if mask is None else pc.or_kleene(mask, matches)
+    data = data.filter(mask)
+    if columns is None:
+        return data
+    return type(data).from_arrays([data.column(data.schema.get_field_index(c)) for c in columns], names=columns)
+
+
+def _read_columns(columns: Optional[typing.List[str]], filters: Optional[Filters]) -> Optional[typing.List[str]]:
+    if columns is None or filters is None:
+        return columns
+    return columns + [col for conjunction in filters for col, _, _ in conjunction if col not in columns]
+
+
+def _parquet_files(
+    ctx: FlyteContext, flyte_value: literals.StructuredDataset, filters: Optional[Filters] = None
+) -> typing.List[str]:
+    """
+    Returns the paths of the parquet files of a dataset, skipping the files whose name starts with "_" or "." like
+    pyarrow does. With filters, the files whose row groups cannot match according to the summary in the
+    ``_metadata`` file, if the dataset has one, are skipped as well.
+    """
+    path = flyte_value.uri
+    try:
+        files = ctx.file_access.list_files(path)
+    except UnsupportedPersistenceOp:
+        # Without a listing, the whole directory has to be downloaded first
+        path = ctx.file_access.get_random_local_directory()
+        ctx.file_access.get_data(flyte_value.uri, path, is_multipart=True)
+        files = [
+            os.path.relpath(os.path.join(root, f), path).replace(os.sep, "/")
+            for root, _, fs in os.walk(path)
+            for f in fs
+        ]
+
+    path = path.rstrip("/")
+    data_files = [rel for rel in sorted(files) if not any(p.startswith(("_", ".")) for p in rel.split("/"))]
+    if filters is not None and METADATA_FILE in files:
+        with _open_file(ctx, f"{path}/{METADATA_FILE}") as stream:
+            summary = pq.read_metadata(stream)
+        summarized, candidates = set(), set()
+        for i in range(summary.num_row_groups):
+            row_group = summary.row_group(i)
+            summarized.add(row_group.column(0).file_path)
+            if _may_match(row_group, filters):
+                candidates.add(row_group.column(0).file_path)
+        data_files = [rel for rel in data_files if rel not in summarized or rel in candidates]
+    return [f"{path}/{rel}" for rel in data_files]
+
+
+def write_parquet_shards(ctx: FlyteContext, table: pa.Table, path: str, **kwargs):
+    """
+    Writes the table to the given directory as parquet files of the number of rows or bytes set in the
+    structured_dataset configuration section, or as a single file by default. The files are encoded concurrently and
+    each is uploaded as soon as it is written. For more than one file, a ``_metadata`` file gathering the statistics
+    of the row groups of all the files is written last, so that readers can pick the files to read without opening
+    them.
+
+    :param kwargs: Passed to :py:func:`pyarrow.parquet.write_table`.
+    """
+    shard_rows = _internal.StructuredDataset.SHARD_ROWS.read()
+    shard_bytes = _internal.StructuredDataset.SHARD_BYTES.read()
+    if not shard_rows and shard_bytes and table.nbytes > 0:
+        shard_rows = max(1, shard_bytes * table.num_rows // table.nbytes)
+    offsets = range(0, table.num_rows, shard_rows) if shard_rows and shard_rows < table.num_rows else [0]
+
+    compression = _internal.StructuredDataset.COMPRESSION.read()
+    if compression:
+        kwargs["compression"] = compression
+    row_group_size = _internal.StructuredDataset.ROW_GROUP_SIZE.read()
+
+    path = path.rstrip("/")
+    local_dir = ctx.file_access.get_random_local_directory()
+    os.makedirs(local_dir, exist_ok=True)
+
+    def write(index: int) -> pq.FileMetaData:
+        name = f"{index:05}"
+        local_path = os.path.join(local_dir, name)
+        collector = []
+        shard = table.slice(offsets[index], shard_rows)
+        pq.write_table(shard, local_path, row_group_size=row_group_size, metadata_collector=collector, **kwargs)
+        ctx.file_access.put_data(local_path, f"{path}/{name}")
+        os.remove(local_path)
+        collector[0].set_file_path(name)
+        return collector[0]
+
+    max_workers = min(len(offsets), _internal.StructuredDataset.WRITE_CONCURRENCY.read() or os.cpu_count() or 1)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        metadata = list(executor.map(write, range(len(offsets))))
+
+    if len(metadata) > 1:
+        local_path = os.path.join(local_dir, METADATA_FILE)
+        pq.write_metadata(table.schema, local_path, metadata_collector=metadata, **kwargs)
+        ctx.file_access.put_data(local_path, f"{path}/{METADATA_FILE}")
+        os.remove(local_path)
+
+
+def iter_parquet_batches(
+    ctx: FlyteContext,
+    flyte_value: literals.StructuredDataset,
+    current_task_metadata: StructuredDatasetMetadata,
+    batch_size: Optional[int] = None,
+    filters: Optional[Filters] = None,
+) -> Generator[pa.RecordBatch, None, None]:
+    """
+    Yields the record batches of the parquet files of a dataset, of at most ``batch_size`` rows or of pyarrow's
+    default size. The files are read one after the other and only when the previous one is exhausted, so at most one
+    row group is held in memory at a time. With filters, only the matching rows are yielded, and the row groups that
+    cannot match according to their statistics are not read at all.
+    """
+    columns = _columns(current_task_metadata)
+    kwargs = {"batch_size": batch_size} if batch_size else {}
+    for path in _parquet_files(ctx, flyte_value, filters):
+        with _open_file(ctx, path) as stream:
+            parquet_file = pq.ParquetFile(stream)
+            if filters is None:
+                yield from parquet_file.iter_batches(columns=columns, **kwargs)
+                continue
+            row_groups = _row_groups(parquet_file.metadata, filters)
+            if not row_groups:
+                continue
+            for batch in parquet_file.iter_batches(
+                row_groups=row_groups, columns=_read_columns(columns, filters), **kwargs
+            ):
+                batch = _filter(batch, filters, columns)
+                if batch.num_rows:
+                    yield batch
+
+
+def read_parquet_table(
+    ctx: FlyteContext,
+    flyte_value: literals.StructuredDataset,
+    current_task_metadata: StructuredDatasetMetadata,
+    filters: Filters,
+) -> pa.Table:
+    """
+    Reads the rows of a dataset that match the filters. Only the footers of the parquet files, which are read with
+    range requests if the persistence plugin can stream files, and the row groups that may match are downloaded.
+    """
+    columns = _columns(current_task_metadata)
+    tables = []
+    schema = None
+    for path in _parquet_files(ctx, flyte_value, filters):
+        with _open_file(ctx, path) as stream:
+            parquet_file = pq.ParquetFile(stream)
+            schema = parquet_file.schema_arrow
+            row_groups = _row_groups(parquet_file.metadata, filters)
+            if row_groups:
+                table = parquet_file.read_row_groups(row_groups, columns=_read_columns(columns, filters))
+                tables.append(_filter(table, filters, columns))
+    if tables:
+        return pa.concat_tables(tables)
+    if schema is None:
+        return pa.table({})
+    if columns is not None:
+        schema = pa.schema([schema.field(c) for c in columns], metadata=schema.metadata)
+    return schema.empty_table()
+
+
+def validate_column_names(df: pd.DataFrame):
+    """
+    Applies the checks of :py:meth:`pandas.DataFrame.to_parquet`, which pyarrow does not do: the column names, with
+    every level of a multi-index, and the index names have to be strings.
+    """
+    levels = df.columns.levels if isinstance(df.columns, pd.MultiIndex) else [df.columns]
+    if not all(level.inferred_type in {"string", "empty"} for level in levels):
+        raise ValueError("parquet must have string column names")
+    if not all(isinstance(name, str) for name in df.index.names if name is not None):
+        raise ValueError("Index level names must be strings")
+
 
 class PandasToParquetEncodingHandler(StructuredDatasetEncoder):
     def __init__(self, protocol: str):
@@ -40,10 +338,9 @@ class PandasToParquetEncodingHandler(StructuredDatasetEncoder):
 
         path = typing.cast(str, structured_dataset.uri) or ctx.file_access.get_random_remote_directory()
         df = typing.cast(pd.DataFrame, structured_dataset.dataframe)
-        local_dir = ctx.file_access.get_random_local_directory()
-        local_path = os.path.join(local_dir, f"{0:05}")
-        df.to_parquet(local_path, coerce_timestamps="us", allow_truncated_timestamps=False)
-        ctx.file_access.upload_directory(local_dir, path)
+        validate_column_names(df)
+        table = pa.Table.from_pandas(df)
+        write_parquet_shards(ctx, table, path, coerce_timestamps="us", allow_truncated_timestamps=False)
         structured_dataset_type.format = PARQUET
         return literals.StructuredDataset(uri=path, metadata=StructuredDatasetMetadata(structured_dataset_type))
 
@@ -52,19 +349,34 @@ class ParquetToPandasDecodingHandler(StructuredDatasetDecoder):
     def __init__(self, protocol: str):
         super().__init__(pd.DataFrame, protocol, PARQUET)
 
+    @property
+    def supports_filters(self) -> bool:
+        return True
+
     def decode(
         self,
         ctx: FlyteContext,
         flyte_value: literals.StructuredDataset,
         current_task_metadata: StructuredDatasetMetadata,
+        filters: Optional[Filters] = None,
     ) -> pd.DataFrame:
+        if filters is not None:
+            return read_parquet_table(ctx, flyte_value, current_task_metadata, filters).to_pandas()
         path = flyte_value.uri
         local_dir = ctx.file_access.get_random_local_directory()
         ctx.file_access.get_data(path, local_dir, is_multipart=True)
-        if current_task_metadata.structured_dataset_type and current_task_metadata.structured_dataset_type.columns:
-            columns = [c.name for c in current_task_metadata.structured_dataset_type.columns]
-            return pd.read_parquet(local_dir, columns=columns)
-        return pd.read_parquet(local_dir)
+        return pd.read_parquet(local_dir, columns=_columns(current_task_metadata))
+
+    def iter_decode(
+        self,
+        ctx: FlyteContext,
+        flyte_value: literals.StructuredDataset,
+        current_task_metadata: StructuredDatasetMetadata,
+        batch_size: Optional[int] = None,
+        filters: Optional[Filters] = None,
+    ) -> Generator[pd.DataFrame, None, None]:
+        for batch in iter_parquet_batches(ctx, flyte_value, current_task_metadata, batch_size, filters):
+            yield batch.to_pandas()
 
 
 class ArrowToParquetEncodingHandler(StructuredDatasetEncoder):
@@ -79,10 +391,7 @@ class ArrowToParquetEncodingHandler(StructuredDatasetEncoder):
     ) -> literals.StructuredDataset:
         path = typing.cast(str, structured_dataset.uri) or ctx.file_access.get_random_remote_path()
         df = structured_dataset.dataframe
-        local_dir = ctx.file_access.get_random_local_directory()
-        local_path = os.path.join(local_dir, f"{0:05}")
-        pq.write_table(df, local_path)
-        ctx.file_access.upload_directory(local_dir, path)
+        write_parquet_shards(ctx, df, path)
         return literals.StructuredDataset(uri=path, metadata=StructuredDatasetMetadata(structured_dataset_type))
 
 
@@ -90,19 +399,34 @@ class ParquetToArrowDecodingHandler(StructuredDatasetDecoder):
     def __init__(self, protocol: str):
         super().__init__(pa.Table, protocol, PARQUET)
 
+    @property
+    def supports_filters(self) -> bool:
+        return True
+
     def decode(
         self,
         ctx: FlyteContext,
         flyte_value: literals.StructuredDataset,
         current_task_metadata: StructuredDatasetMetadata,
+        filters: Optional[Filters] = None,
     ) -> pa.Table:
+        if filters is not None:
+            return read_parquet_table(ctx, flyte_value, current_task_metadata, filters)
         path = flyte_value.uri
         local_dir = ctx.file_access.get_random_local_directory()
         ctx.file_access.get_data(path, local_dir, is_multipart=True)
-        if current_task_metadata.structured_dataset_type and current_task_metadata.structured_dataset_type.columns:
-            columns = [c.name for c in current_task_metadata.structured_dataset_type.columns]
-            return pq.read_table(local_dir, columns=columns)
-        return pq.read_table(local_dir)
+        return pq.read_table(local_dir, columns=_columns(current_task_metadata))
+
+    def iter_decode(
+        self,
+        ctx: FlyteContext,
+        flyte_value: literals.StructuredDataset,
+        current_task_metadata: StructuredDatasetMetadata,
+        batch_size: Optional[int] = None,
+        filters: Optional[Filters] = None,
+    ) -> Generator[pa.Table, None, None]:
+        for batch in iter_parquet_batches(ctx, flyte_value, current_task_metadata, batch_size, filters):
+            yield pa.Table.from_batches([batch])
 
 
 for protocol in [LOCAL, S3]:
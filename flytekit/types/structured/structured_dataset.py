@@ -1,9 +1,12 @@
 from __future__ import annotations
 
 import collections
+import contextlib
+import functools
 import importlib
 import os
 import re
+import threading
 import types
 import typing
 from abc import ABC, abstractmethod
@@ -23,7 +26,8 @@ from dataclasses_json import config, dataclass_json
 from marshmallow import fields
 from typing_extensions import Annotated, TypeAlias, get_args, get_origin
 
-from flytekit.core.context_manager import FlyteContext, FlyteContextManager
+from flytekit.configuration import internal as _internal
+from flytekit.core.context_manager import ExecutionState, FlyteContext, FlyteContextManager
 from flytekit.core.type_engine import TypeEngine, TypeTransformer
 from flytekit.loggers import logger
 from flytekit.models import literals
@@ -46,6 +50,38 @@ StructuredDatasetFormat: TypeAlias = str
 # Storage formats
 PARQUET: StructuredDatasetFormat = "parquet"
 
+# Row filters in disjunctive normal form, like the filters of pyarrow.parquet.read_table: the rows matching all the
+# (column, operator, value) predicates of any of the inner lists are kept.
+Filters: TypeAlias = typing.List[typing.List[typing.Tuple[str, str, typing.Any]]]
+FILTER_OPERATORS = ("=", "==", "!=", "<", "<=", ">", ">=", "in", "not in")
+
+
+def normalize_filters(filters: typing.Sequence) -> Filters:
+    """
+    Checks the given filters and returns them in disjunctive normal form. A flat list of predicates is a single
+    conjunction, e.g. ``[("year", ">=", 2020), ("country", "in", ["FR", "DE"])]``.
+    """
+    if not filters:
+        raise ValueError("Filters cannot be empty")
+    if isinstance(filters[0], tuple):
+        filters = [filters]
+    normalized = []
+    for conjunction in filters:
+        if not conjunction:
+            raise ValueError(f"Filters {filters} contain an empty conjunction")
+        predicates = []
+        for predicate in conjunction:
+            if not isinstance(predicate, tuple) or len(predicate) != 3:
+                raise ValueError(f"Expected a (column, operator, value) tuple, got {predicate}")
+            column, op, value = predicate
+            if op not in FILTER_OPERATORS:
+                raise ValueError(f"Unsupported operator {op} in {predicate}, expected one of {FILTER_OPERATORS}")
+            if op in ("in", "not in"):
+                value = list(value)
+            predicates.append((column, op, value))
+        normalized.append(predicates)
+    return normalized
+
 
 @dataclass_json
 @dataclass
@@ -85,6 +121,8 @@ class StructuredDataset(object):
         self._literal_sd: Optional[literals.StructuredDataset] = None
         # Not meant for users to set, will be set by an open() call
         self._dataframe_type = None
+        # Not meant for users to set, will be set by a filter() call
+        self._filters: Optional[Filters] = None
 
     @property
     def dataframe(self) -> Type[typing.Any]:
@@ -102,18 +140,42 @@ class StructuredDataset(object):
         self._dataframe_type = dataframe_type
         return self
 
+    def filter(self, filters: typing.Sequence) -> StructuredDataset:
+        """
+        Only reads the rows matching the given filters, see :py:func:`normalize_filters`. Decoders that support it push
+        the filters down to the storage, e.g. the parquet decoders skip the files and row groups whose statistics
+        rule out any match, so that only the data that is needed is downloaded.
+
+        .. code-block:: python
+
+            df = sd.open(pd.DataFrame).filter([("year", ">=", 2020)]).all()
+        """
+        self._filters = normalize_filters(filters)
+        return self
+
     def all(self) -> DF:
         if self._dataframe_type is None:
             raise ValueError("No dataframe type set. Use open() to set the local dataframe type you want to use.")
         ctx = FlyteContextManager.current_context()
-        return flyte_dataset_transformer.open_as(ctx, self.literal, self._dataframe_type, self.metadata)
+        return flyte_dataset_transformer.open_as(
+            ctx, self.literal, self._dataframe_type, self.metadata, filters=self._filters
+        )
 
-    def iter(self) -> Generator[DF, None, None]:
+    def iter(self, batch_size: Optional[int] = None) -> Generator[DF, None, None]:
+        """
+        Iterates over the dataset in dataframes of at most ``batch_size`` rows, if the decoder supports it, so that the
+        whole dataset never needs to fit in memory.
+        """
         if self._dataframe_type is None:
             raise ValueError("No dataframe type set. Use open() to set the local dataframe type you want to use.")
         ctx = FlyteContextManager.current_context()
         return flyte_dataset_transformer.iter_as(
-            ctx, self.literal, self._dataframe_type, updated_metadata=self.metadata
+            ctx,
+            self.literal,
+            self._dataframe_type,
+            updated_metadata=self.metadata,
+            batch_size=batch_size,
+            filters=self._filters,
         )
 
 
@@ -139,6 +201,12 @@ def extract_cols_and_format(
         optional str for the format,
         optional pyarrow Schema
     """
+    return _PARSED_TYPES(t)
+
+
+def _extract_cols_and_format(
+    t: typing.Any,
+) -> typing.Tuple[Type[T], Optional[typing.OrderedDict[str, Type]], Optional[str], Optional[pa.lib.Schema]]:
     fmt = None
     ordered_dict_cols = None
     pa_schema = None
@@ -164,6 +232,160 @@ def extract_cols_and_format(
     return t, ordered_dict_cols, fmt, pa_schema
 
 
+class _IdentityCache(object):
+    """
+    Memoizes a function of a single argument by the identity of that argument. Unlike ``functools.lru_cache`` this
+    works for unhashable arguments, like an ``Annotated`` type carrying a column dict. Arguments are kept alive by the
+    cache so that their ids can't be reused by other objects while they are cached.
+    """
+
+    def __init__(self, fn: typing.Callable[[typing.Any], typing.Any], maxsize: int = 1024):
+        self._fn = fn
+        self._maxsize = maxsize
+        self._entries: Dict[int, typing.Tuple[typing.Any, typing.Any]] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, arg: typing.Any) -> typing.Any:
+        with self._lock:
+            entry = self._entries.get(id(arg))
+            if entry is not None and entry[0] is arg:
+                return entry[1]
+        # Computed without the lock, a value computed concurrently by another thread is returned instead of this one.
+        value = self._fn(arg)
+        with self._lock:
+            entry = self._entries.get(id(arg))
+            if entry is not None and entry[0] is arg:
+                return entry[1]
+            if len(self._entries) >= self._maxsize:
+                # Evict the oldest entry, dicts are ordered by insertion.
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[id(arg)] = (arg, value)
+        return value
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_PARSED_TYPES = _IdentityCache(_extract_cols_and_format)
+
+# The size of the dataframes kept in memory for local executions, unless configured otherwise.
+DEFAULT_LOCAL_HANDOFF_BYTES = 2**30
+
+
+class _LocalDataFrames(object):
+    """
+    The pandas DataFrames and Arrow Tables written during a local execution, by the uri they were written to. Tasks
+    running later in the same execution are handed these instead of reading the parquet files back, converting between
+    pandas and Arrow in memory if they ask for the other one. The files are still written, since anything outside of
+    this process, like the local cache or the outputs of a run, can only refer to them by their uri.
+
+    Dataframes are kept as Arrow Tables, so that later changes to the object a task returned are not seen by the tasks
+    consuming it. They are only kept while a top level local execution is running, see :py:meth:`scope`, and the least
+    recently used ones are dropped once their total size exceeds the configured number of bytes.
+    """
+
+    def __init__(self):
+        self._entries: "collections.OrderedDict[str, typing.Tuple[pa.Table, int]]" = collections.OrderedDict()
+        self._nbytes = 0
+        self._scopes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def enabled(ctx: FlyteContext) -> bool:
+        return ctx.execution_state is not None and ctx.execution_state.mode in (
+            ExecutionState.Mode.LOCAL_WORKFLOW_EXECUTION,
+            ExecutionState.Mode.LOCAL_TASK_EXECUTION,
+        )
+
+    @contextlib.contextmanager
+    def scope(self):
+        """
+        Keeps the dataframes written until the outermost scope exits. Local executions of workflows and tasks enter
+        one, executions running concurrently in other threads share it.
+        """
+        with self._lock:
+            self._scopes += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._scopes -= 1
+                if self._scopes == 0:
+                    self._entries.clear()
+                    self._nbytes = 0
+
+    @staticmethod
+    def _size(df: typing.Any) -> Optional[int]:
+        if isinstance(df, pd.DataFrame):
+            return int(df.memory_usage(index=True, deep=True).sum())
+        if isinstance(df, pa.Table):
+            return df.nbytes
+        return None
+
+    def put(self, uri: str, df: typing.Any):
+        max_bytes = _internal.StructuredDataset.LOCAL_HANDOFF_BYTES.read()
+        if max_bytes is None:
+            max_bytes = DEFAULT_LOCAL_HANDOFF_BYTES
+        nbytes = self._size(df)
+        if not self._scopes or nbytes is None or nbytes > max_bytes:
+            return
+        if isinstance(df, pd.DataFrame):
+            try:
+                # Numeric columns without nulls share their buffers with the DataFrame they are converted from, so a
+                # copy is converted for the table not to change along with the original.
+                df = pa.Table.from_pandas(df.copy())
+            except pa.ArrowException as e:
+                logger.debug(f"Not keeping the dataframe written to {uri} in memory, {e}")
+                return
+            nbytes = df.nbytes
+        with self._lock:
+            if not self._scopes:
+                return
+            self._pop(uri)
+            self._entries[uri] = (df, nbytes)
+            self._nbytes += nbytes
+            while self._nbytes > max_bytes:
+                self._pop(next(iter(self._entries)))
+
+    def _pop(self, uri: str):
+        entry = self._entries.pop(uri, None)
+        if entry is not None:
+            self._nbytes -= entry[1]
+
+    def get(self, uri: str, df_type: Type[DF], columns: Optional[typing.List[str]]) -> Optional[DF]:
+        """
+        Returns the dataframe written to the uri as the requested type, subset to the given columns, or None if it
+        isn't in memory anymore or can't be converted.
+        """
+        with self._lock:
+            entry = self._entries.get(uri)
+            if entry is None:
+                return None
+            self._entries.move_to_end(uri)
+        table = entry[0]
+
+        if columns and not set(columns).issubset(table.column_names):
+            return None
+        if df_type is pa.Table:
+            # Arrow tables are immutable, so they can be shared as they are.
+            return table.select(columns) if columns else table
+        if df_type is pd.DataFrame:
+            if columns:
+                # Like when reading parquet files, the index is kept along with the selected columns.
+                pandas_metadata = table.schema.pandas_metadata or {}
+                index = [c for c in pandas_metadata.get("index_columns", []) if isinstance(c, str) and c not in columns]
+                table = table.select(columns + index)
+            return table.to_pandas()
+        return None
+
+
+_local_dataframes = _LocalDataFrames()
+
+
 class StructuredDatasetEncoder(ABC):
     def __init__(self, python_type: Type[T], protocol: str, supported_format: Optional[str] = None):
         """
@@ -255,6 +477,14 @@ class StructuredDatasetDecoder(ABC):
     def supported_format(self) -> str:
         return self._supported_format
 
+    @property
+    def supports_filters(self) -> bool:
+        """
+        Decoders returning true here accept a ``filters`` keyword argument in decode and iter_decode, the rows to read
+        in the format returned by :py:func:`normalize_filters`. It is only passed when the user filters the dataset.
+        """
+        return False
+
     @abstractmethod
     def decode(
         self,
@@ -276,6 +506,22 @@ class StructuredDatasetDecoder(ABC):
         """
         raise NotImplementedError
 
+    def iter_decode(
+        self,
+        ctx: FlyteContext,
+        flyte_value: literals.StructuredDataset,
+        current_task_metadata: StructuredDatasetMetadata,
+        batch_size: Optional[int] = None,
+        **kwargs,
+    ) -> Generator[DF, None, None]:
+        """
+        This is called instead of decode when the dataset is iterated over, see :py:meth:`StructuredDataset.iter`.
+        Decoders that can read the dataset piece by piece should override this to return a generator of dataframes of
+        at most ``batch_size`` rows, or of a size of their choosing if it is None. By default, this returns the result
+        of decode, which must then be a generator.
+        """
+        return self.decode(ctx, flyte_value, current_task_metadata, **kwargs)
+
 
 def protocol_prefix(uri: str) -> str:
     g = re.search(r"([\w]+)://.*", uri)
@@ -336,6 +582,11 @@ class StructuredDatasetTransformerEngine(TypeTransformer[StructuredDataset]):
     DEFAULT_PROTOCOLS: Dict[Type, str] = {}
     DEFAULT_FORMATS: Dict[Type, str] = {}
 
+    # Flat dispatch tables of the handlers resolved for a (df_type, protocol, format), including the fallbacks to the
+    # format-agnostic handlers. They are cleared whenever a handler is registered.
+    _RESOLVED_ENCODERS: Dict[typing.Tuple[Type, str, str], StructuredDatasetEncoder] = {}
+    _RESOLVED_DECODERS: Dict[typing.Tuple[Type, str, str], StructuredDatasetDecoder] = {}
+
     Handlers = Union[StructuredDatasetEncoder, StructuredDatasetDecoder]
 
     @staticmethod
@@ -356,11 +607,21 @@ class StructuredDatasetTransformerEngine(TypeTransformer[StructuredDataset]):
 
     @classmethod
     def get_encoder(cls, df_type: Type, protocol: str, format: str):
-        return cls._finder(StructuredDatasetTransformerEngine.ENCODERS, df_type, protocol, format)
+        key = (df_type, protocol, format)
+        h = cls._RESOLVED_ENCODERS.get(key)
+        if h is None:
+            h = cls._finder(StructuredDatasetTransformerEngine.ENCODERS, df_type, protocol, format)
+            cls._RESOLVED_ENCODERS[key] = h
+        return h
 
     @classmethod
     def get_decoder(cls, df_type: Type, protocol: str, format: str):
-        return cls._finder(StructuredDatasetTransformerEngine.DECODERS, df_type, protocol, format)
+        key = (df_type, protocol, format)
+        h = cls._RESOLVED_DECODERS.get(key)
+        if h is None:
+            h = cls._finder(StructuredDatasetTransformerEngine.DECODERS, df_type, protocol, format)
+            cls._RESOLVED_DECODERS[key] = h
+        return h
 
     @classmethod
     def _handler_finder(cls, h: Handlers) -> Dict[str, Handlers]:
@@ -384,6 +645,11 @@ class StructuredDatasetTransformerEngine(TypeTransformer[StructuredDataset]):
         # Instances of StructuredDataset opt-in to the ability of being cached.
         self._hash_overridable = True
 
+        # The dataset columns of each column dict, converted once per distinct set of columns. Column dicts whose
+        # types can't be hashed are converted once per dict instead.
+        self._converted_columns = functools.lru_cache(maxsize=1024)(self._convert_column_items)
+        self._converted_unhashable_columns = _IdentityCache(self._convert_columns)
+
     @classmethod
     def register(cls, h: Handlers, default_for_type: Optional[bool] = True, override: Optional[bool] = False):
         """
@@ -395,6 +661,8 @@ class StructuredDatasetTransformerEngine(TypeTransformer[StructuredDataset]):
         if h.supported_format in lowest_level and override is False:
             raise ValueError(f"Already registered a handler for {(h.python_type, h.protocol, h.supported_format)}")
         lowest_level[h.supported_format] = h
+        StructuredDatasetTransformerEngine._RESOLVED_ENCODERS.clear()
+        StructuredDatasetTransformerEngine._RESOLVED_DECODERS.clear()
         logger.debug(f"Registered {h} as handler for {h.python_type}, protocol {h.protocol}, fmt {h.supported_format}")
 
         if default_for_type:
@@ -405,8 +673,7 @@ class StructuredDatasetTransformerEngine(TypeTransformer[StructuredDataset]):
         # Register with the type engine as well
         # The semantics as of now are such that it doesn't matter which order these transformers are loaded in, as
         # long as the older Pandas/FlyteSchema transformer do not also specify the override
-        engine = StructuredDatasetTransformerEngine()
-        TypeEngine.register_additional_type(engine, h.python_type, override=True)
+        TypeEngine.register_additional_type(flyte_dataset_transformer, h.python_type, override=True)
 
     def assert_type(self, t: Type[StructuredDataset], v: typing.Any):
         return
@@ -421,9 +688,6 @@ class StructuredDatasetTransformerEngine(TypeTransformer[StructuredDataset]):
         # Make a copy in case we need to hand off to encoders, since we can't be sure of mutations.
         # Check first to see if it's even an SD type. For backwards compatibility, we may be getting a FlyteSchema
         python_type, *attrs = extract_cols_and_format(python_type)
-        # In case it's a FlyteSchema
-        sdt = StructuredDatasetType(format=self.DEFAULT_FORMATS.get(python_type, None))
-
         if expected and expected.structured_dataset_type:
             sdt = StructuredDatasetType(
                 columns=expected.structured_dataset_type.columns,
@@ -431,6 +695,9 @@ class StructuredDatasetTransformerEngine(TypeTransformer[StructuredDataset]):
                 external_schema_type=expected.structured_dataset_type.external_schema_type,
                 external_schema_bytes=expected.structured_dataset_type.external_schema_bytes,
             )
+        else:
+            # In case it's a FlyteSchema
+            sdt = StructuredDatasetType(format=self.DEFAULT_FORMATS.get(python_type, None))
 
         # If the type signature has the StructuredDataset class, it will, or at least should, also be a
         # StructuredDataset instance.
@@ -513,6 +780,8 @@ class StructuredDatasetTransformerEngine(TypeTransformer[StructuredDataset]):
         # Note that this will always be the same as the incoming format except for when the fallback handler
         # with a format of "" is used.
         sd_model.metadata._structured_dataset_type.format = handler.supported_format
+        if _LocalDataFrames.enabled(ctx):
+            _local_dataframes.put(sd_model.uri, sd.dataframe)
         return Literal(scalar=Scalar(structured_dataset=sd_model))
 
     def to_python_value(self, ctx: FlyteContext, lv: Literal, expected_python_type: Type[T]) -> T:
@@ -656,17 +925,25 @@ class StructuredDatasetTransformerEngine(TypeTransformer[StructuredDataset]):
         sd: literals.StructuredDataset,
         df_type: Type[DF],
         updated_metadata: StructuredDatasetMetadata,
+        filters: Optional[Filters] = None,
     ) -> DF:
         """
         :param ctx: A FlyteContext, useful in accessing the filesystem and other attributes
         :param sd:
         :param df_type:
         :param updated_metadata: New metadata type, since it might be different from the metadata in the literal.
+        :param filters: The rows to read, see :py:meth:`StructuredDataset.filter`.
         :return: dataframe. It could be pandas dataframe or arrow table, etc.
         """
+        if not filters and _LocalDataFrames.enabled(ctx):
+            sdt = updated_metadata.structured_dataset_type if updated_metadata else None
+            columns = [c.name for c in sdt.columns] if sdt and sdt.columns else None
+            df = _local_dataframes.get(sd.uri, df_type, columns)
+            if df is not None:
+                return df
         protocol = protocol_prefix(sd.uri)
         decoder = self.get_decoder(df_type, protocol, sd.metadata.structured_dataset_type.format)
-        result = decoder.decode(ctx, sd, updated_metadata)
+        result = decoder.decode(ctx, sd, updated_metadata, **self._filter_kwargs(decoder, filters))
         if isinstance(result, types.GeneratorType):
             raise ValueError(f"Decoder {decoder} returned iterator {result} but whole value requested from {sd}")
         return result
@@ -677,14 +954,35 @@ class StructuredDatasetTransformerEngine(TypeTransformer[StructuredDataset]):
         sd: literals.StructuredDataset,
         df_type: Type[DF],
         updated_metadata: StructuredDatasetMetadata,
+        batch_size: Optional[int] = None,
+        filters: Optional[Filters] = None,
     ) -> Generator[DF, None, None]:
+        """
+        :param ctx: A FlyteContext, useful in accessing the filesystem and other attributes
+        :param sd:
+        :param df_type:
+        :param updated_metadata: New metadata type, since it might be different from the metadata in the literal.
+        :param batch_size: The maximum number of rows of each dataframe, see :py:meth:`StructuredDatasetDecoder.iter_decode`.
+        :param filters: The rows to read, see :py:meth:`StructuredDataset.filter`.
+        :return: generator of dataframes. It could be pandas dataframes or arrow tables, etc.
+        """
         protocol = protocol_prefix(sd.uri)
-        decoder = self.DECODERS[df_type][protocol][sd.metadata.structured_dataset_type.format]
-        result = decoder.decode(ctx, sd, updated_metadata)
+        decoder = self.get_decoder(df_type, protocol, sd.metadata.structured_dataset_type.format)
+        result = decoder.iter_decode(
+            ctx, sd, updated_metadata, batch_size=batch_size, **self._filter_kwargs(decoder, filters)
+        )
         if not isinstance(result, types.GeneratorType):
             raise ValueError(f"Decoder {decoder} didn't return iterator {result} but should have from {sd}")
         return result
 
+    @staticmethod
+    def _filter_kwargs(decoder: StructuredDatasetDecoder, filters: Optional[Filters]) -> Dict[str, Filters]:
+        if not filters:
+            return {}
+        if not decoder.supports_filters:
+            raise ValueError(f"Decoder {decoder} cannot filter the rows of a dataset")
+        return {"filters": filters}
+
     def _get_dataset_column_literal_type(self, t: Type) -> type_models.LiteralType:
         if t in self._SUPPORTED_TYPES:
             return self._SUPPORTED_TYPES[t]
@@ -697,9 +995,27 @@ class StructuredDatasetTransformerEngine(TypeTransformer[StructuredDataset]):
     def _convert_ordered_dict_of_columns_to_list(
         self, column_map: typing.OrderedDict[str, Type]
     ) -> typing.List[StructuredDatasetType.DatasetColumn]:
-        converted_cols: typing.List[StructuredDatasetType.DatasetColumn] = []
         if column_map is None or len(column_map) == 0:
-            return converted_cols
+            return []
+        items = tuple(column_map.items())
+        try:
+            hash(items)
+        except TypeError:
+            columns = self._converted_unhashable_columns(column_map)
+        else:
+            columns = self._converted_columns(items)
+        # Copy the cached list, callers are free to modify the one they get.
+        return list(columns)
+
+    def _convert_column_items(
+        self, items: typing.Tuple[typing.Tuple[str, Type], ...]
+    ) -> typing.List[StructuredDatasetType.DatasetColumn]:
+        return self._convert_columns(collections.OrderedDict(items))
+
+    def _convert_columns(
+        self, column_map: typing.OrderedDict[str, Type]
+    ) -> typing.List[StructuredDatasetType.DatasetColumn]:
+        converted_cols: typing.List[StructuredDatasetType.DatasetColumn] = []
         for k, v in column_map.items():
             lt = self._get_dataset_column_literal_type(v)
             converted_cols.append(StructuredDatasetType.DatasetColumn(name=k, literal_type=lt))
@@ -1,19 +1,21 @@
-import os
 import typing
 from pathlib import Path
+from typing import Generator, Optional
 
 import pyarrow as pa
 import pyarrow.parquet as pq
 from botocore.exceptions import NoCredentialsError
 from flytekitplugins.fsspec.persist import FSSpecPersistence
-from fsspec.core import split_protocol, strip_protocol
+from fsspec.core import split_protocol
 
 from flytekit import FlyteContext, logger
 from flytekit.models import literals
 from flytekit.models.literals import StructuredDatasetMetadata
 from flytekit.models.types import StructuredDatasetType
+from flytekit.types.structured.basic_dfs import iter_parquet_batches, read_parquet_table, write_parquet_shards
 from flytekit.types.structured.structured_dataset import (
     PARQUET,
+    Filters,
     StructuredDataset,
     StructuredDatasetDecoder,
     StructuredDatasetEncoder,
@@ -31,12 +33,7 @@ class ArrowToParquetEncodingHandler(StructuredDatasetEncoder):
         structured_dataset_type: StructuredDatasetType,
     ) -> literals.StructuredDataset:
         uri = typing.cast(str, structured_dataset.uri) or ctx.file_access.get_random_remote_directory()
-        if not ctx.file_access.is_remote(uri):
-            Path(uri).mkdir(parents=True, exist_ok=True)
-        path = os.path.join(uri, f"{0:05}")
-        fp = FSSpecPersistence(data_config=ctx.file_access.data_config)
-        filesystem = fp.get_filesystem(path)
-        pq.write_table(structured_dataset.dataframe, strip_protocol(path), filesystem=filesystem)
+        write_parquet_shards(ctx, structured_dataset.dataframe, uri)
         return literals.StructuredDataset(uri=uri, metadata=StructuredDatasetMetadata(structured_dataset_type))
 
 
@@ -44,12 +41,19 @@ class ParquetToArrowDecodingHandler(StructuredDatasetDecoder):
     def __init__(self, protocol: str):
         super().__init__(pa.Table, protocol, PARQUET)
 
+    @property
+    def supports_filters(self) -> bool:
+        return True
+
     def decode(
         self,
         ctx: FlyteContext,
         flyte_value: literals.StructuredDataset,
         current_task_metadata: StructuredDatasetMetadata,
+        filters: Optional[Filters] = None,
     ) -> pa.Table:
+        if filters is not None:
+            return read_parquet_table(ctx, flyte_value, current_task_metadata, filters)
         uri = flyte_value.uri
         if not ctx.file_access.is_remote(uri):
             Path(uri).parent.mkdir(parents=True, exist_ok=True)
@@ -68,3 +72,14 @@ class ParquetToArrowDecodingHandler(StructuredDatasetDecoder):
             if fs is not None:
                 return pq.read_table(path, filesystem=fs, columns=columns)
             raise e
+
+    def iter_decode(
+        self,
+        ctx: FlyteContext,
+        flyte_value: literals.StructuredDataset,
+        current_task_metadata: StructuredDatasetMetadata,
+        batch_size: Optional[int] = None,
+        filters: Optional[Filters] = None,
+    ) -> Generator[pa.Table, None, None]:
+        for batch in iter_parquet_batches(ctx, flyte_value, current_task_metadata, batch_size, filters):
+            yield pa.Table.from_batches([batch])
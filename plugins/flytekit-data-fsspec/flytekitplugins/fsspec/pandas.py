@@ -1,8 +1,8 @@
-import os
 import typing
-from pathlib import Path
+from typing import Generator, Optional
 
 import pandas as pd
+import pyarrow as pa
 from botocore.exceptions import NoCredentialsError
 from flytekitplugins.fsspec.persist import FSSpecPersistence, s3_setup_args
 
@@ -11,9 +11,16 @@ from flytekit.configuration import DataConfig
 from flytekit.models import literals
 from flytekit.models.literals import StructuredDatasetMetadata
 from flytekit.models.types import StructuredDatasetType
+from flytekit.types.structured.basic_dfs import (
+    iter_parquet_batches,
+    read_parquet_table,
+    validate_column_names,
+    write_parquet_shards,
+)
 from flytekit.types.structured.structured_dataset import (
     PARQUET,
     S3,
+    Filters,
     StructuredDataset,
     StructuredDatasetDecoder,
     StructuredDatasetEncoder,
@@ -40,16 +47,10 @@ class PandasToParquetEncodingHandler(StructuredDatasetEncoder):
         structured_dataset_type: StructuredDatasetType,
     ) -> literals.StructuredDataset:
         uri = typing.cast(str, structured_dataset.uri) or ctx.file_access.get_random_remote_directory()
-        if not ctx.file_access.is_remote(uri):
-            Path(uri).mkdir(parents=True, exist_ok=True)
-        path = os.path.join(uri, f"{0:05}")
         df = typing.cast(pd.DataFrame, structured_dataset.dataframe)
-        df.to_parquet(
-            path,
-            coerce_timestamps="us",
-            allow_truncated_timestamps=False,
-            storage_options=get_storage_options(ctx.file_access.data_config, path),
-        )
+        validate_column_names(df)
+        table = pa.Table.from_pandas(df)
+        write_parquet_shards(ctx, table, uri, coerce_timestamps="us", allow_truncated_timestamps=False)
         structured_dataset_type.format = PARQUET
         return literals.StructuredDataset(uri=uri, metadata=StructuredDatasetMetadata(structured_dataset_type))
 
@@ -58,12 +59,19 @@ class ParquetToPandasDecodingHandler(StructuredDatasetDecoder):
     def __init__(self, protocol: str):
         super().__init__(pd.DataFrame, protocol, PARQUET)
 
+    @property
+    def supports_filters(self) -> bool:
+        return True
+
     def decode(
         self,
         ctx: FlyteContext,
         flyte_value: literals.StructuredDataset,
         current_task_metadata: StructuredDatasetMetadata,
+        filters: Optional[Filters] = None,
     ) -> pd.DataFrame:
+        if filters is not None:
+            return read_parquet_table(ctx, flyte_value, current_task_metadata, filters).to_pandas()
         uri = flyte_value.uri
         columns = None
         kwargs = get_storage_options(ctx.file_access.data_config, uri)
@@ -75,3 +83,14 @@ class ParquetToPandasDecodingHandler(StructuredDatasetDecoder):
             logger.debug("S3 source detected, attempting anonymous S3 access")
             kwargs["anon"] = True
             return pd.read_parquet(uri, columns=columns, storage_options=kwargs)
+
+    def iter_decode(
+        self,
+        ctx: FlyteContext,
+        flyte_value: literals.StructuredDataset,
+        current_task_metadata: StructuredDatasetMetadata,
+        batch_size: Optional[int] = None,
+        filters: Optional[Filters] = None,
+    ) -> Generator[pd.DataFrame, None, None]:
+        for batch in iter_parquet_batches(ctx, flyte_value, current_task_metadata, batch_size, filters):
+            yield batch.to_pandas()
@@ -1,10 +1,13 @@
+import asyncio
 import os
 import typing
+import weakref
 
 import fsspec
 from fsspec.registry import known_implementations
 
 from flytekit.configuration import DataConfig, S3Config
+from flytekit.core.data_transfer import transfer_files
 from flytekit.extend import DataPersistence, DataPersistencePlugins
 from flytekit.loggers import logger
 
@@ -31,6 +34,9 @@ def s3_setup_args(s3_cfg: S3Config):
     if s3_cfg.endpoint is not None:
         kwargs["client_kwargs"] = {"endpoint_url": s3_cfg.endpoint}
 
+    if s3_cfg.max_pool_connections is not None:
+        kwargs["config_kwargs"] = {"max_pool_connections": s3_cfg.max_pool_connections}
+
     return kwargs
 
 
@@ -42,10 +48,16 @@ class FSSpecPersistence(DataPersistence):
     method
     """
 
+    concurrent_transfers = True
+
     def __init__(self, default_prefix=None, data_config: typing.Optional[DataConfig] = None):
         super(FSSpecPersistence, self).__init__(name="fsspec-persistence", default_prefix=default_prefix)
         self.default_protocol = self.get_protocol(default_prefix)
         self._data_cfg = data_config if data_config else DataConfig.auto()
+        # Async filesystems hold sessions bound to the event loop they were created in
+        self._async_filesystems: typing.MutableMapping[
+            asyncio.AbstractEventLoop, typing.Dict[str, typing.Any]
+        ] = weakref.WeakKeyDictionary()
 
     @staticmethod
     def get_protocol(path: typing.Optional[str] = None):
@@ -71,6 +83,26 @@ class FSSpecPersistence(DataPersistence):
             return anonymous_fs
         return None
 
+    def get_async_filesystem(self, path: str) -> typing.Optional[fsspec.AbstractFileSystem]:
+        """
+        Returns an async filesystem for the protocol of the path, bound to the running event loop, or None if fsspec
+        has no async implementation for the protocol.
+        """
+        protocol = FSSpecPersistence.get_protocol(path)
+        try:
+            if not getattr(fsspec.get_filesystem_class(protocol), "async_impl", False):
+                return None
+        except (ImportError, ValueError):
+            return None
+        loop = asyncio.get_running_loop()
+        filesystems = self._async_filesystems.setdefault(loop, {})
+        if protocol not in filesystems:
+            kwargs = s3_setup_args(self._data_cfg.s3) if protocol == "s3" else {}
+            filesystems[protocol] = fsspec.filesystem(
+                protocol, asynchronous=True, loop=loop, skip_instance_cache=True, **kwargs
+            )  # type: ignore
+        return filesystems[protocol]
+
     @staticmethod
     def recursive_paths(f: str, t: str) -> typing.Tuple[str, str]:
         if not f.endswith("*"):
@@ -79,6 +111,22 @@ class FSSpecPersistence(DataPersistence):
             t += "/"
         return f, t
 
+    def listdir(self, path: str, recursive: bool = False) -> typing.Generator[str, None, None]:
+        fs = self.get_filesystem(path)
+        protocol = FSSpecPersistence.get_protocol(path)
+        try:
+            paths = fs.find(path) if recursive else fs.ls(path, detail=False)
+        except OSError as oe:
+            logger.debug(f"Error in listing {path} {oe}")
+            fs = self.get_anonymous_filesystem(path)
+            if fs is None:
+                raise oe
+            logger.debug("S3 source detected, attempting anonymous S3 listing")
+            paths = fs.find(path) if recursive else fs.ls(path, detail=False)
+        for p in paths:
+            # fsspec drops the protocol of remote paths
+            yield p if protocol == "file" else f"{protocol}://{p}"
+
     def exists(self, path: str) -> bool:
         try:
             fs = self.get_filesystem(path)
@@ -117,11 +165,64 @@ class FSSpecPersistence(DataPersistence):
             lfs = LocalFileSystem()
             lpaths = lfs.expand_path(from_path, recursive=recursive)
             rpaths = other_paths(lpaths, to_path)
-            for l, r in zip(lpaths, rpaths):
-                fs.put_file(l, r)
+            cfg = self._data_cfg.transfer
+            transfer_files(
+                lambda l, r: fs.put_file(l, r, **self._put_kwargs(to_path)),
+                zip(lpaths, rpaths),
+                lambda l, _: os.path.getsize(l) if os.path.isfile(l) else 0,
+                max_concurrency=cfg.max_concurrency,
+                retries=cfg.retries,
+                backoff=cfg.backoff,
+            )
             return
             # END OF HACK!!
-        return fs.put(from_path, to_path, recursive=recursive)
+        return fs.put(from_path, to_path, recursive=recursive, **self._put_kwargs(to_path))
+
+    def _put_kwargs(self, to_path: str) -> typing.Dict[str, typing.Any]:
+        # s3fs and gcsfs upload files larger than the chunksize in multiple parts
+        chunksize = self._data_cfg.transfer.multipart_chunksize
+        if chunksize and FSSpecPersistence.get_protocol(to_path) in ("s3", "gs"):
+            return {"chunksize": chunksize}
+        return {}
+
+    def open(self, path: str, mode: str = "rb", **kwargs) -> typing.IO:
+        # The files of remote filesystems fetch byte ranges on demand and read ahead by default, and writers upload in
+        # parts as they are written
+        fs = self.get_filesystem(path)
+        try:
+            return fs.open(path, mode, **kwargs)
+        except OSError as oe:
+            logger.debug(f"Error in opening {path} {oe}")
+            fs = self.get_anonymous_filesystem(path)
+            if fs is not None and "r" in mode:
+                logger.debug("S3 source detected, attempting anonymous S3 open")
+                return fs.open(path, mode, **kwargs)
+            raise oe
+
+    async def aexists(self, path: str) -> bool:
+        fs = self.get_async_filesystem(path)
+        if fs is not None:
+            try:
+                return await fs._exists(path)
+            except OSError as oe:
+                logger.debug(f"Error in async exists checking {path} {oe}")
+        return await super().aexists(path)
+
+    async def aget(self, from_path: str, to_path: str, recursive: bool = False):
+        fs = self.get_async_filesystem(from_path)
+        if fs is not None and not recursive:
+            try:
+                return await fs._get_file(from_path, to_path)
+            except OSError as oe:
+                # The sync version falls back to anonymous access
+                logger.debug(f"Error in async getting {from_path} to {to_path} {oe}")
+        return await super().aget(from_path, to_path, recursive=recursive)
+
+    async def aput(self, from_path: str, to_path: str, recursive: bool = False):
+        fs = self.get_async_filesystem(to_path)
+        if fs is not None and not recursive:
+            return await fs._put_file(from_path, to_path, **self._put_kwargs(to_path))
+        return await super().aput(from_path, to_path, recursive=recursive)
 
     def construct_path(self, add_protocol: bool, add_prefix: bool, *paths) -> str:
         path_list = list(paths)  # make type check happy
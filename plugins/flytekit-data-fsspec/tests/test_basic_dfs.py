@@ -1,9 +1,21 @@
+import os
+
+import mock
 import pandas as pd
 import pyarrow as pa
-from flytekitplugins.fsspec.pandas import get_storage_options
+import pytest
+from flytekitplugins.fsspec.arrow import ArrowToParquetEncodingHandler, ParquetToArrowDecodingHandler
+from flytekitplugins.fsspec.pandas import (
+    PandasToParquetEncodingHandler,
+    ParquetToPandasDecodingHandler,
+    get_storage_options,
+)
 
-from flytekit import kwtypes, task
+from flytekit import FlyteContextManager, kwtypes, task
 from flytekit.configuration import DataConfig, S3Config
+from flytekit.models.literals import StructuredDatasetMetadata
+from flytekit.models.types import StructuredDatasetType
+from flytekit.types.structured.structured_dataset import StructuredDataset
 
 try:
     from typing import Annotated
@@ -42,3 +54,59 @@ def test_structured_dataset_wf():
     df1, df2 = t1(df1=pd_df, df2=pa_df)
     assert df1.equals(subset_pd_df)
     assert df2.equals(subset_pa_df)
+
+
+def test_iter_decode(tmp_path):
+    ctx = FlyteContextManager.current_context()
+    pd_df = pd.DataFrame({"Name": [f"name-{i}" for i in range(10)], "Age": list(range(10))})
+    sd_type = StructuredDatasetType(format="parquet")
+    sd = PandasToParquetEncodingHandler("file").encode(
+        ctx, StructuredDataset(dataframe=pd_df, uri=str(tmp_path)), sd_type
+    )
+
+    batches = list(ParquetToPandasDecodingHandler("file").iter_decode(ctx, sd, StructuredDatasetMetadata(sd_type), 4))
+    assert [len(b) for b in batches] == [4, 4, 2]
+    assert pd.concat(batches, ignore_index=True).equals(pd_df)
+
+    tables = list(ParquetToArrowDecodingHandler("file").iter_decode(ctx, sd, StructuredDatasetMetadata(sd_type), 4))
+    assert pa.concat_tables(tables).equals(pa.Table.from_pandas(pd_df, preserve_index=False))
+
+
+def test_filters(tmp_path):
+    ctx = FlyteContextManager.current_context()
+    pd_df = pd.DataFrame({"Name": [f"name-{i}" for i in range(10)], "Age": list(range(10))})
+    sd_type = StructuredDatasetType(format="parquet")
+    sd = PandasToParquetEncodingHandler("file").encode(
+        ctx, StructuredDataset(dataframe=pd_df, uri=str(tmp_path)), sd_type
+    )
+    metadata = StructuredDatasetMetadata(sd_type)
+
+    decoder = ParquetToPandasDecodingHandler("file")
+    assert decoder.supports_filters
+    assert decoder.decode(ctx, sd, metadata, filters=[[("Age", ">=", 8)]])["Age"].tolist() == [8, 9]
+    batches = decoder.iter_decode(ctx, sd, metadata, filters=[[("Age", "<", 2)]])
+    assert pd.concat(batches)["Name"].tolist() == ["name-0", "name-1"]
+
+    table = ParquetToArrowDecodingHandler("file").decode(ctx, sd, metadata, filters=[[("Name", "==", "name-3")]])
+    assert table.column("Age").to_pylist() == [3]
+
+
+def test_sharded_writes(tmp_path):
+    ctx = FlyteContextManager.current_context()
+    pd_df = pd.DataFrame({"Name": [f"name-{i}" for i in range(10)], "Age": list(range(10))})
+    sd_type = StructuredDatasetType(format="parquet")
+    with mock.patch.dict("os.environ", {"FLYTE_STRUCTURED_DATASET_SHARD_ROWS": "4"}):
+        sd = PandasToParquetEncodingHandler("file").encode(
+            ctx, StructuredDataset(dataframe=pd_df, uri=str(tmp_path / "pandas")), sd_type
+        )
+        assert sorted(os.listdir(sd.uri)) == ["00000", "00001", "00002", "_metadata"]
+        sd = ArrowToParquetEncodingHandler("file").encode(
+            ctx, StructuredDataset(dataframe=pa.Table.from_pandas(pd_df), uri=str(tmp_path / "arrow")), sd_type
+        )
+        assert sorted(os.listdir(sd.uri)) == ["00000", "00001", "00002", "_metadata"]
+    assert ParquetToPandasDecodingHandler("file").decode(ctx, sd, StructuredDatasetMetadata(sd_type)).equals(pd_df)
+
+    with pytest.raises(ValueError, match="string column names"):
+        PandasToParquetEncodingHandler("file").encode(
+            ctx, StructuredDataset(dataframe=pd.DataFrame({0: [1]}), uri=str(tmp_path / "invalid")), sd_type
+        )
@@ -1,8 +1,11 @@
+import asyncio
 import os
 import pathlib
 import tempfile
 
+import fsspec
 from flytekitplugins.fsspec.persist import FSSpecPersistence, s3_setup_args
+from fsspec.asyn import AsyncFileSystem
 from fsspec.implementations.local import LocalFileSystem
 
 from flytekit.configuration import S3Config
@@ -18,6 +21,9 @@ def test_s3_setup_args():
     kwargs = s3_setup_args(S3Config(access_key_id="access"))
     assert kwargs == {"key": "access"}
 
+    kwargs = s3_setup_args(S3Config(max_pool_connections=64))
+    assert kwargs == {"config_kwargs": {"max_pool_connections": 64}}
+
 
 def test_get_protocol():
     assert FSSpecPersistence.get_protocol("s3://abc") == "s3"
@@ -132,3 +138,65 @@ def test_put_recursive():
 def test_construct_path():
     fs = FSSpecPersistence()
     assert fs.construct_path(True, False, "abc") == "file://abc"
+
+
+def test_listdir():
+    fs = FSSpecPersistence()
+    with tempfile.TemporaryDirectory() as tdir:
+        p = pathlib.Path(tdir)
+        p.joinpath("d").mkdir()
+        p.joinpath("a.txt").write_text("a")
+        p.joinpath("d", "b.txt").write_text("b")
+
+        assert sorted(fs.listdir(tdir, recursive=True)) == [str(p / "a.txt"), str(p / "d" / "b.txt")]
+
+
+class _AsyncMemoryFileSystem(AsyncFileSystem):
+    protocol = "asyncmem"
+    files = {}
+
+    async def _exists(self, path, **kwargs):
+        return self._strip_protocol(path) in self.files
+
+    async def _get_file(self, rpath, lpath, **kwargs):
+        with open(lpath, "wb") as f:
+            f.write(self.files[self._strip_protocol(rpath)])
+
+    async def _put_file(self, lpath, rpath, **kwargs):
+        with open(lpath, "rb") as f:
+            self.files[self._strip_protocol(rpath)] = f.read()
+
+
+def test_async_filesystem():
+    fsspec.register_implementation("asyncmem", _AsyncMemoryFileSystem, clobber=True)
+    fs = FSSpecPersistence()
+
+    async def run(tdir):
+        assert fs.get_async_filesystem(tdir) is None
+        assert fs.get_async_filesystem("asyncmem://bucket/f.txt") is fs.get_async_filesystem("asyncmem://bucket")
+
+        f = os.path.join(tdir, "f.txt")
+        with open(f, "w") as fp:
+            fp.write("hello")
+        await fs.aput(f, "asyncmem://bucket/f.txt")
+        assert await fs.aexists("asyncmem://bucket/f.txt")
+        assert not await fs.aexists("asyncmem://bucket/g.txt")
+
+        t = os.path.join(tdir, "t.txt")
+        await fs.aget("asyncmem://bucket/f.txt", t)
+        with open(t, "r") as fp:
+            assert fp.read() == "hello"
+
+    with tempfile.TemporaryDirectory() as tdir:
+        asyncio.run(run(tdir))
+
+
+def test_open():
+    fs = FSSpecPersistence()
+    with tempfile.TemporaryDirectory() as tdir:
+        f = os.path.join(tdir, "nested", "f.txt")
+        with fs.open(f, "wb") as w:
+            w.write(b"hello world")
+        with fs.open(f, "rb") as r:
+            r.seek(6)
+            assert r.read() == b"world"
@@ -32,6 +32,7 @@ setup(
             "pyflyte-execute=flytekit.bin.entrypoint:execute_task_cmd",
             "pyflyte-fast-execute=flytekit.bin.entrypoint:fast_execute_task_cmd",
             "pyflyte-map-execute=flytekit.bin.entrypoint:map_execute_task_cmd",
+            "pyflyte-execute-worker=flytekit.bin.entrypoint:execute_worker_cmd",
             "pyflyte=flytekit.clis.sdk_in_container.pyflyte:main",
             "flyte-cli=flytekit.clis.flyte_cli.main:_flyte_cli",
         ]
@@ -0,0 +1,55 @@
+"""
+Microbenchmarks of the StructuredDataset transformer engine, for the per-value overhead that map tasks and dynamic
+workflows pay when they pass many small datasets around. Run with ``make benchmark``, or
+
+    python -m tests.flytekit.benchmarks.structured_dataset_engine
+"""
+import timeit
+import typing
+
+import pandas as pd
+
+from flytekit import kwtypes
+from flytekit.core.context_manager import FlyteContextManager
+from flytekit.core.type_engine import TypeEngine
+from flytekit.types.structured.structured_dataset import (
+    PARQUET,
+    StructuredDataset,
+    StructuredDatasetTransformerEngine,
+    extract_cols_and_format,
+)
+
+try:
+    from typing import Annotated
+except ImportError:
+    from typing_extensions import Annotated
+
+my_cols = kwtypes(a=int, b=str, c=typing.List[int], d=typing.Dict[str, float])
+annotated_df = Annotated[pd.DataFrame, my_cols, PARQUET]
+annotated_sd = Annotated[StructuredDataset, my_cols, PARQUET]
+
+
+def benchmarks() -> typing.Dict[str, typing.Callable[[], typing.Any]]:
+    ctx = FlyteContextManager.current_context()
+    engine = TypeEngine.get_transformer(pd.DataFrame)
+    lt = engine.get_literal_type(annotated_sd)
+    lit = engine.to_literal(ctx, StructuredDataset(uri="s3://bucket/key"), annotated_sd, lt)
+
+    return {
+        "get_encoder": lambda: StructuredDatasetTransformerEngine.get_encoder(pd.DataFrame, "s3", PARQUET),
+        "get_decoder": lambda: StructuredDatasetTransformerEngine.get_decoder(pd.DataFrame, "s3", PARQUET),
+        "extract_cols_and_format": lambda: extract_cols_and_format(annotated_df),
+        "get_literal_type": lambda: engine.get_literal_type(annotated_df),
+        "to_literal (uri)": lambda: engine.to_literal(ctx, StructuredDataset(uri="s3://bucket/key"), annotated_sd, lt),
+        "to_python_value (lazy)": lambda: engine.to_python_value(ctx, lit, annotated_sd),
+    }
+
+
+def main(number: int = 10000):
+    for name, fn in benchmarks().items():
+        best = min(timeit.repeat(fn, number=number, repeat=5)) / number
+        print(f"{name:<30} {best * 1e6:8.2f} us/call")
+
+
+if __name__ == "__main__":
+    main()
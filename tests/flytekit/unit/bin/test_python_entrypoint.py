@@ -1,17 +1,28 @@
+import io
+import json
+import os
 import typing
 from collections import OrderedDict
 
 import mock
 from flyteidl.core.errors_pb2 import ErrorDocument
-
-from flytekit.bin.entrypoint import _dispatch_execute, normalize_inputs, setup_execution
-from flytekit.core import context_manager
+from flyteidl.core.literals_pb2 import LiteralMap
+
+from flytekit.bin.entrypoint import (
+    _dispatch_execute,
+    _execute_task_request,
+    execute_worker_cmd,
+    normalize_inputs,
+    setup_execution,
+)
+from flytekit.core import context_manager, utils
 from flytekit.core.base_task import IgnoreOutputs
+from flytekit.core.checkpointer import AsyncCheckpoint, SyncCheckpoint
 from flytekit.core.data_persistence import DiskPersistence
 from flytekit.core.dynamic_workflow_task import dynamic
 from flytekit.core.promise import VoidPromise
 from flytekit.core.task import task
-from flytekit.core.type_engine import TypeEngine
+from flytekit.core.type_engine import ListTransformer, TypeEngine
 from flytekit.exceptions import user as user_exceptions
 from flytekit.exceptions.scopes import system_entry_point
 from flytekit.extras.persistence.gcs_gsutil import GCSPersistence
@@ -154,6 +165,39 @@ def test_dispatch_execute_normal(mock_write_to_file, mock_upload_dir, mock_get_d
         assert lm.literals["o0"].scalar.primitive.string_value == "string is: 5"
 
 
+@mock.patch.dict("os.environ", {"FLYTE_LITERALS_COLLECTION_OFFLOAD_THRESHOLD": "3"})
+@mock.patch("flytekit.core.utils.load_proto_from_file")
+@mock.patch("flytekit.core.data_persistence.FileAccessProvider.get_data")
+@mock.patch("flytekit.core.data_persistence.FileAccessProvider.put_data")
+@mock.patch("flytekit.core.utils.write_proto_to_file")
+def test_dispatch_execute_offload_collections(mock_write_to_file, mock_upload_dir, mock_get_data, mock_load_proto):
+    mock_get_data.return_value = True
+    mock_upload_dir.return_value = True
+
+    ctx = context_manager.FlyteContext.current_context()
+    with context_manager.FlyteContextManager.with_context(
+        ctx.with_execution_state(
+            ctx.execution_state.with_params(mode=context_manager.ExecutionState.Mode.TASK_EXECUTION)
+        )
+    ) as ctx:
+
+        @task
+        def t1(n: int) -> typing.Tuple[typing.List[int], typing.List[int]]:
+            return list(range(n)), [n]
+
+        input_literal_map = TypeEngine.dict_to_literal_map(ctx, {"n": 5})
+        mock_load_proto.return_value = input_literal_map.to_flyte_idl()
+
+        def verify_output(*args, **kwargs):
+            lm = _literal_models.LiteralMap.from_flyte_idl(args[0])
+            assert lm.literals["o0"].scalar.blob.metadata.type.format == ListTransformer.OFFLOADED_COLLECTION_FORMAT
+            assert lm.literals["o1"].collection is not None
+
+        mock_write_to_file.side_effect = verify_output
+        system_entry_point(_dispatch_execute)(ctx, t1, "inputs path", "outputs prefix")
+        assert mock_write_to_file.call_count == 1
+
+
 @mock.patch("flytekit.core.utils.load_proto_from_file")
 @mock.patch("flytekit.core.data_persistence.FileAccessProvider.get_data")
 @mock.patch("flytekit.core.data_persistence.FileAccessProvider.put_data")
@@ -290,6 +334,17 @@ def test_setup_cloud_prefix():
         assert isinstance(ctx.file_access._default_remote, GCSPersistence)
 
 
+def test_setup_async_checkpoint(tmp_path):
+    dest = tmp_path / "cp"
+    with mock.patch.dict("os.environ", {"FLYTE_CHECKPOINT_ASYNC": "true"}):
+        with setup_execution(str(tmp_path / "raw"), checkpoint_path=str(dest)) as ctx:
+            cp = ctx.user_space_params.checkpoint
+            assert isinstance(cp, AsyncCheckpoint)
+            cp.write(b"bytes")
+    # The last checkpoint is uploaded when the execution completes
+    assert (dest / SyncCheckpoint.TMP_DST_PATH).read_bytes() == b"bytes"
+
+
 def test_normalize_inputs():
     assert normalize_inputs("{{.rawOutputDataPrefix}}", "{{.checkpointOutputPrefix}}", "{{.prevCheckpointPrefix}}") == (
         None,
@@ -318,3 +373,51 @@ def test_env_reading(mock_os):
         assert ctx.execution_state.user_space_params.task_id.name == "task_name"
         assert ctx.execution_state.user_space_params.task_id.version == "task_ver"
         assert ctx.execution_state.user_space_params.execution_id.name == "exec_name"
+
+
+@task
+def add_one(a: int) -> int:
+    return a + 1
+
+
+def test_execute_worker_cmd(tmp_path):
+    inputs = str(tmp_path / "inputs.pb")
+    ctx = context_manager.FlyteContextManager.current_context()
+    literal_map = _literal_models.LiteralMap(
+        {"a": TypeEngine.to_literal(ctx, 41, int, TypeEngine.to_literal_type(int))}
+    )
+    utils.write_proto_to_file(literal_map.to_flyte_idl(), inputs)
+
+    requests = [
+        {"inputs": inputs, "output_prefix": str(tmp_path / "first")},
+        {"inputs": inputs, "output_prefix": str(tmp_path / "second"), "env": {"FLYTE_INTERNAL_EXECUTION_ID": "e2"}},
+        {"inputs": str(tmp_path / "missing.pb"), "output_prefix": str(tmp_path / "third")},
+    ]
+    read_fd, write_fd = os.pipe()
+    stdin = io.StringIO("\n".join(json.dumps(r) for r in requests) + "\n")
+    with mock.patch("sys.stdin", stdin), mock.patch("sys.stdout", io.StringIO()) as stdout:
+        execute_worker_cmd.callback(
+            raw_output_data_prefix=str(tmp_path / "raw"),
+            socket_path=None,
+            response_fd=write_fd,
+            resolver="flytekit.core.python_auto_container.default_task_resolver",
+            resolver_args=["task-module", "tests.flytekit.unit.bin.test_python_entrypoint", "task-name", "add_one"],
+        )
+    with os.fdopen(read_fd) as r:
+        responses = [json.loads(line) for line in r]
+    assert [(r["output_prefix"], r["status"]) for r in responses] == [
+        (str(tmp_path / "first"), "done"),
+        (str(tmp_path / "second"), "done"),
+        (str(tmp_path / "third"), "done"),
+    ]
+    assert stdout.getvalue() == ""
+    assert "FLYTE_INTERNAL_EXECUTION_ID" not in os.environ
+
+    for prefix in ("first", "second"):
+        outputs = utils.load_proto_from_file(LiteralMap, str(tmp_path / prefix / "outputs.pb"))
+        assert outputs.literals["o0"].scalar.primitive.integer == 42
+    # Failures to read the inputs are reported in the error document, like in pyflyte-execute, and the files of the
+    # earlier executions are not uploaded with it
+    assert os.listdir(tmp_path / "third") == ["error.pb"]
+
+    assert json.loads(_execute_task_request(add_one, "not json", None))["status"] == "error"
@@ -0,0 +1,27 @@
+from click.testing import CliRunner
+
+from flytekit.clis.sdk_in_container import pyflyte
+from flytekit.core.local_cache import LocalTaskCache
+from flytekit.core.task import task
+
+
+def test_local_cache_list_and_evict():
+    LocalTaskCache.initialize()
+    LocalTaskCache.clear()
+
+    @task(cache=True, cache_version="v1")
+    def t1(n: int) -> int:
+        return n
+
+    t1(n=1)
+    t1(n=2)
+
+    runner = CliRunner()
+    result = runner.invoke(pyflyte.main, ["local-cache", "list"], catch_exceptions=False)
+    assert result.exit_code == 0
+    assert f"{t1.name}\tv1\t2 entries" in result.stdout
+
+    result = runner.invoke(pyflyte.main, ["local-cache", "evict", t1.name], catch_exceptions=False)
+    assert result.exit_code == 0
+    assert "Evicted 2 entries" in result.stdout
+    assert list(LocalTaskCache.entries(t1.name)) == []
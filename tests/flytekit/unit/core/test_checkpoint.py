@@ -1,9 +1,13 @@
+import hashlib
+import json
+import threading
 from pathlib import Path
 
+import mock
 import pytest
 
 import flytekit
-from flytekit.core.checkpointer import SyncCheckpoint
+from flytekit.core.checkpointer import AsyncCheckpoint, AsyncChunkedCheckpoint, ChunkedCheckpoint, SyncCheckpoint
 
 
 def test_sync_checkpoint_write(tmpdir):
@@ -115,3 +119,199 @@ def t1(n: int) -> int:
 
 def test_checkpoint_task():
     assert t1(n=5) == 6
+
+
+def test_async_checkpoint(tmpdir):
+    td_path = Path(tmpdir)
+    dest = td_path.joinpath("dest")
+    cp = AsyncCheckpoint(checkpoint_dest=str(dest))
+    cp.write(b"bytes")
+    cp.flush()
+    assert dest.joinpath(SyncCheckpoint.TMP_DST_PATH).read_bytes() == b"bytes"
+
+    d = td_path.joinpath("d")
+    d.mkdir()
+    d.joinpath("a").write_bytes(b"a")
+    cp.save(d)
+    # The checkpoint is a snapshot, later changes are not uploaded
+    d.joinpath("a").write_bytes(b"changed")
+    cp.close()
+    assert dest.joinpath("a").read_bytes() == b"a"
+    assert not list(Path(cp._td.name).joinpath(AsyncCheckpoint.SNAPSHOTS_FOLDER).iterdir())
+
+    with pytest.raises(ValueError):
+        cp.write(b"closed")
+
+
+def test_async_checkpoint_coalesces(tmpdir):
+    dest = Path(tmpdir).joinpath("dest")
+    cp = AsyncCheckpoint(checkpoint_dest=str(dest))
+    uploading = threading.Event()
+    release = threading.Event()
+    uploaded = []
+    upload = cp._upload
+
+    def slow_upload(fa, path):
+        uploaded.append(path.read_bytes())
+        uploading.set()
+        release.wait()
+        upload(fa, path)
+
+    with mock.patch.object(cp, "_upload", side_effect=slow_upload):
+        cp.write(b"1")
+        uploading.wait()
+        cp.write(b"2")
+        cp.write(b"3")
+        release.set()
+        cp.close()
+
+    # The second checkpoint was superseded before its upload started
+    assert uploaded == [b"1", b"3"]
+    assert dest.joinpath(SyncCheckpoint.TMP_DST_PATH).read_bytes() == b"3"
+
+
+def test_async_checkpoint_max_inflight_bytes(tmpdir):
+    cp = AsyncCheckpoint(checkpoint_dest=str(Path(tmpdir).joinpath("dest")), max_inflight_bytes=4)
+    release = threading.Event()
+    upload = cp._upload
+
+    def slow_upload(fa, path):
+        release.wait()
+        upload(fa, path)
+
+    with mock.patch.object(cp, "_upload", side_effect=slow_upload):
+        cp.write(b"123")
+        saved = threading.Event()
+        t = threading.Thread(target=lambda: (cp.write(b"456"), saved.set()))
+        t.start()
+        # 3 bytes being uploaded and 3 more would exceed the limit, the new checkpoint isn't even copied yet
+        assert not saved.wait(0.2)
+        assert len(list(Path(cp._td.name).joinpath(AsyncCheckpoint.SNAPSHOTS_FOLDER).iterdir())) == 1
+        release.set()
+        t.join()
+        assert saved.is_set()
+        cp.close()
+
+
+def test_async_checkpoint_max_inflight_bytes_counts_pending(tmpdir):
+    cp = AsyncCheckpoint(checkpoint_dest=str(Path(tmpdir).joinpath("dest")), max_inflight_bytes=4)
+    uploading = threading.Event()
+    release = threading.Event()
+    upload = cp._upload
+
+    def slow_upload(fa, path):
+        uploading.set()
+        release.wait()
+        upload(fa, path)
+
+    with mock.patch.object(cp, "_upload", side_effect=slow_upload):
+        cp.write(b"12")
+        uploading.wait()
+        # 2 bytes being uploaded and 1 pending
+        cp.write(b"1")
+        saved = threading.Event()
+        t = threading.Thread(target=lambda: (cp.write(b"12"), saved.set()))
+        t.start()
+        assert not saved.wait(0.2)
+        release.set()
+        t.join()
+        cp.close()
+    assert Path(tmpdir).joinpath("dest", SyncCheckpoint.TMP_DST_PATH).read_bytes() == b"12"
+
+
+def test_async_checkpoint_errors(tmpdir):
+    cp = AsyncCheckpoint(checkpoint_dest=str(Path(tmpdir).joinpath("dest")))
+    with mock.patch.object(cp, "_upload", side_effect=OSError("upload failed")):
+        cp.write(b"bytes")
+        with pytest.raises(OSError, match="upload failed"):
+            cp.flush()
+        cp.flush()
+        cp.close()
+
+
+def test_chunked_checkpoint(tmpdir):
+    td_path = Path(tmpdir)
+    d = td_path.joinpath("d")
+    d.joinpath("nested").mkdir(parents=True)
+    d.joinpath("model").write_bytes(b"0123456789")
+    d.joinpath("nested", "optimizer").write_bytes(b"abcd")
+
+    dest1 = td_path.joinpath("dest1")
+    cp1 = ChunkedCheckpoint(checkpoint_dest=str(dest1), chunk_size=4)
+    cp1.save(d)
+    manifest = json.loads(dest1.joinpath(ChunkedCheckpoint.MANIFEST).read_text())
+    assert manifest["files"]["nested/optimizer"] == {"size": 4, "chunks": [hashlib.sha256(b"abcd").hexdigest()]}
+    assert len(manifest["files"]["model"]["chunks"]) == 3
+    assert len(list(dest1.joinpath(ChunkedCheckpoint.CHUNKS_FOLDER).iterdir())) == 4
+
+    # Only the changed chunk is uploaded again
+    d.joinpath("model").write_bytes(b"0123xxxx89")
+    cp1.save(d)
+    assert len(list(dest1.joinpath(ChunkedCheckpoint.CHUNKS_FOLDER).iterdir())) == 5
+
+    # The next attempt reuses the chunks of the previous checkpoint
+    dest2 = td_path.joinpath("dest2")
+    cp2 = ChunkedCheckpoint(checkpoint_dest=str(dest2), checkpoint_src=str(dest1), chunk_size=4)
+    with mock.patch.object(cp2, "_read_manifest", wraps=cp2._read_manifest) as read_manifest:
+        restored = cp2.restore()
+    read_manifest.assert_called_once()
+    assert restored.joinpath("model").read_bytes() == b"0123xxxx89"
+    assert restored.joinpath("nested", "optimizer").read_bytes() == b"abcd"
+
+    d.joinpath("nested", "optimizer").write_bytes(b"abce")
+    cp2.save(d)
+    assert len(list(dest2.joinpath(ChunkedCheckpoint.CHUNKS_FOLDER).iterdir())) == 1
+
+    cp3 = ChunkedCheckpoint(checkpoint_dest=str(td_path.joinpath("dest3")), checkpoint_src=str(dest2), chunk_size=4)
+    restored = cp3.restore()
+    assert restored.joinpath("model").read_bytes() == b"0123xxxx89"
+    assert restored.joinpath("nested", "optimizer").read_bytes() == b"abce"
+
+
+def test_chunked_checkpoint_uploads_without_staging(tmpdir):
+    td_path = Path(tmpdir)
+    cp = ChunkedCheckpoint(checkpoint_dest=str(td_path.joinpath("dest")), chunk_size=2)
+    with mock.patch("flytekit.core.data_persistence.FileAccessProvider.put_data") as put_data, mock.patch(
+        "flytekit.core.data_persistence.FileAccessProvider.put_data_batch"
+    ) as put_data_batch:
+        cp.write(b"abcdefab")
+    # The chunks and the manifest are written straight to the destination
+    put_data.assert_not_called()
+    put_data_batch.assert_not_called()
+    assert len(list(td_path.joinpath("dest", ChunkedCheckpoint.CHUNKS_FOLDER).iterdir())) == 3
+    assert (
+        ChunkedCheckpoint(checkpoint_dest="unused", checkpoint_src=str(td_path.joinpath("dest"))).read() == b"abcdefab"
+    )
+
+
+def test_chunked_checkpoint_read_write(tmpdir):
+    td_path = Path(tmpdir)
+    cache = td_path.joinpath("cache")
+    cp = ChunkedCheckpoint(checkpoint_dest=str(td_path.joinpath("dest")))
+    cp.write(b"bytes")
+
+    cp2 = ChunkedCheckpoint(checkpoint_dest="unused", checkpoint_src=str(td_path.joinpath("dest")), cache_dir=cache)
+    assert cp2.read() == b"bytes"
+    assert len(list(cache.iterdir())) == 1
+
+    # Chunks already in the cache are not downloaded again
+    cp3 = ChunkedCheckpoint(checkpoint_dest="unused", checkpoint_src=str(td_path.joinpath("dest")), cache_dir=cache)
+    with mock.patch("flytekit.core.data_persistence.FileAccessProvider.get_data_batch") as get_data_batch:
+        assert cp3.read() == b"bytes"
+    get_data_batch.assert_called_once_with([])
+
+
+def test_chunked_checkpoint_restores_sync_checkpoints(tmpdir):
+    td_path = Path(tmpdir)
+    SyncCheckpoint(checkpoint_dest=str(td_path.joinpath("dest"))).write(b"bytes")
+    cp = ChunkedCheckpoint(checkpoint_dest="unused", checkpoint_src=str(td_path.joinpath("dest")))
+    assert cp.read() == b"bytes"
+
+
+def test_async_chunked_checkpoint(tmpdir):
+    dest = Path(tmpdir).joinpath("dest")
+    cp = AsyncChunkedCheckpoint(checkpoint_dest=str(dest), chunk_size=2)
+    cp.write(b"bytes")
+    cp.close()
+    assert json.loads(dest.joinpath(ChunkedCheckpoint.MANIFEST).read_text())["files"][SyncCheckpoint.TMP_DST_PATH]
+    assert ChunkedCheckpoint(checkpoint_dest="unused", checkpoint_src=str(dest)).read() == b"bytes"
@@ -1,4 +1,12 @@
-from flytekit.core.data_persistence import FileAccessProvider
+import asyncio
+import os
+
+import mock
+import pytest
+
+from flytekit.core import data_persistence
+from flytekit.core.data_persistence import DiskPersistence, FileAccessProvider
+from flytekit.exceptions.user import FlyteAssertion
 
 
 def test_get_random_remote_path():
@@ -13,3 +21,91 @@ def test_is_remote():
     assert fp.is_remote("/tmp/foo/bar") is False
     assert fp.is_remote("file://foo/bar") is False
     assert fp.is_remote("s3://my-bucket/foo/bar") is True
+
+
+def test_get_persistence_reuses_instances():
+    fp = FileAccessProvider("/tmp", "s3://my-bucket")
+    local = fp.get_persistence("/tmp/foo")
+    assert fp.get_persistence("/tmp/bar") is local
+    assert fp.get_persistence("file:///tmp/bar") is local
+
+    info = fp.persistence_cache_info()
+    assert info.misses == 1
+    assert info.hits == 2
+    assert info.currsize == 1
+
+
+def test_exists_uses_pooled_persistence(tmp_path):
+    fp = FileAccessProvider(str(tmp_path), str(tmp_path / "raw"))
+    f = tmp_path / "a.txt"
+    f.write_text("a")
+    assert fp.exists(str(f))
+    assert not fp.exists(str(tmp_path / "b.txt"))
+    assert fp.persistence_cache_info().currsize == 1
+
+
+@pytest.mark.parametrize("concurrent_transfers", [True, False])
+def test_directory_transfers(tmp_path, concurrent_transfers):
+    src = tmp_path / "src"
+    (src / "nested").mkdir(parents=True)
+    (src / "a.txt").write_text("a")
+    (src / "nested" / "b.txt").write_text("b")
+
+    fp = FileAccessProvider(str(tmp_path / "local"), str(tmp_path / "raw"))
+    with mock.patch.object(DiskPersistence, "concurrent_transfers", concurrent_transfers):
+        fp.upload_directory(str(src), str(tmp_path / "remote"))
+        fp.download_directory(str(tmp_path / "remote"), str(tmp_path / "dst"))
+
+    assert (tmp_path / "remote" / "nested" / "b.txt").read_text() == "b"
+    assert (tmp_path / "dst" / "a.txt").read_text() == "a"
+    assert (tmp_path / "dst" / "nested" / "b.txt").read_text() == "b"
+
+
+def test_async_transfers(tmp_path):
+    src = tmp_path / "src"
+    src.mkdir()
+    for i in range(5):
+        (src / f"{i}.txt").write_text(str(i))
+
+    fp = FileAccessProvider(str(tmp_path / "local"), str(tmp_path / "raw"))
+
+    async def run():
+        await fp.aput_data(str(src / "0.txt"), str(tmp_path / "remote" / "single.txt"))
+        assert await fp.aexists(str(tmp_path / "remote" / "single.txt"))
+        await fp.aput_data_batch(
+            [(str(src / f"{i}.txt"), str(tmp_path / "remote" / f"{i}.txt"), False) for i in range(5)]
+        )
+        await fp.aget_data(str(tmp_path / "remote" / "single.txt"), str(tmp_path / "dst" / "single.txt"))
+        await fp.aget_data(str(src), str(tmp_path / "dst" / "dir"), is_multipart=True)
+
+    asyncio.run(run())
+    assert (tmp_path / "remote" / "4.txt").read_text() == "4"
+    assert (tmp_path / "dst" / "single.txt").read_text() == "0"
+    assert (tmp_path / "dst" / "dir" / "3.txt").read_text() == "3"
+
+    fp.get_data_batch(
+        [(str(tmp_path / "remote" / f"{i}.txt"), str(tmp_path / "batch" / f"{i}.txt"), False) for i in range(5)]
+    )
+    assert sorted(os.listdir(tmp_path / "batch")) == [f"{i}.txt" for i in range(5)]
+
+    with pytest.raises(FlyteAssertion):
+        asyncio.run(fp.aget_data(str(tmp_path / "missing.txt"), str(tmp_path / "dst" / "missing.txt")))
+
+
+def test_sync_calls_share_one_event_loop():
+    async def running_loop():
+        return asyncio.get_running_loop()
+
+    loop = data_persistence._run_until_complete(running_loop())
+    assert data_persistence._run_until_complete(running_loop()) is loop
+    assert loop.is_running()
+
+    # Sync calls made from a coroutine still work
+    async def nested():
+        return data_persistence._run_until_complete(running_loop())
+
+    assert asyncio.run(nested()) is loop
+
+    # Forked processes don't inherit the thread running the loop
+    with mock.patch("os.getpid", return_value=-1):
+        assert data_persistence._run_until_complete(running_loop()) is not loop
@@ -0,0 +1,63 @@
+import datetime
+import os
+import threading
+
+import pytest
+
+from flytekit.core.data_transfer import TransferStats, transfer_files
+
+
+def test_transfer_files(tmp_path):
+    src = tmp_path / "src"
+    src.mkdir()
+    paths = []
+    for i in range(10):
+        (src / f"{i}.txt").write_text("a" * i)
+        paths.append((str(src / f"{i}.txt"), str(tmp_path / f"{i}.out")))
+
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def copy(from_path, to_path):
+        with lock:
+            active.append(from_path)
+            peak.append(len(active))
+        with open(from_path) as r, open(to_path, "w") as w:
+            w.write(r.read())
+        with lock:
+            active.remove(from_path)
+
+    stats = transfer_files(copy, paths, lambda f, _: os.path.getsize(f), max_concurrency=3)
+    assert stats.files == 10
+    assert stats.bytes == sum(range(10))
+    assert stats.retries == 0
+    assert max(peak) <= 3
+    assert (tmp_path / "9.out").read_text() == "a" * 9
+
+
+def test_transfer_files_retries():
+    attempts = {}
+
+    def flaky(from_path, to_path):
+        attempts[from_path] = attempts.get(from_path, 0) + 1
+        if attempts[from_path] < 3:
+            raise OSError("throttled")
+
+    stats = transfer_files(
+        flaky, [("a", "b"), ("c", "d")], lambda *_: 1, retries=2, backoff=datetime.timedelta(seconds=0)
+    )
+    assert stats.files == 2
+    assert stats.retries == 4
+
+    attempts.clear()
+    with pytest.raises(OSError, match="throttled"):
+        transfer_files(flaky, [("a", "b")], lambda *_: 1, retries=1, backoff=datetime.timedelta(seconds=0))
+    assert attempts["a"] == 2
+
+
+def test_transfer_stats():
+    stats = TransferStats(files=2, bytes=2 * 2**20, seconds=2.0)
+    assert stats.throughput == 2**20
+    assert "1.00 MiB/s" in str(stats)
+    assert TransferStats().throughput == 0.0
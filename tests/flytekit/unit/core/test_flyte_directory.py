@@ -5,13 +5,14 @@ import tempfile
 import typing
 from unittest.mock import MagicMock
 
+import mock
 import pytest
 
 import flytekit.configuration
 from flytekit.configuration import Image, ImageConfig
 from flytekit.core import context_manager
 from flytekit.core.context_manager import ExecutionState, FlyteContextManager
-from flytekit.core.data_persistence import FileAccessProvider
+from flytekit.core.data_persistence import FileAccessProvider, UnsupportedPersistenceOp
 from flytekit.core.dynamic_workflow_task import dynamic
 from flytekit.core.task import task
 from flytekit.core.type_engine import TypeEngine
@@ -268,3 +269,95 @@ def test_directory_guess():
     fft = transformer.guess_python_type(lt)
     assert issubclass(fft, FlyteDirectory)
     assert fft.extension() == ""
+
+
+@pytest.fixture
+def remote_dir(tmp_path):
+    remote = tmp_path / "remote"
+    (remote / "shards").mkdir(parents=True)
+    for i in range(3):
+        (remote / "shards" / f"{i}.parquet").write_text(str(i))
+    (remote / "README.md").write_text("readme")
+    return remote
+
+
+def _lazy_directory(cls, remote, local):
+    fa = FlyteContextManager.current_context().file_access
+    fd = cls(str(local), lambda: fa.get_data(str(remote), str(local), is_multipart=True))
+    fd._remote_source = str(remote)
+    return fd
+
+
+def test_lazy_listdir(tmp_path, remote_dir):
+    local = tmp_path / "local"
+    fd = _lazy_directory(FlyteDirectory, remote_dir, local)
+    assert fd.listdir() == ["README.md", "shards/0.parquet", "shards/1.parquet", "shards/2.parquet"]
+    assert fd.listdir("*.md") == ["README.md"]
+    assert not fd.downloaded
+    assert not local.exists()
+
+    # The format of the directory filters the files
+    fd = _lazy_directory(FlyteDirectory["parquet"], remote_dir, local)
+    assert fd.listdir() == ["shards/0.parquet", "shards/1.parquet", "shards/2.parquet"]
+
+    # Once downloaded, the local directory is listed
+    fd.download()
+    (local / "new.parquet").write_text("new")
+    assert "new.parquet" in fd.listdir()
+
+
+def test_lazy_fetch(tmp_path, remote_dir):
+    local = tmp_path / "local"
+    fd = _lazy_directory(FlyteDirectory["parquet"], remote_dir, local)
+    p = fd.fetch("shards/1.parquet")
+    assert p == str(local / "shards" / "1.parquet")
+    with open(p) as f:
+        assert f.read() == "1"
+    assert sorted(os.listdir(local / "shards")) == ["1.parquet"]
+
+    # Fetched files are not downloaded again
+    with mock.patch.object(FileAccessProvider, "get_data") as get_data:
+        fd.fetch("shards/1.parquet")
+    get_data.assert_not_called()
+
+    paths = fd.download_files()
+    assert paths == [str(local / "shards" / f"{i}.parquet") for i in range(3)]
+    assert sorted(os.listdir(local / "shards")) == ["0.parquet", "1.parquet", "2.parquet"]
+    assert not (local / "README.md").exists()
+    assert not fd.downloaded
+
+
+def test_lazy_listdir_unsupported(tmp_path, remote_dir):
+    local = tmp_path / "local"
+    fd = _lazy_directory(FlyteDirectory, remote_dir, local)
+    with mock.patch.object(FileAccessProvider, "list_files", side_effect=UnsupportedPersistenceOp("no")):
+        assert len(fd.listdir()) == 4
+    assert fd.downloaded
+
+
+def test_lazy_fetch_rejects_paths_outside_the_directory(tmp_path, remote_dir):
+    fd = _lazy_directory(FlyteDirectory, remote_dir, tmp_path / "local")
+    for name in ["../README.md", "shards/../../README.md", str(remote_dir / "README.md")]:
+        with pytest.raises(ValueError):
+            fd.fetch(name)
+    assert not (tmp_path / "local").exists()
+
+
+def test_lazy_fetch_interrupted(tmp_path, remote_dir):
+    local = tmp_path / "local"
+    fd = _lazy_directory(FlyteDirectory, remote_dir, local)
+
+    def partial_download(remote_path, local_path, is_multipart=False):
+        with open(local_path, "w") as f:
+            f.write("partial")
+        raise RuntimeError("interrupted")
+
+    with mock.patch.object(FileAccessProvider, "get_data", side_effect=partial_download):
+        with pytest.raises(RuntimeError):
+            fd.fetch("shards/1.parquet")
+    assert os.listdir(local / "shards") == []
+
+    # The next access downloads the file again
+    with open(fd.fetch("shards/1.parquet")) as f:
+        assert f.read() == "1"
+    assert os.listdir(local / "shards") == ["1.parquet"]
@@ -4,13 +4,14 @@ import tempfile
 import typing
 from unittest.mock import MagicMock
 
+import mock
 import pytest
 
 import flytekit.configuration
 from flytekit.configuration import Image, ImageConfig
 from flytekit.core import context_manager
 from flytekit.core.context_manager import ExecutionState
-from flytekit.core.data_persistence import FileAccessProvider, flyte_tmp_dir
+from flytekit.core.data_persistence import FileAccessProvider, UnsupportedPersistenceOp, flyte_tmp_dir
 from flytekit.core.dynamic_workflow_task import dynamic
 from flytekit.core.launch_plan import LaunchPlan
 from flytekit.core.task import task
@@ -433,3 +434,81 @@ def test_flyte_file_in_dyn():
         return t2(ff=n1)
 
     assert flyte_tmp_dir in wf(path="s3://somewhere").path
+
+
+def test_streaming_read(tmp_path):
+    remote = tmp_path / "remote.txt"
+    remote.write_text("Hello world")
+    ff = FlyteFile(str(tmp_path / "local.txt"))
+    ff._remote_source = str(remote)
+
+    with ff.open("r", streaming=True) as f:
+        f.seek(6)
+        assert f.read() == "world"
+    # Nothing was downloaded
+    assert not ff.downloaded
+    assert not (tmp_path / "local.txt").exists()
+
+    # The local copy is used once downloaded
+    ff._downloader = lambda: FileAccessProvider(str(tmp_path), str(tmp_path)).get_data(str(remote), ff.path)
+    with ff.open("rb") as f:
+        assert f.read() == b"Hello world"
+    assert ff.downloaded
+
+
+def test_streaming_read_fallback(tmp_path, local_dummy_file):
+    ff = FlyteFile(local_dummy_file)
+    ff._remote_source = "s3://bucket/file"
+    with mock.patch.object(FileAccessProvider, "open", side_effect=UnsupportedPersistenceOp("no")):
+        with ff.open("r", streaming=True) as f:
+            assert f.read() == "Hello world"
+
+
+def test_streaming_fallback_arguments(tmp_path):
+    ff = FlyteFile(str(tmp_path / "out.txt"))
+    ff._remote_path = False
+    with mock.patch.object(FileAccessProvider, "open", side_effect=UnsupportedPersistenceOp("no")):
+        with ff.open("w", streaming=True, encoding="utf-16", newline="\r\n") as f:
+            f.write("h\u00e9\n")
+        # The arguments of open are kept for the local copy, the ones of the persistence plugin can't be honored
+        assert (tmp_path / "out.txt").read_bytes() == "h\u00e9\r\n".encode("utf-16")
+        with pytest.raises(ValueError, match="block_size"):
+            ff.open("w", streaming=True, block_size=1024)
+
+
+def test_streaming_write():
+    @task
+    def t1() -> FlyteFile:
+        ff = FlyteFile("out.txt")
+        with ff.open("w", streaming=True) as f:
+            f.write("streamed")
+        return ff
+
+    @task
+    def t2(f: FlyteFile) -> str:
+        with f.open("r", streaming=True) as r:
+            return r.read()
+
+    with mock.patch.object(FileAccessProvider, "put_data") as put_data:
+        ff = t1()
+    # The file is uploaded as it is written, not when the output is converted
+    put_data.assert_not_called()
+    assert not os.path.exists("out.txt")
+    with open(ff.path) as f:
+        assert f.read() == "streamed"
+    assert t2(f=ff) == "streamed"
+
+
+def test_streaming_write_then_read_locally(tmp_path):
+    ff = FlyteFile(str(tmp_path / "out.txt"))
+    with ff.open("w", streaming=True) as f:
+        f.write("streamed")
+    assert not (tmp_path / "out.txt").exists()
+    # The local path is populated from the uploaded file when it is used
+    with ff.open("r") as f:
+        assert f.read() == "streamed"
+    assert (tmp_path / "out.txt").read_text() == "streamed"
+
+    for mode in ("a", "ab", "r+", "w+b"):
+        with pytest.raises(ValueError, match="read or written whole"):
+            ff.open(mode, streaming=True)
@@ -1,9 +1,14 @@
 from collections import OrderedDict
 from typing import Dict, List
 
+import mock
+import numpy as np
+import pytest
+
 import flytekit.configuration
 from flytekit.configuration import Image, ImageConfig
 from flytekit.core import context_manager
+from flytekit.core.data_persistence import DiskPersistence, UnsupportedPersistenceOp
 from flytekit.core.task import task
 from flytekit.models.core.types import BlobType
 from flytekit.models.literals import BlobMetadata
@@ -80,3 +85,55 @@ def test_nested2():
         task_spec.template.interface.outputs["o0"].type.collection_type.map_value_type.blob.format
         is FlytePickleTransformer.PYTHON_PICKLE_FORMAT
     )
+
+
+@pytest.mark.parametrize("compression, magic", [("gzip", b"\x1f\x8b"), ("bz2", b"BZh"), ("lzma", b"\xfd7zXZ")])
+def test_compression(compression, magic):
+    ctx = context_manager.FlyteContext.current_context()
+    tf = FlytePickleTransformer()
+    python_val = {"a": np.arange(1000), "b": "hello" * 100}
+    lt = tf.get_literal_type(FlytePickle)
+
+    with mock.patch.dict("os.environ", {"FLYTE_SDK_PICKLE_COMPRESSION": compression}):
+        lv = tf.to_literal(ctx, python_val, dict, lt)
+    with open(lv.scalar.blob.uri, "rb") as f:
+        assert f.read(len(magic)) == magic
+
+    # Compressed pickles are recognized without the setting
+    output = tf.to_python_value(ctx, lv, dict)
+    np.testing.assert_array_equal(output["a"], python_val["a"])
+    assert output["b"] == python_val["b"]
+
+
+def test_unknown_compression():
+    ctx = context_manager.FlyteContext.current_context()
+    tf = FlytePickleTransformer()
+    with mock.patch.dict("os.environ", {"FLYTE_SDK_PICKLE_COMPRESSION": "rar"}):
+        with pytest.raises(ValueError, match="rar"):
+            tf.to_literal(ctx, "fake_output", str, tf.get_literal_type(FlytePickle))
+
+
+def test_streaming():
+    ctx = context_manager.FlyteContext.current_context()
+    tf = FlytePickleTransformer()
+    lt = tf.get_literal_type(FlytePickle)
+
+    with mock.patch.object(ctx.file_access, "put_data") as put_data:
+        lv = tf.to_literal(ctx, np.ones(10), np.ndarray, lt)
+        put_data.assert_not_called()
+
+    with mock.patch.object(ctx.file_access, "is_remote", return_value=True):
+        with mock.patch.object(ctx.file_access, "get_data") as get_data:
+            np.testing.assert_array_equal(tf.to_python_value(ctx, lv, np.ndarray), np.ones(10))
+            get_data.assert_not_called()
+
+
+def test_streaming_not_supported():
+    ctx = context_manager.FlyteContext.current_context()
+    tf = FlytePickleTransformer()
+    lt = tf.get_literal_type(FlytePickle)
+
+    with mock.patch.object(DiskPersistence, "open", side_effect=UnsupportedPersistenceOp("no")):
+        lv = tf.to_literal(ctx, "fake_output", str, lt)
+        with mock.patch.object(ctx.file_access, "is_remote", return_value=True):
+            assert tf.to_python_value(ctx, lv, str) == "fake_output"
@@ -1,19 +1,27 @@
 import datetime
+import os
+import time
 import typing
 from dataclasses import dataclass
 from typing import List
 
+import mock
 import pandas
 from dataclasses_json import dataclass_json
 from pytest import fixture
 from typing_extensions import Annotated
 
+import flytekit
 from flytekit import SQLTask, dynamic, kwtypes
+from flytekit.core.context_manager import FlyteContext
 from flytekit.core.hash import HashMethod
-from flytekit.core.local_cache import LocalTaskCache
+from flytekit.core.local_cache import LocalTaskCache, _calculate_cache_key
 from flytekit.core.task import TaskMetadata, task
 from flytekit.core.testing import task_mock
+from flytekit.core.type_engine import TypeEngine
 from flytekit.core.workflow import workflow
+from flytekit.models.literals import Literal, LiteralMap, Primitive, Scalar
+from flytekit.types.file import FlyteFile
 from flytekit.types.schema import FlyteSchema
 
 # Global counter used to validate number of calls to cache
@@ -383,3 +391,172 @@ def test_list_of_pandas_dataframe_hash():
     # Confirm that we see a cache hit in the case of annotated dataframes.
     my_workflow()
     assert n_cached_task_calls == 1
+
+
+def test_cache_key_is_deterministic():
+    def literal_map(**kwargs) -> LiteralMap:
+        return LiteralMap(
+            literals={k: Literal(scalar=Scalar(primitive=Primitive(integer=v))) for k, v in kwargs.items()}
+        )
+
+    assert _calculate_cache_key("t", "v1", literal_map(a=1, b=2)) == _calculate_cache_key(
+        "t", "v1", literal_map(b=2, a=1)
+    )
+    assert _calculate_cache_key("t", "v1", literal_map(a=1, b=2)) != _calculate_cache_key(
+        "t", "v1", literal_map(a=2, b=1)
+    )
+    assert _calculate_cache_key("t", "v1", literal_map(a=1)) != _calculate_cache_key("t", "v2", literal_map(a=1))
+
+    # Literals carrying a hash are represented by their hash only
+    lm1 = LiteralMap(literals={"a": Literal(scalar=Scalar(primitive=Primitive(string_value="x")), hash="h")})
+    lm2 = LiteralMap(literals={"a": Literal(scalar=Scalar(primitive=Primitive(string_value="y")), hash="h")})
+    assert _calculate_cache_key("t", "v1", lm1) == _calculate_cache_key("t", "v1", lm2)
+
+
+def test_list_and_evict_entries():
+    @task(cache=True, cache_version="v1")
+    def t1(n: int) -> int:
+        global n_cached_task_calls
+        n_cached_task_calls += 1
+        return n
+
+    @task(cache=True, cache_version="v1")
+    def t2(n: int) -> int:
+        return n
+
+    t1(n=1)
+    t1(n=2)
+    t2(n=1)
+    assert n_cached_task_calls == 2
+
+    entries = list(LocalTaskCache.entries(t1.name))
+    assert len(entries) == 2
+    assert all(e.cache_version == "v1" and e.size > 0 for e in entries)
+    assert len(list(LocalTaskCache.entries())) == 3
+
+    assert LocalTaskCache.evict(t1.name, "v0") == 0
+    assert LocalTaskCache.evict(t1.name) == 2
+    assert list(LocalTaskCache.entries(t1.name)) == []
+    assert len(list(LocalTaskCache.entries(t2.name))) == 1
+
+    t1(n=1)
+    assert n_cached_task_calls == 3
+
+
+def test_cached_files_outlive_the_sandbox():
+    @task(cache=True, cache_version="v1")
+    def t1(n: int) -> FlyteFile:
+        global n_cached_task_calls
+        n_cached_task_calls += 1
+        path = os.path.join(flytekit.current_context().working_directory, "out.txt")
+        with open(path, "w") as f:
+            f.write("hello" * n)
+        return FlyteFile(path)
+
+    @task(cache=True, cache_version="v1")
+    def t2(f: FlyteFile) -> str:
+        global n_cached_task_calls
+        n_cached_task_calls += 1
+        with open(f) as fh:
+            return fh.read()
+
+    @workflow
+    def wf(n: int) -> str:
+        return t2(f=t1(n=n))
+
+    assert wf(n=1) == "hello"
+    assert n_cached_task_calls == 2
+
+    # The cached output points at a copy of the file managed by the cache
+    entry = list(LocalTaskCache.entries(t1.name))[0]
+    assert entry.size > len("hello")
+    lm = LocalTaskCache.get(t1.name, "v1", TypeEngine.dict_to_literal_map(FlyteContext.current_context(), {"n": 1}))
+    uri = lm.literals["o0"].scalar.blob.uri
+    assert uri.startswith(LocalTaskCache._cache.directory)
+
+    # Both tasks are cache hits, since the uri of the cached file is stable
+    assert wf(n=1) == "hello"
+    assert n_cached_task_calls == 2
+
+    # If the stored artifacts disappear, the entry is not used anymore. The file is stored again at the same content
+    # addressed location, so the downstream task is still a cache hit.
+    LocalTaskCache._artifacts.clear()
+    assert wf(n=1) == "hello"
+    assert n_cached_task_calls == 3
+
+
+def test_identical_artifacts_are_stored_once():
+    @task(cache=True, cache_version="v1")
+    def t1(n: int) -> FlyteFile:
+        path = os.path.join(flytekit.current_context().working_directory, "out.txt")
+        with open(path, "w") as f:
+            f.write("same content")
+        return FlyteFile(path)
+
+    t1(n=1)
+    t1(n=2)
+    entries = list(LocalTaskCache.entries(t1.name))
+    assert len(entries) == 2
+    assert len(os.listdir(os.path.join(LocalTaskCache._cache.directory, "artifacts", "objects"))) == 1
+
+    assert LocalTaskCache.evict(t1.name) == 2
+    assert os.listdir(os.path.join(LocalTaskCache._cache.directory, "artifacts", "objects")) == []
+
+
+@mock.patch.dict("os.environ", {"FLYTE_LOCAL_CACHE_MAX_ENTRIES_PER_TASK": "2"})
+def test_max_entries_per_task():
+    @task(cache=True, cache_version="v1")
+    def t1(n: int) -> int:
+        global n_cached_task_calls
+        n_cached_task_calls += 1
+        return n
+
+    t1(n=1)
+    t1(n=2)
+    t1(n=1)
+    t1(n=3)
+    assert n_cached_task_calls == 3
+    assert len(list(LocalTaskCache.entries(t1.name))) == 2
+
+    # n=2 was the least recently used entry
+    t1(n=1)
+    t1(n=3)
+    assert n_cached_task_calls == 3
+    t1(n=2)
+    assert n_cached_task_calls == 4
+
+
+@mock.patch.dict("os.environ", {"FLYTE_LOCAL_CACHE_SIZE_LIMIT": "4000"})
+def test_size_limit():
+    @task(cache=True, cache_version="v1")
+    def t1(n: int) -> FlyteFile:
+        global n_cached_task_calls
+        n_cached_task_calls += 1
+        path = os.path.join(flytekit.current_context().working_directory, "out.txt")
+        with open(path, "w") as f:
+            f.write(str(n) * 1500)
+        return FlyteFile(path)
+
+    t1(n=1)
+    t1(n=2)
+    assert len(list(LocalTaskCache.entries(t1.name))) == 2
+    t1(n=3)
+    assert len(list(LocalTaskCache.entries(t1.name))) == 2
+    assert len(os.listdir(os.path.join(LocalTaskCache._cache.directory, "artifacts", "objects"))) == 2
+
+    t1(n=1)
+    assert n_cached_task_calls == 4
+
+
+@mock.patch.dict("os.environ", {"FLYTE_LOCAL_CACHE_TTL_SECONDS": "1"})
+def test_ttl():
+    @task(cache=True, cache_version="v1")
+    def t1(n: int) -> int:
+        global n_cached_task_calls
+        n_cached_task_calls += 1
+        return n
+
+    with mock.patch("time.time", return_value=time.time() - 10):
+        t1(n=1)
+    t1(n=1)
+    assert n_cached_task_calls == 2
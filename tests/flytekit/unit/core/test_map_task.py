@@ -1,11 +1,15 @@
+import os
+import threading
 import typing
 from collections import OrderedDict
+from unittest import mock
 
 import pytest
 
 import flytekit.configuration
 from flytekit import LaunchPlan, map_task
 from flytekit.configuration import Image, ImageConfig
+from flytekit.core.context_manager import ExecutionState, FlyteContextManager
 from flytekit.core.map_task import MapPythonTask
 from flytekit.core.task import TaskMetadata, task
 from flytekit.core.workflow import workflow
@@ -44,7 +48,7 @@ def test_map_docs():
         return str(a)
 
     @workflow
-    def my_wf(x: typing.List[int]) -> typing.List[str]:
+    def my_wf(x: typing.List[int]) -> typing.List[typing.Optional[str]]:
         return map_task(my_mappable_task, metadata=TaskMetadata(retries=1), concurrency=10, min_success_ratio=0.75,)(
             a=x
         ).with_overrides(cpu="10M")
@@ -190,3 +194,95 @@ def test_map_task_metadata():
     assert mapped_1.metadata is map_meta
     mapped_2 = map_task(t2)
     assert mapped_2.metadata is t2.metadata
+
+
+@pytest.mark.parametrize("executor", ["serial", "thread", "process"])
+def test_map_task_local_executors(executor):
+    @task
+    def square(a: int) -> int:
+        return a * a
+
+    @workflow
+    def wf(x: typing.List[int]) -> typing.List[int]:
+        return map_task(square, concurrency=4)(a=x)
+
+    with mock.patch.dict(os.environ, {"FLYTE_SDK_MAP_TASK_EXECUTOR": executor}):
+        assert wf(x=list(range(20))) == [i * i for i in range(20)]
+
+
+def test_map_task_thread_pool_concurrency():
+    lock = threading.Lock()
+    running = []
+    peak = []
+
+    @task
+    def slow(a: int) -> int:
+        with lock:
+            running.append(a)
+            peak.append(len(running))
+        threading.Event().wait(0.05)
+        with lock:
+            running.remove(a)
+        return a
+
+    with mock.patch.dict(os.environ, {"FLYTE_SDK_MAP_TASK_EXECUTOR": "thread"}):
+        assert map_task(slow, concurrency=3)(a=list(range(9))) == list(range(9))
+    assert 1 < max(peak) <= 3
+
+
+@pytest.mark.parametrize("executor", ["serial", "thread"])
+def test_map_task_min_success_ratio(executor):
+    @task
+    def fails_on_odd(a: int) -> str:
+        if a % 2:
+            raise ValueError(f"odd {a}")
+        return str(a)
+
+    @workflow
+    def tolerant(x: typing.List[int]) -> typing.List[typing.Optional[str]]:
+        return map_task(fails_on_odd, min_success_ratio=0.5)(a=x)
+
+    @workflow
+    def strict(x: typing.List[int]) -> typing.List[typing.Optional[str]]:
+        return map_task(fails_on_odd, min_success_ratio=0.6)(a=x)
+
+    with mock.patch.dict(os.environ, {"FLYTE_SDK_MAP_TASK_EXECUTOR": executor}):
+        assert tolerant(x=[0, 1, 2, 3]) == ["0", None, "2", None]
+        with pytest.raises(ValueError, match="odd 3"):
+            strict(x=[0, 1, 2, 3])
+
+
+def test_map_task_optional_outputs():
+    assert map_task(t1).python_interface.outputs["o0"] == typing.List[str]
+    assert map_task(t1, min_success_ratio=0.5).python_interface.outputs["o0"] == typing.List[typing.Optional[str]]
+
+
+def test_batched_serialization(serialization_settings):
+    maptask = map_task(t1, batch_size=100)
+    with pytest.raises(ValueError, match="requires an array plugin that supports batching"):
+        get_serializable(OrderedDict(), serialization_settings, maptask)
+
+    with mock.patch.dict("os.environ", {"FLYTE_SDK_MAP_TASK_BATCHING": "true"}):
+        task_spec = get_serializable(OrderedDict(), serialization_settings, maptask)
+
+    assert task_spec.template.custom == {"minSuccessRatio": 1.0}
+    assert task_spec.template.config == {"batch_size": "100"}
+    args = task_spec.template.container.args
+    assert args[args.index("--batch-size") + 1] == "100"
+
+    with pytest.raises(ValueError):
+        map_task(t1, batch_size=0)
+    with pytest.raises(ValueError, match="min_success_ratio"):
+        map_task(t1, batch_size=2, min_success_ratio=0.5)
+
+
+@pytest.mark.parametrize("index, expected", [("0", ["2", "3", "4"]), ("1", ["5", "6", "7"]), ("2", ["8"])])
+def test_batched_map_task_execution(index, expected):
+    maptask = map_task(t1, batch_size=3)
+    ctx = FlyteContextManager.current_context()
+    with FlyteContextManager.with_context(
+        ctx.with_execution_state(ctx.execution_state.with_params(mode=ExecutionState.Mode.TASK_EXECUTION))
+    ) as ctx:
+        with mock.patch.dict("os.environ", {"BATCH_JOB_ARRAY_INDEX_VAR_NAME": "INDEX", "INDEX": index}):
+            assert maptask.execute(a=list(range(7))) == expected
+            assert maptask.get_type_for_output_var("o0", None) == typing.List[str]
@@ -1,3 +1,7 @@
+import threading
+import typing
+
+import mock
 import pytest
 
 from flytekit import task
@@ -5,6 +9,7 @@ from flytekit.configuration import Image, ImageConfig, SerializationSettings
 from flytekit.core.python_auto_container import get_registerable_container_image
 from flytekit.core.python_function_task import PythonFunctionTask
 from flytekit.core.tracker import isnested, istestfunction
+from flytekit.core.type_engine import TypeEngine, convert_concurrently
 from tests.flytekit.unit.core import tasks
 
 
@@ -122,3 +127,49 @@ def test_metadata():
         @task(cache_serialize=True)
         def foo_missing_cache(i: str):
             print(f"{i}")
+
+
+def test_convert_concurrently():
+    def convert(n):
+        if n in ("b", "c"):
+            raise ValueError(n)
+        return n * 2
+
+    assert list(convert_concurrently(convert, ["x", "y", "z"], max_workers=2).items()) == [
+        ("x", "xx"),
+        ("y", "yy"),
+        ("z", "zz"),
+    ]
+    for max_workers in (1, 3):
+        with pytest.raises(ValueError, match="b"):
+            convert_concurrently(convert, ["a", "b", "c"], max_workers=max_workers)
+
+
+def test_concurrent_type_conversion():
+    threads = set()
+
+    @task
+    def t(a: int, b: str, c: typing.List[int]) -> typing.Tuple[int, str, typing.List[int]]:
+        return a + 1, b + "!", c + [4]
+
+    original = TypeEngine.to_literal
+
+    def to_literal(*args, **kwargs):
+        threads.add(threading.get_ident())
+        return original(*args, **kwargs)
+
+    with mock.patch.dict("os.environ", {"FLYTE_SDK_TYPE_CONVERSION_CONCURRENCY": "3"}):
+        with mock.patch.object(TypeEngine, "to_literal", side_effect=to_literal):
+            assert t(a=1, b="x", c=[1, 2, 3]) == (2, "x!", [1, 2, 3, 4])
+    # The inputs are converted on the calling thread before dispatch_execute, the outputs on the pool
+    assert threads - {threading.get_ident()}
+
+
+def test_concurrent_type_conversion_errors():
+    @task
+    def t() -> (int, int):
+        return "a", "b"
+
+    with mock.patch.dict("os.environ", {"FLYTE_SDK_TYPE_CONVERSION_CONCURRENCY": "2"}):
+        with pytest.raises(TypeError, match="var o0"):
+            t()
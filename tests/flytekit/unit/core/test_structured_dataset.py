@@ -1,3 +1,5 @@
+import concurrent.futures
+import time
 import typing
 
 import pytest
@@ -19,6 +21,7 @@ import pandas as pd
 import pyarrow as pa
 
 from flytekit import kwtypes, task
+from flytekit.types.structured import structured_dataset
 from flytekit.types.structured.structured_dataset import (
     PARQUET,
     S3,
@@ -375,3 +378,64 @@ def test_format_correct():
         return StructuredDataset(dataframe=df)
 
     assert t1().file_format == "avro"
+
+
+def test_resolved_handlers_cache():
+    class CacheDF(object):
+        ...
+
+    class TempEncoder(StructuredDatasetEncoder):
+        def __init__(self, fmt):
+            super().__init__(CacheDF, "cachetest", fmt)
+
+        def encode(self):
+            ...
+
+    default = TempEncoder("")
+    StructuredDatasetTransformerEngine.register(default, default_for_type=False)
+    assert StructuredDatasetTransformerEngine.get_encoder(CacheDF, "cachetest", "csv") is default
+    assert StructuredDatasetTransformerEngine._RESOLVED_ENCODERS[(CacheDF, "cachetest", "csv")] is default
+
+    # Registering a more specific handler invalidates the fallback that was resolved before.
+    csv = TempEncoder("csv")
+    StructuredDatasetTransformerEngine.register(csv, default_for_type=False)
+    assert StructuredDatasetTransformerEngine.get_encoder(CacheDF, "cachetest", "csv") is csv
+
+    # All the handlers share the engine registered with the type engine.
+    assert TypeEngine.get_transformer(CacheDF) is TypeEngine.get_transformer(pd.DataFrame)
+
+
+def test_parsed_types_cache():
+    t = Annotated[pd.DataFrame, kwtypes(a=int), "csv"]
+    assert extract_cols_and_format(t) is extract_cols_and_format(t)
+    assert extract_cols_and_format(Annotated[pd.DataFrame, kwtypes(a=str), "csv"])[1] == kwtypes(a=str)
+
+    engine = StructuredDatasetTransformerEngine()
+    lt = engine.get_literal_type(t)
+    lt.structured_dataset_type.columns.append(None)
+    assert len(engine.get_literal_type(t).structured_dataset_type.columns) == 1
+
+    # Column dicts are converted by their contents, changes to them are not hidden by the cache
+    cols = kwtypes(a=int)
+    assert [c.name for c in engine._convert_ordered_dict_of_columns_to_list(cols)] == ["a"]
+    cols["b"] = str
+    assert [c.name for c in engine._convert_ordered_dict_of_columns_to_list(cols)] == ["a", "b"]
+
+
+def test_parsed_types_cache_threads():
+    def parse(t):
+        time.sleep(0.001)
+        return object()
+
+    args = [object() for _ in range(32)]
+    cache = structured_dataset._IdentityCache(parse)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(cache, args * 4))
+    assert len(cache) == 32
+    # Every call gets the value that is cached, even when it was computed concurrently
+    assert all(value is cache(arg) for arg, value in zip(args * 4, results))
+
+    cache = structured_dataset._IdentityCache(parse, maxsize=8)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(cache, args * 4))
+    assert len(cache) == 8
@@ -1,18 +1,26 @@
+import os
 import typing
 
+import mock
 import pandas as pd
 import pyarrow as pa
+import pyarrow.parquet as pq
 import pytest
+from typing_extensions import Annotated
 
+from flytekit import task, workflow
 from flytekit.core import context_manager
 from flytekit.core.base_task import kwtypes
+from flytekit.core.data_persistence import DiskPersistence, UnsupportedPersistenceOp
+from flytekit.models import literals
 from flytekit.models.literals import StructuredDatasetMetadata
-from flytekit.models.types import StructuredDatasetType
-from flytekit.types.structured import basic_dfs
+from flytekit.models.types import LiteralType, SimpleType, StructuredDatasetType
+from flytekit.types.structured import basic_dfs, structured_dataset
 from flytekit.types.structured.structured_dataset import (
     StructuredDataset,
     StructuredDatasetDecoder,
     StructuredDatasetEncoder,
+    StructuredDatasetTransformerEngine,
 )
 
 my_cols = kwtypes(w=typing.Dict[str, typing.Dict[str, int]], x=typing.List[typing.List[int]], y=int, z=str)
@@ -41,3 +49,342 @@ def test_base_isnt_instantiable():
 
     with pytest.raises(TypeError):
         StructuredDatasetDecoder(pd.DataFrame, "", "")
+
+
+@pytest.fixture
+def parquet_dir(tmp_path):
+    df = pd.DataFrame({"Name": [f"name-{i}" for i in range(10)], "Age": list(range(10))})
+    pq.write_table(pa.Table.from_pandas(df[:6], preserve_index=False), str(tmp_path / "00000"))
+    pq.write_table(pa.Table.from_pandas(df[6:], preserve_index=False), str(tmp_path / "00001"))
+    (tmp_path / "_SUCCESS").write_text("")
+    sd_lit = literals.StructuredDataset(
+        uri=str(tmp_path), metadata=StructuredDatasetMetadata(StructuredDatasetType(format="parquet"))
+    )
+    return df, sd_lit
+
+
+def test_pandas_iter(parquet_dir):
+    df, sd_lit = parquet_dir
+    ctx = context_manager.FlyteContextManager.current_context()
+    decoder = basic_dfs.ParquetToPandasDecodingHandler("/")
+
+    with mock.patch.object(ctx.file_access, "get_data") as get_data:
+        batches = list(decoder.iter_decode(ctx, sd_lit, StructuredDatasetMetadata(StructuredDatasetType()), 4))
+        get_data.assert_not_called()
+    assert [len(b) for b in batches] == [4, 2, 4]
+    assert pd.concat(batches, ignore_index=True).equals(df)
+
+
+def test_arrow_iter(parquet_dir):
+    df, sd_lit = parquet_dir
+    ctx = context_manager.FlyteContextManager.current_context()
+    decoder = basic_dfs.ParquetToArrowDecodingHandler("/")
+
+    metadata = StructuredDatasetMetadata(
+        StructuredDatasetType(
+            columns=[
+                StructuredDatasetType.DatasetColumn(name="Age", literal_type=LiteralType(simple=SimpleType.INTEGER))
+            ]
+        )
+    )
+    batches = list(decoder.iter_decode(ctx, sd_lit, metadata))
+    assert all(isinstance(b, pa.Table) for b in batches)
+    assert pa.concat_tables(batches).column_names == ["Age"]
+    assert pa.concat_tables(batches).column("Age").to_pylist() == list(range(10))
+
+
+def test_iter_without_listing_or_streaming(parquet_dir):
+    df, sd_lit = parquet_dir
+    ctx = context_manager.FlyteContextManager.current_context()
+    decoder = basic_dfs.ParquetToPandasDecodingHandler("/")
+
+    with mock.patch.object(DiskPersistence, "listdir", side_effect=UnsupportedPersistenceOp("no")):
+        with mock.patch.object(DiskPersistence, "open", side_effect=UnsupportedPersistenceOp("no")):
+            with mock.patch("os.remove", wraps=os.remove) as remove:
+                batches = list(decoder.iter_decode(ctx, sd_lit, StructuredDatasetMetadata(StructuredDatasetType())))
+                assert remove.call_count == 2
+    assert pd.concat(batches, ignore_index=True).equals(df)
+
+
+def test_structured_dataset_iter(parquet_dir):
+    df, sd_lit = parquet_dir
+    sd = StructuredDataset()
+    sd._literal_sd = sd_lit
+    batches = list(sd.open(pd.DataFrame).iter(batch_size=5))
+    assert [len(b) for b in batches] == [5, 1, 4]
+    assert pd.concat(batches, ignore_index=True).equals(df)
+
+
+@pytest.fixture
+def row_group_dir(tmp_path):
+    # Two files of two row groups of 5 rows each, with the ids 0 to 19 in order
+    df = pd.DataFrame({"id": list(range(20)), "name": [f"name-{i}" for i in range(20)]})
+    for i in range(2):
+        table = pa.Table.from_pandas(df[i * 10 : (i + 1) * 10], preserve_index=False)
+        pq.write_table(table, str(tmp_path / f"{i:05}"), row_group_size=5)
+    sd_lit = literals.StructuredDataset(
+        uri=str(tmp_path), metadata=StructuredDatasetMetadata(StructuredDatasetType(format="parquet"))
+    )
+    return df, sd_lit
+
+
+def test_row_group_pruning(row_group_dir):
+    _, sd_lit = row_group_dir
+    metadata = pq.ParquetFile(os.path.join(sd_lit.uri, "00000")).metadata
+    assert basic_dfs._row_groups(metadata, [[("id", "<", 5)]]) == [0]
+    assert basic_dfs._row_groups(metadata, [[("id", ">=", 5)]]) == [1]
+    assert basic_dfs._row_groups(metadata, [[("id", "in", [1, 30])]]) == [0]
+    assert basic_dfs._row_groups(metadata, [[("id", "==", 3)], [("id", "==", 7)]]) == [0, 1]
+    assert basic_dfs._row_groups(metadata, [[("id", ">", 2), ("id", "<", 4)]]) == [0]
+    assert basic_dfs._row_groups(metadata, [[("id", ">", 100)]]) == []
+    # Predicates that cannot be compared with the statistics never prune
+    assert basic_dfs._row_groups(metadata, [[("id", "==", "a")]]) == [0, 1]
+
+    with pytest.raises(ValueError, match="missing"):
+        basic_dfs._row_groups(metadata, [[("missing", "==", 1)]])
+
+
+def test_filters(row_group_dir):
+    df, sd_lit = row_group_dir
+    ctx = context_manager.FlyteContextManager.current_context()
+    sd = StructuredDataset()
+    sd._literal_sd = sd_lit
+
+    filtered = sd.open(pd.DataFrame).filter([("id", ">=", 12), ("name", "!=", "name-13")]).all()
+    assert filtered["id"].tolist() == [12, 14, 15, 16, 17, 18, 19]
+
+    table = sd.open(pa.Table).filter([[("id", "<", 2)], [("id", "in", [18])]]).all()
+    assert table.column("id").to_pylist() == [0, 1, 18]
+
+    batches = list(sd.open(pd.DataFrame).filter([("id", "not in", [0, 1])]).iter(batch_size=4))
+    assert pd.concat(batches, ignore_index=True)["id"].tolist() == list(range(2, 20))
+
+    assert len(sd.open(pa.Table).filter([("id", ">", 100)]).all()) == 0
+    assert list(sd.open(pa.Table).filter([("id", ">", 100)]).iter()) == []
+
+    # Unknown columns are an error rather than a filter on another column
+    with pytest.raises(ValueError, match="not a column"):
+        sd.open(pd.DataFrame).filter([("Id", "==", 1)]).all()
+    with pytest.raises(ValueError, match="not a column"):
+        next(sd.open(pa.Table).filter([("Id", "==", 1)]).iter())
+    with pytest.raises(ValueError, match="not a column"):
+        basic_dfs._filter(pa.table({"id": [1]}), [[("Id", "==", 1)]], None)
+
+    # Only the row groups that may match are read
+    with mock.patch.object(
+        pq.ParquetFile, "read_row_groups", autospec=True, side_effect=pq.ParquetFile.read_row_groups
+    ) as read:
+        sd.open(pd.DataFrame).filter([("id", "==", 17)]).all()
+        assert [call.args[1] for call in read.call_args_list] == [[1]]
+
+    # The filter columns do not need to be selected
+    metadata = StructuredDatasetMetadata(
+        StructuredDatasetType(
+            columns=[
+                StructuredDatasetType.DatasetColumn(name="name", literal_type=LiteralType(simple=SimpleType.STRING))
+            ]
+        )
+    )
+    decoder = basic_dfs.ParquetToPandasDecodingHandler("/")
+    filtered = decoder.decode(ctx, sd_lit, metadata, filters=[[("id", "<", 2)]])
+    assert filtered.to_dict("list") == {"name": ["name-0", "name-1"]}
+    empty = decoder.decode(ctx, sd_lit, metadata, filters=[[("id", "<", 0)]])
+    assert list(empty.columns) == ["name"] and len(empty) == 0
+
+
+def test_invalid_filters():
+    sd = StructuredDataset()
+    with pytest.raises(ValueError, match="Unsupported operator"):
+        sd.filter([("id", "~", 1)])
+    with pytest.raises(ValueError, match="empty"):
+        sd.filter([])
+    with pytest.raises(ValueError, match="tuple"):
+        sd.filter([["id", "=", 1]])
+
+
+def test_filters_not_supported():
+    class NoFilterDecoder(StructuredDatasetDecoder):
+        def decode(self, ctx, flyte_value, current_task_metadata):
+            return pd.DataFrame({"id": [1]})
+
+    StructuredDatasetTransformerEngine.register(
+        NoFilterDecoder(pd.DataFrame, "nofilter", ""), default_for_type=False, override=True
+    )
+    sd = StructuredDataset()
+    sd._literal_sd = literals.StructuredDataset(
+        uri="nofilter://bucket/key", metadata=StructuredDatasetMetadata(StructuredDatasetType(format=""))
+    )
+    assert len(sd.open(pd.DataFrame).all()) == 1
+    with pytest.raises(ValueError, match="cannot filter"):
+        sd.open(pd.DataFrame).filter([("id", "==", 1)]).all()
+
+
+def test_sharded_writes(tmp_path):
+    ctx = context_manager.FlyteContextManager.current_context()
+    df = pd.DataFrame({"id": list(range(10)), "ts": pd.date_range("2022-01-01", periods=10, freq="D")})
+    encoder = basic_dfs.PandasToParquetEncodingHandler("/")
+    decoder = basic_dfs.ParquetToPandasDecodingHandler("/")
+    sd_type = StructuredDatasetType(format="parquet")
+
+    env = {
+        "FLYTE_STRUCTURED_DATASET_SHARD_ROWS": "4",
+        "FLYTE_STRUCTURED_DATASET_ROW_GROUP_SIZE": "2",
+        "FLYTE_STRUCTURED_DATASET_COMPRESSION": "gzip",
+    }
+    staging = tmp_path / "staging"
+    with mock.patch.dict("os.environ", env), mock.patch.object(
+        ctx.file_access, "get_random_local_directory", return_value=str(staging)
+    ):
+        sd_lit = encoder.encode(ctx, StructuredDataset(dataframe=df, uri=str(tmp_path / "sharded")), sd_type)
+    assert sorted(os.listdir(sd_lit.uri)) == ["00000", "00001", "00002", basic_dfs.METADATA_FILE]
+    # Nothing is left behind locally once uploaded
+    assert os.listdir(staging) == []
+    metadata = pq.read_metadata(os.path.join(sd_lit.uri, "00001"))
+    assert metadata.num_rows == 4 and metadata.num_row_groups == 2
+    assert metadata.row_group(0).column(0).compression == "GZIP"
+    summary = pq.read_metadata(os.path.join(sd_lit.uri, basic_dfs.METADATA_FILE))
+    assert summary.num_row_groups == 5
+    assert [summary.row_group(i).column(0).file_path for i in range(5)] == ["00000"] * 2 + ["00001"] * 2 + ["00002"]
+
+    assert decoder.decode(ctx, sd_lit, StructuredDatasetMetadata(sd_type)).equals(df)
+    assert pd.concat(decoder.iter_decode(ctx, sd_lit, StructuredDatasetMetadata(sd_type)), ignore_index=True).equals(df)
+
+    # The summary rules out the files that cannot match without opening them
+    with mock.patch.object(basic_dfs, "_open_file", wraps=basic_dfs._open_file) as open_file:
+        filtered = decoder.decode(ctx, sd_lit, StructuredDatasetMetadata(sd_type), filters=[[("id", ">=", 9)]])
+        opened = [os.path.basename(call.args[1]) for call in open_file.call_args_list]
+        assert opened == [basic_dfs.METADATA_FILE, "00002"]
+    assert filtered["id"].tolist() == [9]
+
+    with mock.patch.dict("os.environ", {"FLYTE_STRUCTURED_DATASET_SHARD_BYTES": str(df.memory_usage().sum() // 2)}):
+        sd_lit = encoder.encode(ctx, StructuredDataset(dataframe=df, uri=str(tmp_path / "by_bytes")), sd_type)
+    assert len([f for f in os.listdir(sd_lit.uri) if not f.startswith("_")]) == 2
+
+    table = pa.Table.from_pandas(df)
+    sd_lit = basic_dfs.ArrowToParquetEncodingHandler("/").encode(
+        ctx, StructuredDataset(dataframe=table, uri=str(tmp_path / "single")), sd_type
+    )
+    assert os.listdir(sd_lit.uri) == ["00000"]
+
+
+def test_string_column_names(tmp_path):
+    ctx = context_manager.FlyteContextManager.current_context()
+    encoder = basic_dfs.PandasToParquetEncodingHandler("/")
+    sd_type = StructuredDatasetType(format="parquet")
+    for df in [pd.DataFrame({0: [1], 1: [2]}), pd.DataFrame({"a": [1]}, index=pd.Index([0], name=1))]:
+        with pytest.raises(ValueError, match="must be strings|must have string column names"):
+            encoder.encode(ctx, StructuredDataset(dataframe=df, uri=str(tmp_path / "invalid")), sd_type)
+    assert not (tmp_path / "invalid").exists()
+
+
+def test_local_handoff():
+    @task
+    def make_table() -> pa.Table:
+        return pa.table({"a": [1, 2, 3], "b": ["x", "y", "z"]})
+
+    @task
+    def make_df() -> pd.DataFrame:
+        return pd.DataFrame({"a": [1, 2, 3]})
+
+    @task
+    def scale(df: Annotated[pd.DataFrame, kwtypes(a=int)]) -> int:
+        assert df.columns.tolist() == ["a"]
+        df["a"] *= 10
+        return int(df["a"].sum())
+
+    @task
+    def count(table: pa.Table) -> int:
+        return table.num_rows
+
+    @workflow
+    def wf() -> typing.Tuple[int, int, int]:
+        t = make_table()
+        return scale(df=t), scale(df=t), count(table=make_df())
+
+    not_called = AssertionError("the dataframe should have been handed over")
+    with mock.patch.object(
+        basic_dfs.ParquetToPandasDecodingHandler, "decode", side_effect=not_called
+    ), mock.patch.object(basic_dfs.ParquetToArrowDecodingHandler, "decode", side_effect=not_called):
+        # Every consumer gets its own copy of a DataFrame to modify
+        assert wf() == (60, 60, 3)
+
+        with mock.patch.dict("os.environ", {"FLYTE_STRUCTURED_DATASET_LOCAL_HANDOFF_BYTES": "0"}):
+            with pytest.raises(Exception, match="should have been handed over"):
+                wf()
+    assert wf() == (60, 60, 3)
+    # The dataframes are dropped once the workflow returns
+    assert len(structured_dataset._local_dataframes._entries) == 0
+
+
+def test_local_handoff_of_shared_dataframe():
+    shared = pd.DataFrame({"a": [1, 2, 3]})
+
+    @task
+    def produce() -> pd.DataFrame:
+        return shared
+
+    @task
+    def mutate(df: pd.DataFrame) -> int:
+        shared["a"] *= 10
+        return int(df["a"].sum())
+
+    @task
+    def total(df: pd.DataFrame) -> int:
+        return int(df["a"].sum())
+
+    @workflow
+    def wf() -> typing.Tuple[int, int]:
+        df = produce()
+        m = mutate(df=df)
+        t = total(df=df)
+        m >> t
+        return m, t
+
+    # Changes to the returned object after it was written are not handed over
+    not_called = AssertionError("the dataframe should have been handed over")
+    with mock.patch.object(basic_dfs.ParquetToPandasDecodingHandler, "decode", side_effect=not_called):
+        assert wf() == (6, 6)
+
+
+def test_local_dataframes_eviction():
+    dataframes = structured_dataset._LocalDataFrames()
+    table = pa.table({"a": list(range(100))})
+    with mock.patch.dict("os.environ", {"FLYTE_STRUCTURED_DATASET_LOCAL_HANDOFF_BYTES": str(table.nbytes * 2)}):
+        with dataframes.scope():
+            dataframes.put("/first", table)
+            dataframes.put("/second", table)
+            assert dataframes.get("/first", pa.Table, None) is table
+            dataframes.put("/third", table)
+            # The least recently used one is dropped
+            assert dataframes.get("/second", pa.Table, None) is None
+            assert dataframes.get("/first", pd.DataFrame, ["a"]).equals(table.to_pandas())
+            assert dataframes.get("/third", pd.DataFrame, ["b"]) is None
+        # Nothing is kept once the execution is over, or outside of one
+        assert dataframes.get("/first", pa.Table, None) is None
+        dataframes.put("/first", table)
+        assert dataframes.get("/first", pa.Table, None) is None
+
+
+def test_local_dataframes_snapshot():
+    dataframes = structured_dataset._LocalDataFrames()
+    df = pd.DataFrame({"a": [1, 2, 3], "b": ["x", "y", "z"]}, index=[5, 6, 7])
+    with dataframes.scope():
+        dataframes.put("/df", df)
+        df["a"].values[0] = 100
+        df.loc[6, "b"] = "changed"
+        assert dataframes.get("/df", pd.DataFrame, None).equals(
+            pd.DataFrame({"a": [1, 2, 3], "b": ["x", "y", "z"]}, index=[5, 6, 7])
+        )
+        assert dataframes.get("/df", pd.DataFrame, ["a"]).index.tolist() == [5, 6, 7]
+        assert dataframes.get("/df", pa.Table, ["a"]).column("a").to_pylist() == [1, 2, 3]
+
+
+def test_local_dataframes_size_of_objects():
+    # The strings of object columns are counted, not only their pointers
+    df = pd.DataFrame({"s": ["x" * 1000] * 100})
+    assert structured_dataset._LocalDataFrames._size(df) > 100 * 1000
+    dataframes = structured_dataset._LocalDataFrames()
+    with mock.patch.dict("os.environ", {"FLYTE_STRUCTURED_DATASET_LOCAL_HANDOFF_BYTES": str(100 * 1000)}):
+        with dataframes.scope():
+            dataframes.put("/strings", df)
+            assert dataframes.get("/strings", pd.DataFrame, None) is None
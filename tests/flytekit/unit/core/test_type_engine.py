@@ -6,6 +6,7 @@ from dataclasses import asdict, dataclass
 from datetime import timedelta
 from enum import Enum
 
+import mock
 import pandas as pd
 import pyarrow as pa
 import pytest
@@ -92,6 +93,90 @@ def test_type_resolution():
         TypeEngine.get_transformer(typing.Any)
 
 
+def test_transformer_resolution_cache():
+    TypeEngine.clear_transformer_cache()
+    assert TypeEngine.transformer_cache_info() == (0, 0, 0)
+
+    t = Annotated[typing.List[int], "foo"]
+    assert type(TypeEngine.get_transformer(t)) == ListTransformer
+    assert type(TypeEngine.get_transformer(t)) == ListTransformer
+    info = TypeEngine.transformer_cache_info()
+    assert info.hits == 1
+    assert TypeEngine.get_transformer(typing.List[int]) is TypeEngine.get_transformer(t)
+
+    # Unhashable annotations bypass the cache entirely
+    before = TypeEngine.transformer_cache_info()
+    assert type(TypeEngine.get_transformer(Annotated[int, {"a": 1}])) == SimpleTransformer
+    assert TypeEngine.transformer_cache_info() == before
+
+    # Failed lookups are not memoized
+    with pytest.raises(ValueError):
+        TypeEngine.get_transformer(typing.Any)
+    with pytest.raises(ValueError):
+        TypeEngine.get_transformer(typing.Any)
+
+
+def test_transformer_resolution_cache_is_bounded():
+    TypeEngine.clear_transformer_cache()
+    with mock.patch.object(TypeEngine, "_TRANSFORMER_CACHE_MAXSIZE", 2):
+        TypeEngine.get_transformer(typing.List[int])
+        TypeEngine.get_transformer(typing.List[str])
+        TypeEngine.get_transformer(typing.List[int])
+        TypeEngine.get_transformer(typing.List[float])
+        assert list(TypeEngine._TRANSFORMER_CACHE) == [typing.List[int], typing.List[float]]
+
+
+def test_transformer_resolution_cache_invalidation():
+    class Base:
+        ...
+
+    class Child(Base):
+        ...
+
+    TypeEngine.register(
+        SimpleTransformer("Base", Base, LiteralType(simple=SimpleType.INTEGER), lambda x: None, lambda x: None)
+    )
+    try:
+        assert TypeEngine.get_transformer(Child).name == "Base"
+        assert TypeEngine.transformer_cache_info().currsize > 0
+
+        TypeEngine.register_additional_type(
+            SimpleTransformer("Child", Child, LiteralType(simple=SimpleType.INTEGER), lambda x: None, lambda x: None),
+            Child,
+        )
+        assert TypeEngine.transformer_cache_info().currsize == 0
+        assert TypeEngine.get_transformer(Child).name == "Child"
+    finally:
+        del TypeEngine._REGISTRY[Base]
+        del TypeEngine._REGISTRY[Child]
+        TypeEngine.clear_transformer_cache()
+
+
+def test_transformer_resolution_follows_mro():
+    class A:
+        ...
+
+    class B(A):
+        ...
+
+    class C(B):
+        ...
+
+    TypeEngine.register(
+        SimpleTransformer("A", A, LiteralType(simple=SimpleType.INTEGER), lambda x: None, lambda x: None)
+    )
+    TypeEngine.register(
+        SimpleTransformer("B", B, LiteralType(simple=SimpleType.INTEGER), lambda x: None, lambda x: None)
+    )
+    try:
+        # The most specific registered base wins, regardless of registration order
+        assert TypeEngine.get_transformer(C).name == "B"
+    finally:
+        del TypeEngine._REGISTRY[A]
+        del TypeEngine._REGISTRY[B]
+        TypeEngine.clear_transformer_cache()
+
+
 def test_file_formats_getting_literal_type():
     transformer = TypeEngine.get_transformer(FlyteFile)
 
@@ -320,6 +405,96 @@ def test_list_transformer():
     assert xx == [3, 4]
 
 
+@pytest.mark.parametrize(
+    "python_type,values",
+    [
+        (int, [1, 2, 3]),
+        (float, [1.0, 2.5, -3.0]),
+        (str, ["a", "b", ""]),
+        (bool, [True, False]),
+        (
+            datetime.datetime,
+            [
+                datetime.datetime(2022, 1, 1, tzinfo=datetime.timezone.utc),
+                datetime.datetime(2022, 2, 1, tzinfo=datetime.timezone.utc),
+            ],
+        ),
+    ],
+)
+def test_list_transformer_primitives(python_type, values):
+    ctx = FlyteContext.current_context()
+    lt = TypeEngine.to_literal_type(typing.List[python_type])
+    lv = TypeEngine.to_literal(ctx, values, typing.List[python_type], lt)
+    assert [TypeEngine.to_python_value(ctx, x, python_type) for x in lv.collection.literals] == values
+    assert TypeEngine.to_python_value(ctx, lv, typing.List[python_type]) == values
+
+
+def test_list_transformer_primitives_type_mismatch():
+    ctx = FlyteContext.current_context()
+    lt = TypeEngine.to_literal_type(typing.List[float])
+    with pytest.raises(TypeTransformerFailedError):
+        TypeEngine.to_literal(ctx, [1.0, 2], typing.List[float], lt)
+
+    lv = TypeEngine.to_literal(ctx, [1, 2], typing.List[int], TypeEngine.to_literal_type(typing.List[int]))
+    with pytest.raises(TypeTransformerFailedError):
+        TypeEngine.to_python_value(ctx, lv, typing.List[str])
+
+
+def test_list_transformer_from_numpy_array():
+    import numpy as np
+
+    ctx = FlyteContext.current_context()
+    lt = TypeEngine.to_literal_type(typing.List[float])
+    lv = TypeEngine.to_literal(ctx, np.array([1.0, 2.0, 3.5]), typing.List[float], lt)
+    assert TypeEngine.to_python_value(ctx, lv, typing.List[float]) == [1.0, 2.0, 3.5]
+
+    with pytest.raises(TypeTransformerFailedError):
+        TypeEngine.to_literal(ctx, np.array([1, 2]), typing.List[float], lt)
+
+
+def test_list_transformer_offload_collections():
+    ctx = FlyteContext.current_context()
+    lt = TypeEngine.to_literal_type(typing.Dict[str, typing.List[float]])
+    lv = TypeEngine.to_literal(ctx, {"a": [1.0, 2.0, 3.0], "b": [4.0]}, typing.Dict[str, typing.List[float]], lt)
+
+    offloaded = ListTransformer.offload_collections(ctx, lv, 2)
+    a = offloaded.map.literals["a"]
+    assert a.scalar.blob.metadata.type.format == ListTransformer.OFFLOADED_COLLECTION_FORMAT
+    assert offloaded.map.literals["b"] == lv.map.literals["b"]
+    assert TypeEngine.to_python_value(ctx, a, typing.List[float]) == [1.0, 2.0, 3.0]
+    assert TypeEngine.to_python_value(ctx, offloaded, typing.Dict[str, typing.List[float]]) == {
+        "a": [1.0, 2.0, 3.0],
+        "b": [4.0],
+    }
+
+    lv = TypeEngine.to_literal(
+        ctx, [True, False, True], typing.List[bool], TypeEngine.to_literal_type(typing.List[bool])
+    )
+    offloaded = ListTransformer.offload_collections(ctx, lv, 2)
+    assert offloaded.scalar.blob is not None
+    assert TypeEngine.to_python_value(ctx, offloaded, typing.List[bool]) == [True, False, True]
+    with pytest.raises(TypeTransformerFailedError):
+        TypeEngine.to_python_value(ctx, offloaded, typing.List[int])
+
+    # Consumers may declare the elements Optional or Annotated, like the outputs of map tasks
+    lv = TypeEngine.to_literal(ctx, [1, 2, 3], typing.List[int], TypeEngine.to_literal_type(typing.List[int]))
+    offloaded = ListTransformer.offload_collections(ctx, lv, 2)
+    assert offloaded.scalar.blob is not None
+    for t in [
+        typing.List[typing.Optional[int]],
+        typing.List[Annotated[int, "meta"]],
+        typing.List[typing.Optional[Annotated[int, "meta"]]],
+        typing.List[typing.Optional[float]],
+    ]:
+        assert TypeEngine.to_python_value(ctx, offloaded, t) == [1, 2, 3]
+    with pytest.raises(TypeTransformerFailedError):
+        TypeEngine.to_python_value(ctx, offloaded, typing.List[typing.Optional[str]])
+
+    # Strings are never offloaded
+    lv = TypeEngine.to_literal(ctx, ["a", "b"], typing.List[str], TypeEngine.to_literal_type(typing.List[str]))
+    assert ListTransformer.offload_collections(ctx, lv, 1) == lv
+
+
 def test_protos():
     ctx = FlyteContext.current_context()
 
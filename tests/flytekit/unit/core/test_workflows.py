@@ -1,5 +1,7 @@
+import threading
 import typing
 from collections import OrderedDict
+from unittest import mock
 
 import pandas as pd
 import pytest
@@ -10,7 +12,13 @@ from flytekit import StructuredDataset, kwtypes
 from flytekit.configuration import Image, ImageConfig
 from flytekit.core.condition import conditional
 from flytekit.core.task import task
-from flytekit.core.workflow import WorkflowFailurePolicy, WorkflowMetadata, WorkflowMetadataDefaults, workflow
+from flytekit.core.workflow import (
+    ImperativeWorkflow,
+    WorkflowFailurePolicy,
+    WorkflowMetadata,
+    WorkflowMetadataDefaults,
+    workflow,
+)
 from flytekit.exceptions.user import FlyteValidationException, FlyteValueException
 from flytekit.tools.translator import get_serializable
 from flytekit.types.schema import FlyteSchema
@@ -324,3 +332,132 @@ def test_structured_dataset_wf():
     assert_frame_equal(sd_to_schema_wf(), superset_df)
     assert_frame_equal(schema_to_sd_wf()[0], subset_df)
     assert_frame_equal(schema_to_sd_wf()[1], subset_df)
+
+
+@mock.patch.dict("os.environ", {"FLYTE_SDK_LOCAL_WORKFLOW_CONCURRENCY": "4"})
+def test_concurrent_local_execution():
+    lock = threading.Lock()
+    running = []
+    peak = []
+
+    @task
+    def feature(a: int) -> int:
+        with lock:
+            running.append(a)
+            peak.append(len(running))
+        threading.Event().wait(0.05)
+        with lock:
+            running.remove(a)
+        return a * 10
+
+    @task
+    def total(xs: typing.List[int]) -> int:
+        return sum(xs)
+
+    @workflow
+    def wide() -> typing.Tuple[int, int]:
+        features = [feature(a=i + 1) for i in range(8)]
+        return total(xs=features), features[0]
+
+    assert wide() == (360, 10)
+    assert 1 < max(peak) <= 4
+    assert sorted(wide.node_timings) == sorted(n.id for n in wide.nodes)
+    assert all(t >= 0.05 for k, t in wide.node_timings.items() if k != wide.nodes[-1].id)
+
+
+@mock.patch.dict("os.environ", {"FLYTE_SDK_LOCAL_WORKFLOW_CONCURRENCY": "2"})
+def test_concurrent_local_execution_explicit_dependencies():
+    order = []
+
+    @task
+    def record(a: str):
+        order.append(a)
+
+    @workflow
+    def ordered():
+        first = record(a="first")
+        second = record(a="second")
+        first >> second
+
+    ordered()
+    assert order == ["first", "second"]
+
+
+@pytest.mark.parametrize(
+    "policy, expected_calls",
+    [
+        (WorkflowFailurePolicy.FAIL_IMMEDIATELY, ["fail"]),
+        (WorkflowFailurePolicy.FAIL_AFTER_EXECUTABLE_NODES_COMPLETE, ["fail", "ok"]),
+    ],
+)
+@mock.patch.dict("os.environ", {"FLYTE_SDK_LOCAL_WORKFLOW_CONCURRENCY": "2"})
+def test_concurrent_local_execution_failure_policy(policy, expected_calls):
+    calls = []
+    started = threading.Event()
+
+    @task
+    def fail() -> int:
+        calls.append("fail")
+        started.set()
+        raise ValueError("boom")
+
+    @task
+    def after(a: int) -> int:
+        calls.append("after")
+        return a
+
+    @task
+    def ok() -> int:
+        # Only starts once the failure happened, as the second worker is busy with it.
+        calls.append("ok")
+        return 1
+
+    @task
+    def wait_for_failure() -> int:
+        started.wait(5)
+        threading.Event().wait(0.05)
+        return 0
+
+    @workflow(failure_policy=policy)
+    def wf() -> typing.Tuple[int, int, int]:
+        return after(a=fail()), wait_for_failure(), ok()
+
+    with pytest.raises(ValueError, match="boom"):
+        wf()
+    assert calls == expected_calls
+
+
+@mock.patch.dict("os.environ", {"FLYTE_SDK_LOCAL_WORKFLOW_CONCURRENCY": "4"})
+def test_concurrent_local_execution_conditionals():
+    @task
+    def double(n: int) -> int:
+        return n * 2
+
+    @task
+    def negate(n: int) -> int:
+        return -n
+
+    @workflow
+    def wf(n: int) -> int:
+        return conditional("positive").if_(n > 1).then(double(n=n)).else_().then(negate(n=n))
+
+    assert wf(n=3) == 6
+    assert wf(n=-3) == 3
+    assert wf.node_timings == {}
+
+
+@mock.patch.dict("os.environ", {"FLYTE_SDK_LOCAL_WORKFLOW_CONCURRENCY": "4"})
+def test_concurrent_local_execution_imperative():
+    @task
+    def add(a: int, b: int) -> int:
+        return a + b
+
+    wb = ImperativeWorkflow(name="my.workflow.concurrent")
+    wb.add_workflow_input("a", int)
+    n1 = wb.add_entity(add, a=wb.inputs["a"], b=1)
+    n2 = wb.add_entity(add, a=wb.inputs["a"], b=2)
+    n3 = wb.add_entity(add, a=n1.outputs["o0"], b=n2.outputs["o0"])
+    wb.add_workflow_output("out", n3.outputs["o0"])
+
+    assert wb(a=1) == 5
+    assert len(wb.node_timings) == 3
@@ -0,0 +1,43 @@
+import subprocess
+import sys
+
+
+def _run(code: str) -> str:
+    return subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout.strip()
+
+
+def test_import_does_not_load_heavy_packages():
+    # Importing flytekit is paid by every task and every pyflyte command, the packages backing the dataframe and
+    # array types are only loaded once they are used.
+    loaded = _run(
+        "import sys, flytekit; print(sorted(m for m in ('numpy', 'pandas', 'pyarrow', 'google.cloud.bigquery') if m in sys.modules))"
+    )
+    assert loaded == "[]"
+
+
+def test_lazy_attributes_and_transformers():
+    out = _run(
+        "import flytekit, pandas, numpy\n"
+        "from flytekit.core.type_engine import TypeEngine\n"
+        "print(type(TypeEngine.get_transformer(pandas.DataFrame)).__name__)\n"
+        "print(type(TypeEngine.get_transformer(numpy.ndarray)).__name__)\n"
+        "from flytekit import StructuredDataset\n"
+        "print(StructuredDataset.__module__, flytekit.schema.__name__, 'StructuredDataset' in dir(flytekit))"
+    )
+    assert out.splitlines() == [
+        "StructuredDatasetTransformerEngine",
+        "NumpyArrayTransformer",
+        "flytekit.types.structured.structured_dataset flytekit.types.schema True",
+    ]
+
+
+def test_structured_dataset_imported_first():
+    # The schema and numpy transformers must still register when the structured dataset module is imported first.
+    out = _run(
+        "import pandas, numpy\n"
+        "import flytekit.types.structured.structured_dataset\n"
+        "from flytekit.core.type_engine import TypeEngine\n"
+        "print(type(TypeEngine.get_transformer(pandas.DataFrame)).__name__)\n"
+        "print(type(TypeEngine.get_transformer(numpy.ndarray)).__name__)"
+    )
+    assert out.splitlines() == ["StructuredDatasetTransformerEngine", "NumpyArrayTransformer"]
@@ -1,6 +1,12 @@
+import mock
 import numpy as np
+import pytest
+from typing_extensions import Annotated
 
-from flytekit import task, workflow
+from flytekit import kwtypes, task, workflow
+from flytekit.core.context_manager import FlyteContextManager
+from flytekit.core.type_engine import TypeEngine, TypeTransformerFailedError
+from flytekit.types.numpy import NumpyArrayTransformer
 
 
 @task
@@ -69,3 +75,101 @@ def wf():
 @workflow
 def test_wf():
     wf()
+
+
+def _roundtrip(arr, python_type, expected_python_type=None):
+    ctx = FlyteContextManager.current_context()
+    lt = TypeEngine.to_literal_type(python_type)
+    lv = TypeEngine.to_literal(ctx, arr, python_type, lt)
+    return lv, TypeEngine.to_python_value(ctx, lv, expected_python_type or python_type)
+
+
+def test_mmap_mode():
+    arr = np.arange(12, dtype=np.float32).reshape(3, 4)
+    _, loaded = _roundtrip(arr, np.ndarray, Annotated[np.ndarray, kwtypes(mmap_mode="r")])
+    assert isinstance(loaded, np.memmap)
+    np.testing.assert_array_equal(loaded, arr)
+
+
+def test_compressed():
+    arr = np.zeros((100, 100), dtype=np.int64)
+    lv, loaded = _roundtrip(arr, Annotated[np.ndarray, kwtypes(compressed=True)], np.ndarray)
+    assert lv.scalar.blob.uri.endswith(".npz")
+    assert lv.scalar.blob.metadata.type.format == NumpyArrayTransformer.NUMPY_ARRAY_FORMAT
+    np.testing.assert_array_equal(loaded, arr)
+
+    # mmap_mode is ignored for compressed arrays
+    _, loaded = _roundtrip(
+        arr, Annotated[np.ndarray, kwtypes(compressed=True)], Annotated[np.ndarray, kwtypes(mmap_mode="r")]
+    )
+    np.testing.assert_array_equal(loaded, arr)
+
+    with pytest.raises(TypeError):
+        _roundtrip(np.array([{}], dtype=object), Annotated[np.ndarray, kwtypes(compressed=True)])
+
+
+def test_read_header():
+    ctx = FlyteContextManager.current_context()
+    arr = np.ones((2, 5), dtype=np.int16)
+    lv, _ = _roundtrip(arr, np.ndarray)
+    assert NumpyArrayTransformer.read_header(ctx, lv.scalar.blob.uri) == (np.dtype(np.int16), (2, 5))
+
+    lv, _ = _roundtrip(arr, Annotated[np.ndarray, kwtypes(compressed=True)])
+    assert NumpyArrayTransformer.read_header(ctx, lv.scalar.blob.uri) is None
+
+
+def test_read_header_versions(tmp_path):
+    ctx = FlyteContextManager.current_context()
+    # Field names that latin-1 cannot encode are written with a version 3.0 header
+    arr = np.zeros(3, dtype=[("\u6570\u636e", np.int32)])
+    path = str(tmp_path / "utf8.npy")
+    np.save(path, arr)
+    with open(path, "rb") as f:
+        assert np.lib.format.read_magic(f) == (3, 0)
+    assert NumpyArrayTransformer.read_header(ctx, path) == (arr.dtype, (3,))
+
+    # Unknown versions are left to the validation of the loaded array
+    path = str(tmp_path / "unknown.npy")
+    with open(path, "wb") as f:
+        f.write(np.lib.format.magic(4, 0) + b"\x00\x00")
+    assert NumpyArrayTransformer.read_header(ctx, path) is None
+
+
+def test_validate_before_download():
+    ctx = FlyteContextManager.current_context()
+    arr = np.ones((2, 5), dtype=np.int16)
+    lv, _ = _roundtrip(arr, np.ndarray)
+
+    loaded = TypeEngine.to_python_value(ctx, lv, Annotated[np.ndarray, kwtypes(dtype=np.int16, shape=(None, 5))])
+    np.testing.assert_array_equal(loaded, arr)
+
+    with mock.patch.object(ctx.file_access, "get_data") as get_data:
+        with pytest.raises(TypeTransformerFailedError, match="dtype"):
+            TypeEngine.to_python_value(ctx, lv, Annotated[np.ndarray, kwtypes(dtype=np.float64)])
+        with pytest.raises(TypeTransformerFailedError, match="shape"):
+            TypeEngine.to_python_value(ctx, lv, Annotated[np.ndarray, kwtypes(shape=(2,))])
+        get_data.assert_not_called()
+
+    # Compressed arrays are validated after the download
+    lv, _ = _roundtrip(arr, Annotated[np.ndarray, kwtypes(compressed=True)])
+    with pytest.raises(TypeTransformerFailedError, match="shape"):
+        TypeEngine.to_python_value(ctx, lv, Annotated[np.ndarray, kwtypes(shape=(5, 2))])
+
+    with pytest.raises(TypeTransformerFailedError, match="dtype"):
+        _roundtrip(arr, Annotated[np.ndarray, kwtypes(dtype=np.float32)])
+
+
+def test_annotated_task():
+    @task
+    def produce() -> Annotated[np.ndarray, kwtypes(compressed=True)]:
+        return np.arange(6)
+
+    @task
+    def consume(a: Annotated[np.ndarray, kwtypes(mmap_mode="r", dtype=np.int64)]) -> int:
+        return int(a.sum())
+
+    @workflow
+    def wf() -> int:
+        return consume(a=produce())
+
+    assert wf() == 15